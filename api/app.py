@@ -1,12 +1,26 @@
 # app.py
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import sqlite3
-from typing import List, Optional
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 
-DB_PATH = r"C:\GameSearch\steamcharts_scraper\data\steamcharts.db"  # <- adjust if needed
+# Shared helpers live in backend/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+from db import DatabaseUnavailable, ReadPool, check_objects
+from encode import dumps
+from executor import DBExecutor, Overloaded
+from counts import StepTimer, TotalsCache, resolve_total
+from fts import fts_available, match_expr
+from paging import decode_cursor, keyset_params, next_cursor
+from query import Source
+
+DB_PATH = os.getenv("GSE_API_DB", r"C:\GameSearch\steamcharts_scraper\data\steamcharts.db")  # <- adjust if needed
 
 app = FastAPI()
 app.add_middleware(
@@ -26,32 +40,103 @@ class GameRow(BaseModel):
 
 class ApiResponse(BaseModel):
     data: List[GameRow]
-    total: int
+    total: Optional[int] = None      # None with include_total=false
+    total_exact: bool = True         # False when total is an estimate / lower bound
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+# Thread-local read-only connections (see backend/db.py)
+POOL = ReadPool(DB_PATH, cached_statements=int(os.getenv("GSE_CACHED_STATEMENTS", "1024")))
+
+@contextmanager
+def get_conn() -> Iterator:
+    try:
+        with POOL.connection() as conn:
+            yield conn
+    except DatabaseUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+# Reader threads for the async endpoint; identical in-flight searches share
+# one execution (see backend/executor.py)
+DB = DBExecutor(
+    workers=int(os.getenv("GSE_DB_WORKERS", "8")),
+    max_pending=int(os.getenv("GSE_DB_QUEUE", "1000")),
+    coalescing=os.getenv("GSE_COALESCE", "1") != "0",
+)
+
+TOTALS = TotalsCache()
+
+FTS_TABLE = "steam_items_fts"
+FTS_ENABLED = False
+
+# /api/search queries, compiled once per shape (backend/query.py)
+FTS_SUB = f"SELECT rowid AS fts_id, rank AS fts_rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"
+ITEMS = Source(
+    from_sql=" FROM steam_items",
+    text_from=f" FROM steam_items JOIN ({FTS_SUB}) AS m ON steam_items.rowid = m.fts_id",
+    columns="app_id, name, current, peak, hours, timestamp",
+    id_col="steam_items.rowid",
+    sorts={(col, d): f"{col} {d}" for col in ("current", "peak", "timestamp", "name", "fts_rank")
+           for d in ("ASC", "DESC")},
+    conds={
+        "like": "name LIKE ?",
+        # app ids are not in the index; keep exact-id matches
+        "id_or_fts": f"(app_id = ? OR steam_items.rowid IN (SELECT fts_id FROM ({FTS_SUB})))",
+        "id_or_like": "(app_id = ? OR name LIKE ?)",
+        "min_current": "current >= ?",
+        "from": "timestamp >= ?",
+        "to": "timestamp <= ?",
+    },
+)
+
+# What /api/search reads: GSE_API_DB may be a steam_items-only DB, so this
+# checks for these rather than the steamcharts schema version (they come from
+# migrations 0006 and 0013, which apply only where steam_items exists).
+REQUIRED_OBJECTS = ("steam_items", FTS_TABLE, "idx_items_current", "idx_items_peak",
+                    "idx_items_timestamp", "idx_items_name")
+
+@app.on_event("startup")
+def check_database():
+    # steam_items_fts comes from steamcharts_scraper/db/migrate.py; never written here
+    global FTS_ENABLED
+    check_objects(POOL, REQUIRED_OBJECTS)
+    with POOL.connection() as conn:
+        FTS_ENABLED = fts_available(conn, FTS_TABLE)
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+@app.on_event("shutdown")
+def close_pool():
+    DB.shutdown()
+    POOL.close_all()
 
-# Optional: run once to create helpful indexes
-# CREATE INDEX IF NOT EXISTS idx_items_appid ON steam_items(app_id);
-# CREATE INDEX IF NOT EXISTS idx_items_name ON steam_items(name);
-# CREATE INDEX IF NOT EXISTS idx_items_timestamp ON steam_items(timestamp);
-# CREATE INDEX IF NOT EXISTS idx_items_current ON steam_items(current);
-# Adjust table/column names to your schema.
+# steam_items indexes (one per sort column) come from migration 0013;
+# benchmarks/check_query_plans.py fails if a search shape stops using them.
+
+@app.get("/stats")
+def stats():
+    return {"pool": POOL.stats(), "totals_cache": TOTALS.stats(), "executor": DB.stats(), "plans": ITEMS.stats()}
 
 @app.get("/api/search", response_model=ApiResponse)
-def search(
+async def search(
     q: str = Query("", description="Name substring or exact App ID"),
-    sort: str = Query("-current"),
+    sort: str = Query("-current", description="[+|-]current|peak|timestamp|name, or relevance (with q)"),
     page: int = 1,
     page_size: int = 25,
     min_current: int = 0,
     from_: Optional[str] = Query(None, alias="from"),
     to: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (keyset paging; page is ignored)"),
+    include_total: str = Query("exact", pattern="^(exact|estimate|false)$", description="exact (cached per data generation), estimate (cheap, may be a lower bound) or false"),
 ):
+    args = (q, sort, page, page_size, min_current, from_, to, cursor, include_total)
+    try:
+        (body, timing), shared = await DB.coalesce(args, _search, *args)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=f"Busy: {e}", headers={"Retry-After": "1"})
+    return Response(content=body, media_type="application/json",
+                    headers={"Server-Timing": timing + (", coalesced" if shared else "")})
+
+def _search(q, sort, page, page_size, min_current, from_, to, cursor, include_total) -> Tuple[bytes, str]:
     # Map sort keys to SQL
     key = "current"
     direction = "DESC"
@@ -61,67 +146,78 @@ def search(
     if raw_key in {"current", "peak", "timestamp", "name"}:
         key = raw_key
 
-    where, params = [], []
-
-    # Text / AppID query
-    if q:
-        if q.isdigit():
-            where.append("(app_id = ? OR name LIKE ?)")
-            params.extend([q, f"%{q}%"])
-        else:
-            where.append("name LIKE ?")
-            params.append(f"%{q}%")
-
-    # Min current
-    if min_current > 0:
-        where.append("current >= ?")
-        params.append(min_current)
-
-    # Date range
-    if from_:
-        where.append("timestamp >= ?")
-        params.append(from_)
-    if to:
-        where.append("timestamp <= ?")
-        params.append(to)
-
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
-    order_sql = f"ORDER BY {key} {direction}"
-    limit_sql = "LIMIT ? OFFSET ?"
-
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # total count
-    total_sql = f"SELECT COUNT(*) AS c FROM steam_items {where_sql};"
-    cur.execute(total_sql, params)
-    total = cur.fetchone()["c"]
-
-    # page results
-    offset = (page - 1) * page_size
-    data_sql = f"""
-        SELECT app_id, name, current, peak, hours, timestamp
-        FROM steam_items
-        {where_sql}
-        {order_sql}
-        {limit_sql};
-    """
-    cur.execute(data_sql, (*params, page_size, offset))
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-
-    # ensure types / formatting
-    normalized = []
-    for r in rows:
-        normalized.append(
-            GameRow(
-                app_id=str(r["app_id"]),
-                name=r["name"],
-                current=int(r["current"]),
-                peak=int(r["peak"]),
-                hours=(int(r["hours"]) if r.get("hours") is not None else None),
-                timestamp=(r["timestamp"] if isinstance(r["timestamp"], str) else datetime.utcfromtimestamp(r["timestamp"]).isoformat()),
-            )
+    def build(use_fts):
+        """(text, conds, params, sort) of the request; conds / sort key the compiled plan."""
+        text, conds, params = False, (), ()
+        order = (key, direction)
+
+        # Text / AppID query: FTS5 token/prefix match, LIKE only as a fallback
+        expr = match_expr(q) if (q and use_fts) else None
+        if expr:
+            if q.isdigit():
+                conds, params = (("id_or_fts", 2),), (q, expr)
+            else:
+                text, params = True, (expr,)
+                if raw_key == "relevance":
+                    order = ("fts_rank", "ASC")  # bm25: lower is better
+        elif q:
+            if q.isdigit():
+                conds, params = (("id_or_like", 2),), (q, f"%{q}%")
+            else:
+                conds, params = (("like", 1),), (f"%{q}%",)
+
+        # Min current, date range
+        for name, value in (("min_current", min_current if min_current > 0 else None), ("from", from_), ("to", to)):
+            if value:
+                conds += ((name, 1),)
+                params += (value,)
+
+        return text, conds, params, order
+
+    with get_conn() as conn:
+        # FTS first; no token hits (e.g. infix "ortn") falls back to LIKE
+        timer = StepTimer()
+        use_fts = FTS_ENABLED
+        text, conds, params, order = build(use_fts)
+        plan = ITEMS.plan(text, conds, order)
+        if q and use_fts and conn.execute(plan.exists_sql, params).fetchone() is None:
+            text, conds, params, order = build(False)
+            plan = ITEMS.plan(text, conds, order)
+
+        # total count, cached per normalized filter until the data generation changes
+        t0 = time.perf_counter()
+        total, total_exact, source = resolve_total(
+            conn, TOTALS, (plan.count_sql, params), include_total, plan.count_sql, params,
+            estimate_sql=plan.estimate_sql,
         )
-
-    return ApiResponse(data=normalized, total=total, page=page, page_size=page_size)
+        timer.add("count", (time.perf_counter() - t0) * 1000, source)
+
+        # page results; rowid breaks ties in the same direction as the sort
+        if cursor:
+            key, last_id = decode_cursor(cursor, sort)
+            plan = ITEMS.plan(text, conds, order, "after" if key is not None else "after_null")
+            rows = timer.time("page", lambda: conn.execute(
+                plan.page_sql, params + keyset_params(key, last_id) + (page_size,)).fetchall())
+            if plan.tail_sql and len(rows) < page_size:
+                rows += conn.execute(plan.tail_sql, params + (page_size - len(rows),)).fetchall()
+        else:
+            offset = (page - 1) * page_size
+            rows = timer.time("page", lambda: conn.execute(plan.page_sql, params + (page_size, offset)).fetchall())
+
+    # ensure types / formatting: GameRow field for field, without a model per row
+    data = [
+        {
+            "app_id": str(app_id),
+            "name": name,
+            "current": int(current),
+            "peak": int(peak),
+            "hours": int(hours) if hours is not None else None,
+            "timestamp": ts if isinstance(ts, str) else datetime.utcfromtimestamp(ts).isoformat(),
+        }
+        for app_id, name, current, peak, hours, ts, *_ in rows
+    ]
+    body = timer.time("encode", lambda: dumps({
+        "data": data, "total": total, "total_exact": total_exact, "page": page, "page_size": page_size,
+        "next_cursor": next_cursor(rows, page_size, sort),
+    }))
+    return body, timer.header()
@@ -0,0 +1,125 @@
+# backend/counts.py
+# Cached / estimated result totals shared by backend/main.py and api/app.py
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+# Bumped by db/load_snapshot.py and db/upsert_catalog.py after every write
+GENERATION_SQL = "SELECT value FROM meta WHERE key = 'data_generation'"
+
+# "estimate" counts at most this many rows; beyond it the total is a lower bound
+ESTIMATE_CAP = 5000
+
+def data_generation(conn: sqlite3.Connection) -> Optional[int]:
+    """Current data generation, or None if this DB has no meta table (no caching)."""
+    try:
+        row = conn.execute(GENERATION_SQL).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else 0
+
+class TotalsCache:
+    """Exact totals (or other per-filter results, e.g. facet counts) per
+    normalized filter, valid for one data generation."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, Any]]:
+        """(generation, total) last stored for key, whatever its generation."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, generation: Optional[int], total: Any) -> None:
+        if generation is None:
+            return
+        with self._lock:
+            self._data[key] = (generation, total)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+def resolve_total(
+    conn: sqlite3.Connection,
+    cache: TotalsCache,
+    key: Hashable,
+    mode: str,
+    count_sql: str,
+    params: tuple,
+    generation: Optional[int] = None,
+    estimate_sql: Optional[str] = None,
+) -> Tuple[Optional[int], bool, str]:
+    """Return (total, exact, source) for include_total=exact|estimate|false.
+
+    exact:    cached exact count for this generation, else COUNT(*) and cache it.
+    estimate: any cached count (even from an older generation), else a COUNT
+              capped at ESTIMATE_CAP rows; a capped result is a lower bound.
+    false:    (None, False, "skipped") without touching the DB.
+    count_sql must be a "SELECT COUNT(*) FROM ..." statement; estimate_sql
+    (its capped form, taking the cap as the last parameter) is derived from
+    it unless given, e.g. precompiled by query.py.
+    """
+    if mode == "false":
+        return None, False, "skipped"
+    if generation is None:
+        generation = data_generation(conn)
+
+    cached = cache.get(key)
+    if cached is not None and cached[0] == generation:
+        return cached[1], True, "cache"
+    if cached is not None and mode == "estimate":
+        return cached[1], False, "stale-cache"
+
+    if mode == "estimate":
+        if estimate_sql is None:
+            inner = count_sql.replace("SELECT COUNT(*)", "SELECT 1", 1)
+            estimate_sql = f"SELECT COUNT(*) FROM ({inner} LIMIT ?)"
+        n = conn.execute(estimate_sql, params + (ESTIMATE_CAP,)).fetchone()[0]
+        if n < ESTIMATE_CAP:
+            cache.put(key, generation, n)
+            return n, True, "capped-count"
+        return n, False, "capped-count"
+
+    total = conn.execute(count_sql, params).fetchone()[0]
+    cache.put(key, generation, total)
+    return total, True, "count"
+
+class StepTimer:
+    """Collects per-step durations for a Server-Timing response header."""
+
+    def __init__(self):
+        self.steps = []
+
+    def time(self, name: str, fn: Callable, desc: str = ""):
+        t0 = time.perf_counter()
+        out = fn()
+        self.steps.append((name, (time.perf_counter() - t0) * 1000, desc))
+        return out
+
+    def add(self, name: str, dur_ms: float, desc: str = "") -> None:
+        self.steps.append((name, dur_ms, desc))
+
+    def header(self) -> str:
+        parts = []
+        for name, dur, desc in self.steps:
+            part = f"{name};dur={dur:.2f}"
+            if desc:
+                part += f';desc="{desc}"'
+            parts.append(part)
+        return ", ".join(parts)
@@ -0,0 +1,181 @@
+# backend/db.py
+# Read-only, thread-local SQLite connection pool shared by backend/main.py and api/app.py
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+# Per-connection tuning for a read-mostly API. Override via ReadPool(pragmas=...)
+# or GSE_PRAGMA_<NAME> env vars (e.g. GSE_PRAGMA_MMAP_SIZE=0).
+DEFAULT_PRAGMAS: Dict[str, Union[int, str]] = {
+    "query_only": "ON",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,        # negative = KiB, i.e. 64 MiB per connection
+    "temp_store": "MEMORY",
+}
+
+# Minimum PRAGMA user_version the API code expects
+# (steamcharts_scraper/db/migrate.py; bump alongside new migrations).
+REQUIRED_SCHEMA_VERSION = 13
+
+class DatabaseUnavailable(RuntimeError):
+    pass
+
+class SchemaOutdated(RuntimeError):
+    pass
+
+def pragmas_from_env(base: Optional[Dict[str, Union[int, str]]] = None) -> Dict[str, Union[int, str]]:
+    out = dict(DEFAULT_PRAGMAS if base is None else base)
+    for key, value in os.environ.items():
+        if key.startswith("GSE_PRAGMA_"):
+            out[key[len("GSE_PRAGMA_"):].lower()] = value
+    return out
+
+class ReadPool:
+    """One read-only connection per worker thread, reused across requests.
+
+    Connections are opened with a `mode=ro` URI and the configured PRAGMAs.
+    Every `check_interval` seconds the file is stat()ed; if it was replaced
+    (different inode/device, e.g. a rebuilt DB moved into place) every
+    thread reopens on its next checkout. With enabled=False each checkout
+    opens and closes its own connection (the old behaviour, for A/B runs).
+    """
+
+    def __init__(self, path: Union[str, Path], pragmas: Optional[Dict[str, Union[int, str]]] = None,
+                 check_interval: float = 2.0, cached_statements: int = 256, enabled: bool = True):
+        self.path = str(path)
+        self.pragmas = pragmas_from_env() if pragmas is None else pragmas
+        self.check_interval = check_interval
+        self.cached_statements = cached_statements
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._identity = None
+        self._epoch = 0
+        self._checked_at = 0.0
+        self._conns: Dict[int, sqlite3.Connection] = {}
+        self.opened = 0
+        self.reopened = 0
+        self.checkouts = 0
+
+    def _stat_identity(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            raise DatabaseUnavailable(f"DB not found at {self.path}")
+        return (st.st_dev, st.st_ino)
+
+    def _refresh_identity(self) -> int:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval and self._identity is not None:
+            return self._epoch
+        identity = self._stat_identity()
+        with self._lock:
+            self._checked_at = now
+            if identity != self._identity:
+                if self._identity is not None:
+                    self._epoch += 1
+                self._identity = identity
+            return self._epoch
+
+    def _open(self) -> sqlite3.Connection:
+        uri = Path(self.path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        epoch = self._refresh_identity()
+        with self._lock:
+            self.checkouts += 1
+
+        if not self.enabled:
+            conn = self._open()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and local.epoch != epoch:
+            conn.close()
+            with self._lock:
+                self._conns.pop(threading.get_ident(), None)
+                self.reopened += 1
+            conn = None
+        if conn is None:
+            conn = self._open()
+            local.conn, local.epoch = conn, epoch
+            with self._lock:
+                self._conns[threading.get_ident()] = conn
+        yield conn
+
+    def dedicated(self, pragmas: Optional[Dict[str, Union[int, str]]] = None) -> sqlite3.Connection:
+        """A connection of its own, outside the per-thread pool (the caller
+        closes it): for long reads such as streaming exports, which span many
+        reader-thread hops and must not share a thread's connection.
+        `pragmas` are applied on top of the pool's."""
+        self._stat_identity()            # DatabaseUnavailable if the file is gone
+        conn = self._open()
+        for name, value in (pragmas or {}).items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def close_all(self) -> None:
+        """Close every pooled connection (threads reopen lazily)."""
+        with self._lock:
+            conns, self._conns = list(self._conns.values()), {}
+            self._epoch += 1
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "path": self.path,
+                "connections": len(self._conns),
+                "opened": self.opened,
+                "reopened": self.reopened,
+                "checkouts": self.checkouts,
+                "epoch": self._epoch,
+                "pragmas": {k: str(v) for k, v in self.pragmas.items()},
+            }
+
+def check_schema(pool: ReadPool, required: int = REQUIRED_SCHEMA_VERSION) -> int:
+    """Fail fast at startup if migrations have not been applied. Never writes."""
+    with pool.connection() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < required:
+        raise SchemaOutdated(
+            f"{pool.path} is at schema version {version}, API needs {required}. "
+            f"Run: python steamcharts_scraper/db/migrate.py {pool.path}"
+        )
+    return version
+
+def check_objects(pool: ReadPool, names: Iterable[str]) -> None:
+    """Fail fast at startup if tables / indexes a caller queries are missing,
+    for DBs that carry only part of the schema (api/app.py's steam_items).
+    Never writes."""
+    with pool.connection() as conn:
+        present = {name for (name,) in conn.execute("SELECT name FROM sqlite_master")}
+    missing = [name for name in names if name not in present]
+    if missing:
+        raise SchemaOutdated(
+            f"{pool.path} lacks {', '.join(missing)}. "
+            f"Run: python steamcharts_scraper/db/migrate.py {pool.path}"
+        )
@@ -0,0 +1,29 @@
+# backend/encode.py
+# JSON bodies straight from rows for the hot endpoints (backend/main.py,
+# api/app.py). Routes keep their response_model (so /openapi.json is
+# unchanged) but return a ready Response, which FastAPI sends as is instead
+# of building and validating one Pydantic model per row.
+# orjson when installed, the json module otherwise (same bytes for our data).
+import json
+from typing import Any, Iterable, List, Optional, Sequence
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:                      # optional; pip install orjson
+    orjson = None
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, like Pydantic's model_dump_json()."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def records(rows: Iterable[Sequence], fields: Sequence[str]) -> List[dict]:
+    """Row tuples (or sqlite3.Row) -> dicts keyed by `fields`, in order;
+    extra trailing columns (sort_key, row_id) are dropped."""
+    return [dict(zip(fields, r)) for r in rows]
+
+def json_response(obj: Any, headers: Optional[dict] = None) -> Response:
+    return Response(content=dumps(obj), media_type="application/json", headers=headers)
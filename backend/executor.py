@@ -0,0 +1,80 @@
+# backend/executor.py
+# Off-loop SQLite execution for the async endpoints in backend/main.py and
+# api/app.py: a small, dedicated pool of reader threads (each keeps its
+# ReadPool connection) instead of Starlette's shared threadpool, a bound on
+# queued work, and coalescing of identical in-flight requests.
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+class Overloaded(RuntimeError):
+    pass
+
+class DBExecutor:
+    """Bounded reader-thread pool; `coalesce` shares one execution between
+    requests with the same key that overlap in time (event-loop side only,
+    so no locking: every call happens on the loop thread)."""
+
+    def __init__(self, workers: int = 8, max_pending: int = 1000, coalescing: bool = True):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.coalescing = coalescing
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqlite-read")
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.pending = 0
+        self.peak_pending = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """fn(*args) on a reader thread; Overloaded once max_pending jobs are queued."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{self.pending} queries queued")
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(fn, *args))
+        finally:
+            self.pending -= 1
+            self.executed += 1
+
+    async def coalesce(self, key: Hashable, fn: Callable, *args) -> Tuple[Any, bool]:
+        """(result, shared): joins an identical in-flight call instead of running
+        fn again. The result (or exception) is shared, so fn must not depend on
+        anything outside `key`."""
+        if not self.coalescing:
+            return await self.run(fn, *args), False
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+        task = asyncio.ensure_future(self.run(fn, *args))
+        self._inflight[key] = task
+        task.add_done_callback(functools.partial(self._done, key))
+        # shielded: a leader that disconnects does not cancel its followers
+        return await asyncio.shield(task), False
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()             # retrieved, even if every waiter went away
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "coalescing": self.coalescing,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "in_flight_keys": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,152 @@
+# backend/export.py
+# Streaming bulk exports (/export/games, /export/snapshots in backend/main.py).
+# One SELECT on a dedicated read-only connection (a consistent snapshot for
+# the whole download), read with fetchmany and encoded batch by batch, so
+# server memory stays at one batch whatever the export size.
+# NDJSON and CSV can be gzipped on the fly; Parquet and Arrow (IPC stream)
+# need pyarrow (optional) and are compressed by their own format.
+import csv
+import io
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+from encode import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:                      # optional; pip install pyarrow
+    pa = pq = None
+
+BATCH = 5000                             # rows per fetchmany (NDJSON / CSV)
+COLUMNAR_BATCH = 65536                   # rows per Arrow batch / Parquet row group
+GZIP_LEVEL = 5
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+COLUMNAR = ("parquet", "arrow")
+
+def columnar_available() -> bool:
+    return pa is not None
+
+class _Sink:
+    """Write-only file for pyarrow writers; bytes are taken out after every batch."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.pos = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def take(self) -> bytes:
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+class Export:
+    """One export: call chunk() until it returns None, then close().
+
+    columns: {name: "int" | "float" | "str"} in SELECT order (types only
+    matter for Parquet / Arrow). chunk() and close() may run on different
+    threads, one at a time; close() also stops an unfinished export.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, sql: str, params: Sequence, columns: Dict[str, str],
+                 fmt: str, gzip: bool = False):
+        if fmt in COLUMNAR and pa is None:
+            raise RuntimeError(f"{fmt} export needs pyarrow")
+        self.conn = conn
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.rows = 0
+        self._lock = threading.Lock()
+        self._zip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) if gzip and fmt not in COLUMNAR else None
+        self._done = False
+        self._cur = conn.cursor()
+        self._cur.row_factory = None     # plain tuples
+        self._cur.execute(sql, params)
+        self._batch = COLUMNAR_BATCH if fmt in COLUMNAR else BATCH
+        self._started = False
+        if fmt in COLUMNAR:
+            types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string()}
+            self._schema = pa.schema([(name, types[t]) for name, t in columns.items()])
+            self._sink = _Sink()
+            self._writer = (pq.ParquetWriter(self._sink, self._schema, compression="zstd") if fmt == "parquet"
+                            else pa.ipc.new_stream(self._sink, self._schema))
+
+    def _encode(self, rows: list) -> bytes:
+        if self.fmt == "ndjson":
+            names = self.columns
+            return b"".join(dumps(dict(zip(names, r))) + b"\n" for r in rows)
+        if self.fmt == "csv":
+            buf = io.StringIO()
+            w = csv.writer(buf, lineterminator="\n")
+            if not self._started:
+                w.writerow(self.columns)
+            w.writerows(rows)
+            return buf.getvalue().encode("utf-8")
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(col, type=self._schema.field(i).type) for i, col in enumerate(zip(*rows))],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+        return self._sink.take()
+
+    def _finish(self) -> bytes:
+        out = b""
+        if self.fmt == "csv" and not self._started:
+            out = self._encode([])       # header only
+        if self.fmt in COLUMNAR:
+            self._writer.close()         # Parquet footer / end-of-stream marker
+            out = self._sink.take()
+        return out
+
+    def chunk(self) -> Optional[bytes]:
+        """Next piece of the body (never empty), or None when the export is done."""
+        with self._lock:
+            while not self._done:
+                rows = self._cur.fetchmany(self._batch)
+                if rows:
+                    data = self._encode(rows)
+                    self._started = True
+                    self.rows += len(rows)
+                else:
+                    data = self._finish()
+                    self._done = True
+                if self._zip is not None:
+                    data = self._zip.compress(data) + (self._zip.flush() if self._done else b"")
+                if data:
+                    return data
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            self._done = True
+            try:
+                self._cur.close()
+            finally:
+                self.conn.close()
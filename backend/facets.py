@@ -0,0 +1,107 @@
+# backend/facets.py
+# Facet filters and counts for /games over the normalized facet tables
+# (facet_values / app_facets, migration 0012; kept current by upsert_catalog.py).
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+KINDS = ("genre", "category", "developer", "publisher")
+
+# Apps having any of the given values of one kind: a UNIQUE(kind, value)
+# lookup per value, then an app_facets primary-key range per value.
+# SQLite drives the query from that set (then sorts it). A page sorted by an
+# indexed column over many matches is cheaper the other way round: walk the
+# sort index and test each app with PROBE_SQL (primary-key lookups, nothing
+# materialized) until the page is full. Worth it from PROBE_MIN matches.
+FILTER_SQL = (
+    "{col} IN (SELECT af.app_id FROM facet_values f"
+    " JOIN app_facets af ON af.facet_id = f.facet_id"
+    " WHERE f.kind = ? AND f.value IN ({marks}))"
+)
+
+PROBE_SQL = (
+    "EXISTS (SELECT 1 FROM facet_values f"
+    " JOIN app_facets af ON af.facet_id = f.facet_id AND af.app_id = {col}"
+    " WHERE f.kind = ? AND f.value IN ({marks}))"
+)
+
+PROBE_MIN = 1000
+
+# Top values per kind over a result set (`ids_sql` yields app_id). A narrowed
+# set is walked app by app through idx_app_facets_app; the whole catalog
+# (no filters) is cheaper as one pass over app_facets in primary-key order,
+# checking each app against the set, with no sort for the GROUP BY.
+COUNTS_SQL = """
+SELECT kind, value, n FROM (
+  SELECT f.kind AS kind, f.value AS value, c.n AS n,
+         ROW_NUMBER() OVER (PARTITION BY f.kind ORDER BY c.n DESC, f.value) AS pos
+  FROM ({counts_sql}) AS c
+  JOIN facet_values f ON f.facet_id = c.facet_id
+  WHERE f.kind IN ({kinds})
+)
+WHERE pos <= ?
+ORDER BY kind, pos
+"""
+
+WALK_SQL = """
+  SELECT af.facet_id, COUNT(*) AS n
+  FROM ({ids_sql}) AS r JOIN app_facets af ON af.app_id = r.app_id
+  GROUP BY af.facet_id
+"""
+
+SCAN_SQL = """
+  SELECT af.facet_id, COUNT(*) AS n
+  FROM app_facets af WHERE +af.app_id IN ({ids_sql})
+  GROUP BY af.facet_id
+"""
+
+def normalize(values: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    """Query values -> sorted, de-duplicated tuple (also the cache key).
+    Matching is case-insensitive for ASCII (facet_values.value is COLLATE NOCASE)."""
+    return tuple(sorted({v.strip() for v in values or () if v and v.strip()}))
+
+def facet_filters(col: str, selected: Dict[str, Tuple[str, ...]], skip: Optional[str] = None,
+                  probe: bool = False) -> Tuple[List[str], tuple]:
+    """WHERE fragments + params: every kind must match, any value within a kind."""
+    where, params = [], ()
+    for kind, values in selected.items():
+        if values and kind != skip:
+            sql = PROBE_SQL if probe else FILTER_SQL
+            where.append(sql.format(col=col, marks=", ".join("?" * len(values))))
+            params += (kind,) + values
+    return where, params
+
+def facet_counts(conn: sqlite3.Connection, ids_sql: str, params: tuple,
+                 kinds: Sequence[str], limit: int, scan: bool = False) -> Dict[str, List[Tuple[str, int]]]:
+    """{kind: [(value, count), ...]} for the top `limit` values of each kind."""
+    out: Dict[str, List[Tuple[str, int]]] = {kind: [] for kind in kinds}
+    if not kinds:
+        return out
+    counts_sql = (SCAN_SQL if scan else WALK_SQL).format(ids_sql=ids_sql)
+    sql = COUNTS_SQL.format(counts_sql=counts_sql, kinds=", ".join("?" * len(kinds)))
+    for kind, value, n in conn.execute(sql, params + tuple(kinds) + (limit,)):
+        out[kind].append((value, n))
+    return out
+
+def facet_summary(conn: sqlite3.Connection, col: str, from_sql: str, where: List[str], params: tuple,
+                  selected: Dict[str, Tuple[str, ...]], limit: int,
+                  everything: bool = False) -> Dict[str, List[Tuple[str, int]]]:
+    """Facet counts for the result set `from_sql` + `where` + the selected facets.
+
+    A kind with a selection is counted without its own filter (values within
+    a kind are alternatives), so picking "Action" still shows how many apps
+    "Indie" would add. Kinds without a selection share one query.
+    everything: from_sql + where alone select every app (no q).
+    """
+    groups = [(None, [k for k in KINDS if not selected.get(k)])]
+    groups += [(k, [k]) for k in KINDS if selected.get(k)]
+    out: Dict[str, List[Tuple[str, int]]] = {}
+    for skip, kinds in groups:
+        if not kinds:
+            continue
+        conds, cond_params = facet_filters(col, selected, skip=skip)
+        conds = where + conds
+        where_sql = (" WHERE " + " AND ".join(conds)) if conds else ""
+        ids_sql = f"SELECT {col} AS app_id{from_sql}{where_sql}"
+        out.update(facet_counts(conn, ids_sql, params + cond_params, kinds, limit,
+                                scan=everything and not conds))
+    return {kind: out[kind] for kind in KINDS}
@@ -0,0 +1,26 @@
+# backend/fts.py
+# FTS5 helpers shared by backend/main.py and api/app.py
+import re
+import sqlite3
+from typing import Optional
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def match_expr(q: str, column: Optional[str] = None) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every token must match, each as a prefix, so "count str" finds
+    "Counter-Strike". Returns None if q has no tokens.
+    """
+    tokens = TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    terms = [f'"{t}"*' for t in tokens]
+    expr = " AND ".join(terms)
+    return f"{{{column}}} : ({expr})" if column else expr
+
+def fts_available(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
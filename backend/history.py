@@ -0,0 +1,123 @@
+# backend/history.py
+# Per-app player history for /games/{app_id}/history: buckets aggregated in SQL
+# (rollup tables or raw snapshots), then LTTB-downsampled to a fixed number of points.
+import sqlite3
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+MAX_POINTS = 500
+
+# Day / week buckets come from the rollup tables (migration 0010, maintained by
+# the snapshot loaders), so years of history cost one row per bucket. Hour
+# buckets aggregate raw snapshots, which only reach back to the compaction
+# horizon (rollups.py compact); snapshots.ts is ISO text, so the hour is a prefix.
+# Every query returns (bucket, min, sum, n, max, peak, samples).
+HOURLY_SQL = """
+SELECT substr(ts, 1, 13) AS bucket,
+       MIN(avg_players), SUM(avg_players), COUNT(avg_players),
+       MAX(avg_players), MAX(peak_players), COUNT(*)
+FROM snapshots
+WHERE app_id = ? AND ts >= ? AND ts < ?
+GROUP BY bucket
+ORDER BY bucket
+"""
+
+ROLLUP_SQL = """
+SELECT {key} AS bucket, min_avg, sum_avg, n_avg, max_avg, peak, samples
+FROM {table}
+WHERE app_id = ? AND {key} >= ? AND {key} < ?
+ORDER BY {key}
+"""
+
+BUCKET_SQL = {
+    "hour": HOURLY_SQL,
+    "day": ROLLUP_SQL.format(table="snapshots_daily", key="day"),
+    "week": ROLLUP_SQL.format(table="snapshots_weekly", key="week"),
+}
+
+def ts_bound(value: Optional[str], default: str, name: str) -> str:
+    """from/to query value -> text comparable with snapshots.ts (naive UTC ISO)."""
+    if not value:
+        return default
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}': expected an ISO date or datetime")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat()
+
+def week_start(day: str) -> str:
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+def rollup_bounds(bucket: str, start: str, end: str) -> Tuple[str, str]:
+    """ts_bound() values -> day / week keys for `key >= ? AND key < ?`: the
+    bucket holding `start`, and the first bucket starting at `end` or later
+    (so `to` stays exclusive: to=2025-09-07 ends with the 09-06 day)."""
+    if bucket == "week":
+        start = week_start(start[:10]) if start else start
+    else:
+        start = start[:10]
+    try:
+        dt = datetime.fromisoformat(end)
+    except ValueError:
+        return start, end[:10]                   # open end ("9999")
+    day = dt.date() + timedelta(days=1 if dt.time() != time() else 0)
+    if bucket == "week" and day.weekday():
+        day += timedelta(days=7 - day.weekday())
+    return start, day.isoformat()
+
+def fetch_buckets(conn: sqlite3.Connection, app_id: int, bucket: str, start: str, end: str) -> List[tuple]:
+    """[(bucket, min, sum, n, max, peak, samples), ...] in time order, for buckets
+    starting before `end` that hold `start` or later.
+    bucket is the ISO start: 'YYYY-MM-DDTHH' (hour), 'YYYY-MM-DD' (day, week = Monday)."""
+    if bucket != "hour":
+        start, end = rollup_bounds(bucket, start, end)
+    return conn.execute(BUCKET_SQL[bucket], (app_id, start, end)).fetchall()
+
+def bucket_iso(key: str) -> str:
+    """'YYYY-MM-DDTHH' / 'YYYY-MM-DD' -> 'YYYY-MM-DDTHH:MM:SS'"""
+    return key + (":00:00" if len(key) == 13 else "T00:00:00")
+
+def bucket_epoch(key: str) -> float:
+    return datetime.fromisoformat(bucket_iso(key)).replace(tzinfo=timezone.utc).timestamp()
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of the series (first and last point always kept)."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    picked = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # average of the next bucket is the third triangle corner
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        span = nxt_hi - nxt_lo
+        avg_x = sum(xs[nxt_lo:nxt_hi]) / span
+        avg_y = sum(ys[nxt_lo:nxt_hi]) / span
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
+
+def downsample(rows: List[tuple], points: int) -> List[tuple]:
+    """At most `points` buckets, picked by LTTB on the bucket mean."""
+    if len(rows) <= points:
+        return rows
+    xs = [bucket_epoch(r[0]) for r in rows]
+    ys = [r[2] / r[3] if r[3] else 0 for r in rows]
+    return [rows[i] for i in lttb(xs, ys, points)]
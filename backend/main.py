@@ -1,12 +1,29 @@
 # backend/main.py
+import asyncio
 import os
 import re
 import sqlite3
-from typing import List, Literal, Optional, Tuple
-from fastapi import FastAPI, HTTPException, Query
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Literal, Optional, Tuple
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from encode import dumps, json_response, records
+from db import DatabaseUnavailable, ReadPool, check_schema
+from executor import DBExecutor, Overloaded
+from export import COLUMNAR, MEDIA_TYPES, Export, columnar_available
+from counts import StepTimer, TotalsCache, data_generation, resolve_total
+from facets import FILTER_SQL, PROBE_MIN, PROBE_SQL, facet_summary, normalize
+from fts import fts_available, match_expr
+from history import MAX_POINTS, bucket_iso, downsample, fetch_buckets, rollup_bounds, ts_bound
+from paging import decode_cursor, keyset_params, next_cursor
+from query import Source
+from respcache import CachedResponse, ResponseCache
+from suggest import MAX_LIMIT as SUGGEST_MAX, Suggester
+
 # ======== CONFIG ========
 DB_PATH = os.getenv("GSE_DB", r"C:\\GameSearch\\steamcharts_scraper\\db\\steamcharts.db")
 TABLE_NAME = os.getenv("GSE_TABLE", "steamcharts_top")
@@ -17,6 +34,9 @@ COL_NAME     = os.getenv("GSE_COL_NAME",     "name")
 COL_CUR      = os.getenv("GSE_COL_CUR",      "current_players")
 COL_PEAK24   = os.getenv("GSE_COL_PEAK24",   "peak_24h")
 COL_PEAK_ALL = os.getenv("GSE_COL_PEAK_ALL", "all_time_peak")
+# app_id again, from the table the name index is on (apps, in the view; migration 0013).
+# Name sorts break ties on it so the index serves the whole ORDER BY.
+COL_NAME_ID  = os.getenv("GSE_COL_NAME_ID",  "apps_app_id")
 
 SORT_KEYS = {
     "name": f"LOWER({COL_NAME}) ASC",
@@ -27,8 +47,13 @@ SORT_KEYS = {
     "-peak24": f"{COL_PEAK24} ASC",
     "peak": f"{COL_PEAK_ALL} DESC",
     "-peak": f"{COL_PEAK_ALL} ASC",
+    # Only meaningful with q (FTS path); otherwise falls back to "current"
+    "relevance": "fts_rank ASC",
 }
 
+FTS_TABLE = "apps_fts"
+FTS_ENABLED = False  # set at startup when the DB has the apps_fts index
+
 IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
 def _assert_ident(x: str) -> str:
@@ -37,9 +62,28 @@ def _assert_ident(x: str) -> str:
     return x
 
 # Validate identifiers early (defense-in-depth against env misconfig)
-for ident in [TABLE_NAME, COL_APP_ID, COL_NAME, COL_CUR, COL_PEAK24, COL_PEAK_ALL]:
+for ident in [TABLE_NAME, COL_APP_ID, COL_NAME, COL_CUR, COL_PEAK24, COL_PEAK_ALL, COL_NAME_ID]:
     _assert_ident(ident)
 
+# /games queries, compiled once per shape (backend/query.py). "text" adds the
+# FTS5 match (its rank is bm25, so "relevance" sorts best-first); facet
+# filters (migration 0012): every facet must match, any value within one.
+GAMES = Source(
+    from_sql=f" FROM {TABLE_NAME}",
+    text_from=(f" FROM (SELECT rowid AS fts_id, rank AS fts_rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?) AS m"
+               f" JOIN {TABLE_NAME} ON {COL_APP_ID} = m.fts_id"),
+    columns=f"{COL_APP_ID} AS app_id, {COL_NAME} AS name, "
+            f"{COL_CUR} AS current, {COL_PEAK24} AS peak24, {COL_PEAK_ALL} AS peak",
+    id_col=COL_APP_ID,
+    sorts=SORT_KEYS,
+    ties={"name": COL_NAME_ID, "-name": COL_NAME_ID},
+    conds={
+        "like": f"LOWER({COL_NAME}) LIKE ?",
+        "facet": FILTER_SQL.format(col=COL_APP_ID, marks="{marks}"),
+        "facet_probe": PROBE_SQL.format(col=COL_APP_ID, marks="{marks}"),
+    },
+)
+
 app = FastAPI(title="GameSearch API", version="1.0.0")
 app.add_middleware(
     CORSMiddleware,
@@ -51,97 +95,466 @@ app.add_middleware(
 
 class Game(BaseModel):
     app_id: int
-    name: str
+    name: Optional[str] = None       # NULL for apps seen in snapshots but not yet named
     current: Optional[int] = None
     peak24: Optional[int] = None
     peak: Optional[int] = None
 
+class Suggestion(BaseModel):
+    app_id: int
+    name: str
+    current: int                     # 0 when the app has no snapshot yet
+
+class SuggestResponse(BaseModel):
+    q: str
+    items: List[Suggestion]
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
 class PagedResponse(BaseModel):
-    total: int
+    total: Optional[int] = None      # None with include_total=false
+    total_exact: bool = True         # False when total is an estimate / lower bound
     page: int
     size: int
     items: List[Game]
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, List[FacetCount]]] = None   # with facets=true
+
+class TrendingGame(Game):
+    previous: int                    # avg players about one window earlier
+    delta: int                       # current - previous (latest snapshot)
+    pct: Optional[float] = None      # delta in percent of previous
+
+class TrendingResponse(BaseModel):
+    window: str
+    sort: str
+    total: Optional[int] = None
+    page: int
+    size: int
+    items: List[TrendingGame]
+
+class HistoryPoint(BaseModel):
+    ts: str                          # bucket start (UTC)
+    min: Optional[int] = None        # min / avg / max of avg_players in the bucket
+    avg: Optional[float] = None
+    max: Optional[int] = None
+    peak: Optional[int] = None       # max peak_players in the bucket
+    samples: int
+
+class HistoryResponse(BaseModel):
+    app_id: int
+    bucket: str
+    buckets: int                     # buckets in range, before downsampling
+    downsampled: bool
+    items: List[HistoryPoint]
+
+# Row columns in response order; endpoints serialize rows directly (encode.py)
+GAME_FIELDS = tuple(Game.model_fields)
+SUGGESTION_FIELDS = tuple(Suggestion.model_fields)
+TRENDING_FIELDS = tuple(TrendingGame.model_fields)
 
-def get_conn() -> sqlite3.Connection:
-    if not os.path.exists(DB_PATH):
-        raise HTTPException(status_code=500, detail=f"DB not found at {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+TOTALS = TotalsCache()
+FACET_COUNTS = TotalsCache(max_entries=256)   # facet counts per filter, same invalidation
+
+# Serialized /games responses per normalized query, dropped on every data
+# generation bump; GSE_RESPONSE_CACHE=0 turns it off
+RESPONSES = ResponseCache(
+    max_entries=int(os.getenv("GSE_RESPONSE_CACHE_ENTRIES", "512")),
+    ttl=float(os.getenv("GSE_RESPONSE_CACHE_TTL", "300")),
+    enabled=os.getenv("GSE_RESPONSE_CACHE", "1") != "0",
+)
+
+# Thread-local read-only connections; GSE_POOL=0 reverts to connect-per-request.
+# Each keeps up to GSE_CACHED_STATEMENTS prepared statements (one per compiled query).
+POOL = ReadPool(DB_PATH, enabled=os.getenv("GSE_POOL", "1") != "0",
+                cached_statements=int(os.getenv("GSE_CACHED_STATEMENTS", "1024")))
+
+# In-memory name index for /games/suggest, built at startup and rebuilt in
+# the background after a data generation bump (looked at every N seconds)
+SUGGEST = Suggester(POOL.connection, lambda: POOL.dedicated({"cache_size": -2048}),
+                    recheck=float(os.getenv("GSE_SUGGEST_RECHECK", "1")))
+
+# Endpoints are async; SQLite work runs on these reader threads (each with
+# its pooled connection). Identical in-flight queries share one execution
+# (GSE_COALESCE=0 turns that off); past GSE_DB_QUEUE queued queries -> 503.
+DB = DBExecutor(
+    workers=int(os.getenv("GSE_DB_WORKERS", "8")),
+    max_pending=int(os.getenv("GSE_DB_QUEUE", "1000")),
+    coalescing=os.getenv("GSE_COALESCE", "1") != "0",
+)
+
+async def run_db(fn: Callable, *args, key: Optional[Hashable] = None) -> Tuple[Any, bool]:
+    """fn(*args) on a reader thread -> (result, shared with an identical in-flight request)."""
+    try:
+        if key is None:
+            return await DB.run(fn, *args), False
+        return await DB.coalesce(key, fn, *args)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=f"Busy: {e}", headers={"Retry-After": "1"})
+
+@contextmanager
+def get_conn() -> Iterator[sqlite3.Connection]:
+    try:
+        with POOL.connection() as conn:
+            yield conn
+    except DatabaseUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 @app.get("/health")
-def health():
+async def health():
     return {"ok": True}
 
+@app.get("/stats")
+async def stats():
+    return {"pool": POOL.stats(), "totals_cache": TOTALS.stats(), "facet_cache": FACET_COUNTS.stats(),
+            "response_cache": RESPONSES.stats(), "suggest": SUGGEST.stats(), "executor": DB.stats(),
+            "plans": GAMES.stats()}
+
 @app.get("/games", response_model=PagedResponse)
-def list_games(
-    q: Optional[str] = Query(None, description="Search by name substring"),
-    sort: Optional[Literal["name","-name","current","-current","peak24","-peak24","peak","-peak"]] = "current",
+async def list_games(
+    q: Optional[str] = Query(None, description="Search by name (token/prefix match, substring fallback)"),
+    sort: Optional[Literal["name","-name","current","-current","peak24","-peak24","peak","-peak","relevance"]] = "current",
     page: int = Query(1, ge=1),
     size: int = Query(25, ge=1, le=200),
+    fields: Literal["name", "all"] = Query("name", description="FTS scope: name only, or name+description+developers+genres"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (keyset paging; page is ignored)"),
+    include_total: Literal["exact", "estimate", "false"] = Query("exact", description="exact (cached per data generation), estimate (cheap, may be a lower bound) or false"),
+    genre: Optional[List[str]] = Query(None, description="Repeatable; any of the values (AND across facets)"),
+    category: Optional[List[str]] = Query(None, description="Repeatable; any of the values"),
+    developer: Optional[List[str]] = Query(None, description="Repeatable; any of the values"),
+    publisher: Optional[List[str]] = Query(None, description="Repeatable; any of the values"),
+    facets: bool = Query(False, description="Also return value counts per facet for this result set"),
+    facet_size: int = Query(10, ge=1, le=100, description="Values per facet with facets=true"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    offset = (page - 1) * size
-    where = []
-    params: Tuple = tuple()
+    sort = sort or "current"
+    selected = {"genre": normalize(genre), "category": normalize(category),
+                "developer": normalize(developer), "publisher": normalize(publisher)}
+    cache_key = (q, sort, page, size, fields, cursor, include_total, *selected.values(), facets, facet_size)
+    (entry, timing), shared = await run_db(
+        _games_page, q, sort, page, size, fields, cursor, include_total, selected, facets, facet_size, cache_key,
+        key=("games",) + cache_key,
+    )
+    return RESPONSES.respond(entry, if_none_match, timing + (", coalesced" if shared else ""))
+
+def _games_page(q, sort, page, size, fields, cursor, include_total, selected, facets, facet_size,
+                cache_key) -> Tuple[CachedResponse, str]:
+    """The /games body for one normalized request, from the response cache or
+    the DB (reader thread) -> (entry, Server-Timing)."""
+    timer = StepTimer()
+    expr = match_expr(q, None if fields == "all" else "name") if (q and FTS_ENABLED) else None
+
+    with get_conn() as conn:
+        generation = data_generation(conn)
+        cached = RESPONSES.get(cache_key, generation)
+        if cached is not None:
+            return cached, 'cache;desc="hit"'
+
+        hit = False
+        if expr:
+            base_conds: Tuple = ()
+            params: Tuple = (expr,)
+            count_key = ("games", "fts", expr)
+            probe_sql = GAMES.plan(True, (), "relevance").exists_sql
+            hit = timer.time("match", lambda: conn.execute(probe_sql, params).fetchone()) is not None
+
+        if not hit:
+            # No query, no FTS5, no tokens, or no token match (e.g. infix "trike"): plain/LIKE path
+            if sort == "relevance":
+                sort = "current"
+            base_conds = ()
+            params = ()
+            count_key = ("games", "all")
+            if q:
+                base_conds = (("like", 1),)
+                params = (f"%{q.lower()}%",)
+                count_key = ("games", "like", q.lower())
+
+        base_params = params
+        facet_conds = tuple((kind, len(v)) for kind, v in selected.items() if v)
+        if facet_conds:
+            count_key += (tuple((k, v) for k, v in selected.items() if v),)
+            for kind, values in selected.items():
+                if values:
+                    params += (kind,) + values
+        conds = base_conds + tuple(("facet", n) for _, n in facet_conds)
+
+        plan = GAMES.plan(hit, conds, sort)
+        t0 = time.perf_counter()
+        total, total_exact, source = resolve_total(
+            conn, TOTALS, count_key, include_total, plan.count_sql, params, generation, plan.estimate_sql,
+        )
+        timer.add("count", (time.perf_counter() - t0) * 1000, source)
+
+        # Many facet matches and an indexed sort: walk the sort index, probing the facet sets
+        if facet_conds and not hit and (total or 0) >= PROBE_MIN:
+            conds = base_conds + tuple(("facet_probe", n) for _, n in facet_conds)
 
-    if q:
-        where.append(f"LOWER({COL_NAME}) LIKE ?")
-        params += (f"%{q.lower()}%",)
+        # app_id breaks ties (same direction, so one index serves the ORDER BY);
+        # OFFSET and cursor walks see one stable order
+        if cursor:
+            key, last_id = decode_cursor(cursor, sort)
+            plan = GAMES.plan(hit, conds, sort, "after" if key is not None else "after_null")
+            rows = timer.time("page", lambda: conn.execute(
+                plan.page_sql, params + keyset_params(key, last_id) + (size,)).fetchall())
+            if plan.tail_sql and len(rows) < size:
+                rows += conn.execute(plan.tail_sql, params + (size - len(rows),)).fetchall()
+        else:
+            plan = GAMES.plan(hit, conds, sort)
+            rows = timer.time("page", lambda: conn.execute(
+                plan.page_sql, params + (size, (page - 1) * size)).fetchall())
 
-    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
-    order_sql = f" ORDER BY {SORT_KEYS.get(sort or 'current')}"
+        facet_out = None
+        if facets:
+            facet_key = count_key + (facet_size,)
+            cached = FACET_COUNTS.get(facet_key)
+            if cached is not None and generation is not None and cached[0] == generation:
+                facet_out = cached[1]
+                timer.add("facets", 0.0, "cache")
+            else:
+                from_sql, base_where = GAMES.fragments(hit, base_conds)
+                facet_out = timer.time("facets", lambda: facet_summary(
+                    conn, COL_APP_ID, from_sql, base_where, base_params, selected, facet_size,
+                    everything=not q), "query")
+                FACET_COUNTS.put(facet_key, generation, facet_out)
 
-    base_cols = f"{COL_APP_ID} AS app_id, {COL_NAME} AS name, " \
-                f"{COL_CUR} AS current, {COL_PEAK24} AS peak24, {COL_PEAK_ALL} AS peak"
+    # PagedResponse, field for field, without a model per row
+    payload = {
+        "total": total, "total_exact": total_exact, "page": page, "size": size,
+        "items": records(rows, GAME_FIELDS),
+        "next_cursor": next_cursor(rows, size, sort),
+        "facets": {k: [{"value": v, "count": n} for v, n in counts] for k, counts in facet_out.items()}
+        if facet_out is not None else None,
+    }
+    body = timer.time("encode", lambda: dumps(payload))
+    entry = RESPONSES.put(cache_key, generation, body, timer.header())
+    return entry, entry.timing
+
+# Precomputed after every snapshot load (steamcharts_scraper/db/trending.py);
+# "-abs" / "-pct" rank the biggest drops first
+TRENDING_SORT_KEYS = {
+    "abs": "t.delta DESC, t.app_id DESC",
+    "-abs": "t.delta ASC, t.app_id ASC",
+    "pct": "t.pct DESC, t.app_id DESC",
+    "-pct": "t.pct ASC, t.app_id ASC",
+}
+# pct sorts skip apps without a percentage (previous = 0)
+TRENDING_WHERE = {
+    False: " WHERE t.span = ? AND t.previous >= ?",
+    True: " WHERE t.span = ? AND t.previous >= ? AND t.pct IS NOT NULL",
+}
+TRENDING_COUNT_SQL = {pct: f"SELECT COUNT(*) FROM trending t{where}" for pct, where in TRENDING_WHERE.items()}
+TRENDING_PAGE_SQL = {
+    sort: f"SELECT g.{COL_APP_ID} AS app_id, g.{COL_NAME} AS name, g.{COL_CUR} AS current, "
+          f"g.{COL_PEAK24} AS peak24, g.{COL_PEAK_ALL} AS peak, t.previous, t.delta, t.pct"
+          f" FROM trending t JOIN {TABLE_NAME} g ON g.{COL_APP_ID} = t.app_id"
+          f"{TRENDING_WHERE[sort.endswith('pct')]} ORDER BY {order} LIMIT ? OFFSET ?"
+    for sort, order in TRENDING_SORT_KEYS.items()
+}
+
+@app.get("/games/trending", response_model=TrendingResponse)
+async def trending_games(
+    window: Literal["24h", "7d", "30d"] = "24h",
+    sort: Literal["abs", "-abs", "pct", "-pct"] = "abs",
+    min_players: int = Query(100, ge=0, description="Ignore apps that had fewer avg players at the start of the window"),
+    page: int = Query(1, ge=1),
+    size: int = Query(25, ge=1, le=200),
+):
+    (body, timing), shared = await run_db(_trending_page, window, sort, min_players, page, size,
+                                          key=("trending", window, sort, min_players, page, size))
+    return Response(content=body, media_type="application/json",
+                    headers={"Server-Timing": timing + (", coalesced" if shared else "")})
+
+def _trending_page(window, sort, min_players, page, size) -> Tuple[bytes, str]:
+    timer = StepTimer()
+    pct = sort.endswith("pct")
+    params = (window, min_players)
 
     with get_conn() as conn:
-        total = conn.execute(f"SELECT COUNT(*) FROM {_assert_ident(TABLE_NAME)}{where_sql}", params).fetchone()[0]
-        rows = conn.execute(
-            f"SELECT {base_cols} FROM {TABLE_NAME}{where_sql}{order_sql} LIMIT ? OFFSET ?",
-            params + (size, offset),
-        ).fetchall()
+        t0 = time.perf_counter()
+        total, _, source = resolve_total(
+            conn, TOTALS, ("trending", window, pct, min_players), "exact", TRENDING_COUNT_SQL[pct], params,
+        )
+        timer.add("count", (time.perf_counter() - t0) * 1000, source)
+        rows = timer.time("page", lambda: conn.execute(
+            TRENDING_PAGE_SQL[sort], params + (size, (page - 1) * size),
+        ).fetchall())
+
+    body = timer.time("encode", lambda: dumps({"window": window, "sort": sort, "total": total, "page": page,
+                                               "size": size, "items": records(rows, TRENDING_FIELDS)}))
+    return body, timer.header()
 
-    items = [Game(**dict(r)) for r in rows]
-    return PagedResponse(total=total, page=page, size=size, items=items)
+@app.get("/games/suggest", response_model=SuggestResponse)
+async def suggest_games(
+    q: str = Query("", max_length=100, description="Start of the name or of any word in it"),
+    limit: int = Query(10, ge=1, le=SUGGEST_MAX),
+):
+    timer = StepTimer()
+    # In memory: answered on the event loop; only the periodic generation
+    # check (and the very first build) touches SQLite
+    index = SUGGEST.index
+    if index is None or SUGGEST.check_due():
+        t0 = time.perf_counter()
+        try:
+            index, _ = await run_db(SUGGEST.current)
+        except DatabaseUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        timer.add("index", (time.perf_counter() - t0) * 1000)
+    items = timer.time("lookup", lambda: index.suggest(q, limit))
+    return json_response({"q": q, "items": records(items, SUGGESTION_FIELDS)},
+                         headers={"Server-Timing": timer.header()})
 
 @app.get("/games/{app_id}", response_model=Game)
-def get_game(app_id: int):
-    base_cols = f"{COL_APP_ID} AS app_id, {COL_NAME} AS name, {COL_CUR} AS current, {COL_PEAK24} AS peak24, {COL_PEAK_ALL} AS peak"
-    with get_conn() as conn:
-        row = conn.execute(
-            f"SELECT {base_cols} FROM {TABLE_NAME} WHERE {COL_APP_ID} = ?",
-            (app_id,),
-        ).fetchone()
+async def get_game(app_id: int):
+    row, _ = await run_db(_game_row, app_id)
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
-    return Game(**dict(row))
+    return json_response(records((row,), GAME_FIELDS)[0])
 
-@app.on_event("startup")
-def ensure_indexes():
+GAME_ROW_SQL = f"SELECT {GAMES.columns} FROM {TABLE_NAME} WHERE {COL_APP_ID} = ?"
+
+def _game_row(app_id: int) -> Optional[sqlite3.Row]:
     with get_conn() as conn:
-        # Helpful indexes on the REAL tables
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_apps_name ON apps(name)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_app_id ON snapshots(app_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON snapshots(ts)")
-        conn.commit()
-
-        # View that matches what the API expects (latest snapshot per app)
-        conn.execute("DROP VIEW IF EXISTS steamcharts_top")
-        conn.execute("""
-        CREATE VIEW IF NOT EXISTS steamcharts_top AS
-        SELECT
-        a.app_id            AS app_id,
-        a.name              AS name,
-        s.avg_players       AS current_players,
-        s.peak_players      AS peak_24h,
-        s.peak_players      AS all_time_peak
-        FROM apps a
-        JOIN snapshots s
-        ON s.app_id = a.app_id
-        WHERE s.ts = (
-        SELECT MAX(s2.ts)
-        FROM snapshots s2
-        WHERE s2.app_id = a.app_id
-        )
-        """)
-        conn.commit()
+        return conn.execute(GAME_ROW_SQL, (app_id,)).fetchone()
+
+@app.get("/games/{app_id}/history", response_model=HistoryResponse)
+async def game_history(
+    app_id: int,
+    from_: Optional[str] = Query(None, alias="from", description="ISO date/datetime (inclusive); default: first snapshot"),
+    to: Optional[str] = Query(None, description="ISO date/datetime (exclusive); default: now"),
+    bucket: Literal["hour", "day", "week"] = "day",
+    points: int = Query(MAX_POINTS, ge=3, le=5000, description="Max points returned (LTTB downsampling beyond that)"),
+):
+    start = ts_bound(from_, "", "from")
+    end = ts_bound(to, "9999", "to")
+    (body, timing), shared = await run_db(_history, app_id, bucket, start, end, points,
+                                          key=("history", app_id, bucket, start, end, points))
+    return Response(content=body, media_type="application/json",
+                    headers={"Server-Timing": timing + (", coalesced" if shared else "")})
+
+def _history(app_id, bucket, start, end, points) -> Tuple[bytes, str]:
+    timer = StepTimer()
+    with get_conn() as conn:
+        rows = timer.time("buckets", lambda: fetch_buckets(conn, app_id, bucket, start, end))
+        if not rows and conn.execute("SELECT 1 FROM apps WHERE app_id = ?", (app_id,)).fetchone() is None:
+            raise HTTPException(status_code=404, detail="Not found")
+
+    picked = timer.time("downsample", lambda: downsample(rows, points))
+    items = [
+        {"ts": bucket_iso(b), "min": lo, "avg": round(total / n, 1) if n else None,
+         "max": hi, "peak": peak, "samples": samples}
+        for b, lo, total, n, hi, peak, samples in picked
+    ]
+    body = timer.time("encode", lambda: dumps({"app_id": app_id, "bucket": bucket, "buckets": len(rows),
+                                               "downsampled": len(picked) < len(rows), "items": items}))
+    return body, timer.header()
+
+# Bulk exports: whole tables streamed from one SELECT each (export.py), at
+# most GSE_EXPORT_MAX at a time (each holds its own connection)
+EXPORT_MAX = int(os.getenv("GSE_EXPORT_MAX", "4"))
+EXPORTS_ACTIVE = 0
+
+GAME_EXPORT_COLUMNS = {"app_id": "int", "name": "str", "current": "int", "peak24": "int", "peak": "int"}
+SNAPSHOT_EXPORT_COLUMNS = {"ts": "str", "app_id": "int", "rank": "int", "avg_players": "int", "peak_players": "int"}
+ROLLUP_EXPORT_COLUMNS = {"app_id": "int", "min": "int", "avg": "float", "max": "int", "peak": "int", "samples": "int"}
+
+SNAPSHOT_EXPORT_SQL = {
+    # raw rows only reach back to the compaction horizon (rollups.py compact)
+    "raw": "SELECT ts, app_id, rank, avg_players, peak_players FROM snapshots"
+           " WHERE ts >= ? AND ts < ?{app} ORDER BY ts, app_id",
+    "day": "SELECT day, app_id, min_avg, ROUND(1.0 * sum_avg / n_avg, 1), max_avg, peak, samples"
+           " FROM snapshots_daily WHERE day >= ? AND day < ?{app} ORDER BY app_id, day",
+    "week": "SELECT week, app_id, min_avg, ROUND(1.0 * sum_avg / n_avg, 1), max_avg, peak, samples"
+            " FROM snapshots_weekly WHERE week >= ? AND week < ?{app} ORDER BY app_id, week",
+}
+
+GAME_EXPORT_SQL = (f"SELECT {COL_APP_ID}, {COL_NAME}, {COL_CUR}, {COL_PEAK24}, {COL_PEAK_ALL}"
+                   f" FROM {TABLE_NAME} ORDER BY {COL_APP_ID}")
+
+@app.get("/export/games")
+async def export_games(request: Request, format: Literal["ndjson", "csv", "parquet", "arrow"] = "ndjson"):
+    """Every game (the /games columns) by app_id, streamed; gzip with Accept-Encoding: gzip."""
+    return await stream_export(request, "games", GAME_EXPORT_SQL, (), GAME_EXPORT_COLUMNS, format)
+
+@app.get("/export/snapshots")
+async def export_snapshots(
+    request: Request,
+    format: Literal["ndjson", "csv", "parquet", "arrow"] = "ndjson",
+    grain: Literal["raw", "day", "week"] = "raw",
+    from_: Optional[str] = Query(None, alias="from", description="ISO date/datetime (inclusive)"),
+    to: Optional[str] = Query(None, description="ISO date/datetime (exclusive)"),
+    app_id: Optional[int] = Query(None, description="One app only"),
+):
+    """Player history streamed: raw snapshots or the daily / weekly rollups
+    (avg = mean of avg_players over the bucket)."""
+    start, end = ts_bound(from_, "", "from"), ts_bound(to, "9999", "to")
+    columns = SNAPSHOT_EXPORT_COLUMNS
+    if grain != "raw":
+        # buckets starting before `end` that hold `start` or later, as in /history
+        start, end = rollup_bounds(grain, start, end)
+        columns = {grain: "str", **ROLLUP_EXPORT_COLUMNS}
+    params = (start, end) + ((app_id,) if app_id is not None else ())
+    sql = SNAPSHOT_EXPORT_SQL[grain].format(app=" AND app_id = ?" if app_id is not None else "")
+    return await stream_export(request, f"snapshots_{grain}", sql, params, columns, format)
+
+def _open_export(sql, params, columns, fmt, gzip) -> Export:
+    # one pass over the data: a big page cache would only grow with the export
+    conn = POOL.dedicated({"cache_size": -2048})
+    try:
+        return Export(conn, sql, params, columns, fmt, gzip)
+    except Exception:
+        conn.close()
+        raise
+
+async def stream_export(request: Request, name: str, sql: str, params: tuple, columns: dict,
+                        fmt: str) -> StreamingResponse:
+    global EXPORTS_ACTIVE
+    if fmt in COLUMNAR and not columnar_available():
+        raise HTTPException(status_code=501, detail=f"{fmt} export needs pyarrow on the server")
+    if EXPORTS_ACTIVE >= EXPORT_MAX:
+        raise HTTPException(status_code=503, detail="Too many exports running", headers={"Retry-After": "5"})
+    gzip = fmt not in COLUMNAR and "gzip" in request.headers.get("accept-encoding", "")
+    try:
+        export, _ = await run_db(_open_export, sql, params, columns, fmt, gzip)
+    except DatabaseUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    EXPORTS_ACTIVE += 1
+
+    async def body():
+        global EXPORTS_ACTIVE
+        try:
+            while True:
+                try:
+                    chunk = await DB.run(export.chunk)
+                except Overloaded:
+                    await asyncio.sleep(0.05)    # mid-stream: wait for room, no 503 now
+                    continue
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            EXPORTS_ACTIVE -= 1
+            # waits for a chunk still running on a reader thread (client gone mid-batch)
+            asyncio.get_running_loop().run_in_executor(None, export.close)
+
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"', "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+@app.on_event("startup")
+def check_database():
+    # Schema changes happen out of band (steamcharts_scraper/db/migrate.py);
+    # workers only verify the version and read.
+    global FTS_ENABLED
+    check_schema(POOL)
+    with POOL.connection() as conn:
+        FTS_ENABLED = fts_available(conn, FTS_TABLE)
+    SUGGEST.build()
+
+@app.on_event("shutdown")
+def close_pool():
+    DB.shutdown()
+    POOL.close_all()
@@ -0,0 +1,63 @@
+# backend/paging.py
+# Opaque keyset cursors shared by backend/main.py and api/app.py
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+
+def encode_cursor(sort: str, key: Any, row_id: Any) -> str:
+    raw = json.dumps([sort, key, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, Any]:
+    """Return (sort key value, row id) or raise 400 on a malformed/mismatched cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        c_sort, key, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if c_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+    return key, row_id
+
+def split_order(order: str) -> Tuple[str, bool]:
+    """'LOWER(name) DESC' -> ('LOWER(name)', True)"""
+    expr, direction = order.rsplit(" ", 1)
+    return expr, direction.upper() == "DESC"
+
+def keyset_predicate(expr: str, desc: bool, id_col: str, key: Any, row_id: Any) -> Tuple[str, tuple]:
+    """WHERE fragment selecting rows strictly after (key, row_id) in
+    ORDER BY expr DIR, id_col DIR (the id follows the sort direction so an
+    index on expr, which ends in the rowid, serves the whole ORDER BY).
+
+    The leading `expr <= ?` / `expr >= ?` bound is what lets SQLite seek
+    the index instead of scanning from the top. SQLite sorts NULLs first
+    ascending and last descending; see null_tail() for the DESC case.
+    """
+    if key is None:
+        if desc:
+            return f"({expr} IS NULL AND {id_col} < ?)", (row_id,)
+        return f"(({expr} IS NULL AND {id_col} > ?) OR {expr} IS NOT NULL)", (row_id,)
+    if desc:
+        return f"({expr} <= ? AND ({expr} < ? OR {id_col} < ?))", (key, key, row_id)
+    return f"({expr} >= ? AND ({expr} > ? OR {id_col} > ?))", (key, key, row_id)
+
+def keyset_params(key: Any, row_id: Any) -> tuple:
+    """Parameters of keyset_predicate(..., key, row_id), for SQL compiled once
+    (query.py) with placeholder values."""
+    return (row_id,) if key is None else (key, key, row_id)
+
+def null_tail(expr: str, desc: bool, key: Any) -> Optional[str]:
+    """Descending walks reach NULL keys last, and keyset_predicate's bound
+    excludes them; callers top up a short page with rows matching this."""
+    if desc and key is not None:
+        return f"{expr} IS NULL"
+    return None
+
+def next_cursor(rows: list, size: int, sort: str) -> Optional[str]:
+    """Cursor after the last row of a full page; rows carry sort_key and row_id."""
+    if len(rows) < size or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(sort, last["sort_key"], last["row_id"])
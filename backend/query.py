@@ -0,0 +1,122 @@
+# backend/query.py
+# Shared query layer for backend/main.py (/games over steamcharts_top) and
+# api/app.py (/api/search over steam_items). A request is reduced to its
+# shape -- full-text or not, which filters (and how many values each), sort,
+# page mode -- and each shape is compiled once into parameterized SQL and
+# cached; requests only build parameter tuples. The SQL text per shape never
+# changes, so sqlite3's per-connection statement cache (ReadPool
+# cached_statements) reuses the prepared statements too.
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from paging import keyset_predicate, null_tail, split_order
+
+# (condition name, number of values) for each WHERE fragment, in order
+Conds = Tuple[Tuple[str, int], ...]
+
+# Page modes: LIMIT/OFFSET, or keyset after a cursor whose sort key is set / NULL
+PAGE_MODES = ("offset", "after", "after_null")
+
+class Plan(NamedTuple):
+    count_sql: str                   # params: filters
+    estimate_sql: str                # params: filters + (cap,)
+    exists_sql: str                  # params: filters
+    page_sql: str                    # params: filters [+ keyset_params] + (limit[, offset])
+    tail_sql: Optional[str]          # descending keyset walks: NULL sort keys; filters + (limit,)
+    sort_expr: str
+    desc: bool
+
+class Source:
+    """A table or view plus the SQL fragments requests may combine.
+
+    from_sql / text_from: FROM clause without and with a full-text MATCH
+    (text_from takes the MATCH expression as its first parameter).
+    columns: select list; page rows also carry sort_key and row_id.
+    id_col: unique tie-breaker, ordered in the direction of the sort.
+    sorts: sort name -> "expr ASC|DESC".
+    ties: sort name -> tie-breaker column when not id_col: the same id taken
+    from the table whose index serves that sort, so the index covers the
+    whole ORDER BY (a join's other copy of the id leaves a sort per tie).
+    conds: condition name -> WHERE fragment, "{marks}" = one ? per value.
+    """
+
+    def __init__(self, from_sql: str, columns: str, id_col: str, sorts: Dict[Hashable, str],
+                 conds: Dict[str, str], text_from: Optional[str] = None,
+                 ties: Optional[Dict[Hashable, str]] = None, max_plans: int = 512):
+        self.from_sql = from_sql
+        self.text_from = text_from
+        self.columns = columns
+        self.id_col = id_col
+        self.sorts = sorts
+        self.conds = conds
+        self.ties = ties or {}
+        self.max_plans = max_plans
+        self._lock = threading.Lock()
+        self._plans: "OrderedDict[Hashable, Plan]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, text: bool, conds: Conds, sort: Hashable, mode: str = "offset") -> Plan:
+        key = (text, conds, sort, mode)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        plan = self._compile(text, conds, sort, mode)
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def fragments(self, text: bool, conds: Conds) -> Tuple[str, List[str]]:
+        """(FROM clause, WHERE fragments) of a shape, for callers composing
+        their own SQL on top of it (facet counts)."""
+        from_sql = self.text_from if text else self.from_sql
+        return from_sql, [self.conds[name].format(marks=", ".join("?" * n)) for name, n in conds]
+
+    def _compile(self, text: bool, conds: Conds, sort: Hashable, mode: str) -> Plan:
+        if mode not in PAGE_MODES:
+            raise ValueError(f"Unknown page mode: {mode}")
+        from_sql, where = self.fragments(text, conds)
+        order = self.sorts[sort]
+        sort_expr, desc = split_order(order)
+        tie = self.ties.get(sort, self.id_col)
+        where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+        select = f"SELECT {self.columns}, {sort_expr} AS sort_key, {tie} AS row_id{from_sql}"
+        order_sql = f" ORDER BY {order}, {tie} {'DESC' if desc else 'ASC'}"
+        # rows whose sort key is NULL: the tie-breaker alone orders them (SQLite
+        # does not treat an indexed expression IS NULL as constant for ORDER BY)
+        null_order_sql = f" ORDER BY {tie} {'DESC' if desc else 'ASC'}"
+
+        tail_sql = None
+        if mode == "offset":
+            page_sql = f"{select}{where_sql}{order_sql} LIMIT ? OFFSET ?"
+        else:
+            # placeholders only; request values come from paging.keyset_params
+            key = None if mode == "after_null" else 0
+            pred, _ = keyset_predicate(sort_expr, desc, tie, key, 0)
+            only_nulls = key is None and desc
+            page_sql = (f"{select} WHERE {' AND '.join(where + [pred])}"
+                        f"{null_order_sql if only_nulls else order_sql} LIMIT ?")
+            tail = null_tail(sort_expr, desc, key)
+            if tail:
+                tail_sql = f"{select} WHERE {' AND '.join(where + [tail])}{null_order_sql} LIMIT ?"
+
+        return Plan(
+            count_sql=f"SELECT COUNT(*){from_sql}{where_sql}",
+            estimate_sql=f"SELECT COUNT(*) FROM (SELECT 1{from_sql}{where_sql} LIMIT ?)",
+            exists_sql=f"SELECT 1{from_sql}{where_sql} LIMIT 1",
+            page_sql=page_sql,
+            tail_sql=tail_sql,
+            sort_expr=sort_expr,
+            desc=desc,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"plans": len(self._plans), "hits": self.hits, "misses": self.misses}
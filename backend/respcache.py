@@ -0,0 +1,109 @@
+# backend/respcache.py
+# Serialized-response cache for hot API queries (backend/main.py /games).
+# Entries are the JSON bytes plus an ETag, keyed by the normalized query
+# parameters and valid for one data generation (meta.data_generation, bumped
+# by every loader commit), so an ingest invalidates everything at once.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+from fastapi import Response
+
+class CachedResponse(NamedTuple):
+    generation: int
+    stored_at: float
+    etag: str
+    body: bytes
+    timing: str                      # Server-Timing of the request that built it
+
+def make_etag(generation: int, body: bytes) -> str:
+    return f'"{generation}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match (list, weak validators, "*") against a strong ETag."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+class ResponseCache:
+    """Bounded LRU of response bodies with a TTL, valid for one data generation."""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: float = 300.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, generation: Optional[int]) -> Optional[CachedResponse]:
+        if not self.enabled or generation is None:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.generation != generation or time.monotonic() - entry.stored_at > self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, generation: Optional[int], body: bytes, timing: str = "") -> CachedResponse:
+        entry = CachedResponse(generation if generation is not None else -1, time.monotonic(),
+                               make_etag(generation or 0, body), body, timing)
+        if not self.enabled or generation is None or len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = entry
+            self._bytes += len(body)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+        return entry
+
+    def _drop(self, key: Hashable) -> None:
+        self._bytes -= len(self._data.pop(key).body)
+
+    def respond(self, entry: CachedResponse, if_none_match: Optional[str], timing: str) -> Response:
+        """200 with the cached bytes, or 304 when the client already has them."""
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Server-Timing": timing}
+        if etag_matches(if_none_match, entry.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
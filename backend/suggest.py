@@ -0,0 +1,205 @@
+# backend/suggest.py
+# In-memory prefix index for /games/suggest (search-box typeahead).
+# Names are folded (casefold, words only, single spaces) and every word start
+# becomes an entry, so "str" finds "Counter-Strike"; entries are byte offsets
+# into one UTF-8 blob, sorted by the text from there to the end of the name
+# and searched with bisect. Results are ranked by current players.
+import heapq
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from counts import data_generation
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+WORD_START_RE = re.compile(rb"(?:^| )(?=[^ ])")
+
+# Every app with a name, most players first; apps without snapshots last
+SOURCE_SQL = """
+SELECT a.app_id, a.name, l.avg_players
+FROM apps a LEFT JOIN latest_snapshot l ON l.app_id = a.app_id
+WHERE a.name IS NOT NULL AND a.name <> ''
+ORDER BY l.avg_players IS NULL, l.avg_players DESC, a.app_id
+"""
+
+MAX_LIMIT = 20
+# A prefix matching more entries than this has its top MAX_LIMIT apps
+# precomputed ("s", "the", ...); smaller ranges are ranked per request.
+HEAVY = 256
+END = b"\n"                      # ends each folded name in the blob
+
+def fold(text: str) -> str:
+    return " ".join(TOKEN_RE.findall(text.casefold()))
+
+class SuggestIndex:
+    """Immutable prefix index over one data generation."""
+
+    def __init__(self, rows, generation: Optional[int] = None):
+        t0 = time.perf_counter()
+        self.generation = generation
+        self.app_ids = array("q")
+        self.current = array("q")
+        name_starts = array("I")       # display names, UTF-8, app i = names[s[i]:s[i+1]]
+        names, folded = bytearray(), bytearray()
+        starts, offsets = array("I"), array("I")   # app / word starts in the folded blob
+        for app_id, name, current in rows:
+            key = fold(name).encode("utf-8")
+            if not key:
+                continue
+            self.app_ids.append(app_id)
+            self.current.append(current or 0)
+            name_starts.append(len(names))
+            names += name.encode("utf-8")
+            base = len(folded)
+            starts.append(base)
+            folded += key + END
+            offsets.extend(base + m.end() for m in WORD_START_RE.finditer(key))
+        name_starts.append(len(names))
+        self.names = bytes(names)
+        self.name_starts = name_starts
+        self.text = bytes(folded)
+
+        text = self.text
+        self.offsets = array("I", sorted(offsets, key=lambda o: text[o:text.index(END, o)]))
+        # rank = position in popularity order = the app an entry belongs to
+        self.ranks = array("I", (bisect_right(starts, o) - 1 for o in self.offsets))
+        self.heavy = self._heavy()
+        self.build_ms = (time.perf_counter() - t0) * 1000
+
+    def _range(self, prefix: bytes, lo: int = 0, hi: Optional[int] = None) -> Tuple[int, int]:
+        """Entries whose key starts with prefix (UTF-8 never has 0xff bytes)."""
+        text, n = self.text, len(prefix)
+        hi = len(self.offsets) if hi is None else hi
+        lo = bisect_left(self.offsets, prefix, lo, hi, key=lambda o: text[o:o + n])
+        hi = bisect_left(self.offsets, prefix + b"\xff", lo, hi, key=lambda o: text[o:o + n + 1])
+        return lo, hi
+
+    def _top(self, lo: int, hi: int, limit: int) -> List[int]:
+        return heapq.nsmallest(limit, set(self.ranks[lo:hi]))
+
+    def _heavy(self) -> dict:
+        """{prefix bytes: top MAX_LIMIT ranks} for every prefix over HEAVY entries."""
+        out: dict = {}
+        if self.offsets:
+            self._heavy_range(0, len(self.offsets), b"", out)
+            out.pop(b"", None)
+        return out
+
+    def _heavy_range(self, lo: int, hi: int, prefix: bytes, out: dict) -> List[int]:
+        # Top of a range = top of its children's tops (heavy children) and
+        # ranks (light ones), so every entry is ranked once, under its
+        # deepest heavy prefix.
+        text, offsets, depth = self.text, self.offsets, len(prefix) + 1
+        candidates = []
+        i = lo
+        while i < hi:
+            o = offsets[i]
+            child = text[o:o + depth]
+            if END in child:             # key ends here (sorts first in its range)
+                candidates.append(self.ranks[i])
+                i += 1
+                continue
+            _, j = self._range(child, i, hi)
+            if j - i > HEAVY:
+                candidates += self._heavy_range(i, j, child, out)
+            else:
+                candidates += self.ranks[i:j]
+            i = j
+        out[prefix] = top = heapq.nsmallest(MAX_LIMIT, set(candidates))
+        return top
+
+    def suggest(self, q: str, limit: int = 10) -> List[Tuple[int, str, int]]:
+        """[(app_id, name, current), ...] for names with a word starting with q."""
+        prefix = fold(q).encode("utf-8")
+        if not prefix:
+            return []
+        top = self.heavy.get(prefix)
+        if top is None:
+            lo, hi = self._range(prefix)
+            top = self._top(lo, hi, limit)
+        s = self.name_starts
+        return [(self.app_ids[r], self.names[s[r]:s[r + 1]].decode("utf-8"), self.current[r])
+                for r in top[:limit]]
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "names": len(self.app_ids),
+            "entries": len(self.offsets),
+            "heavy_prefixes": len(self.heavy),
+            "build_ms": round(self.build_ms, 1),
+        }
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "SuggestIndex":
+        generation = data_generation(conn)
+        return cls(conn.execute(SOURCE_SQL), generation)
+
+class Suggester:
+    """Holds the current SuggestIndex and rebuilds it in the background when
+    the data generation changes (checked at most every `recheck` seconds).
+    Requests keep using the previous index until the new one is ready."""
+
+    def __init__(self, connect, dedicated, recheck: float = 1.0):
+        self.connect = connect           # () -> context manager yielding a connection
+        self.dedicated = dedicated       # () -> unpooled connection, closed by the caller
+        self.recheck = recheck
+        self.index: Optional[SuggestIndex] = None
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._building = False
+        self.rebuilds = 0
+
+    def build(self, conn=None) -> SuggestIndex:
+        if conn is None:
+            with self.connect() as conn:
+                index = SuggestIndex.load(conn)
+        else:
+            index = SuggestIndex.load(conn)
+        self.index = index
+        self.rebuilds += 1
+        return index
+
+    def check_due(self) -> bool:
+        return time.monotonic() - self._checked >= self.recheck
+
+    def current(self) -> SuggestIndex:
+        index = self.index
+        if index is None:
+            with self._lock:             # first request builds; the rest wait for it
+                return self.index or self.build()
+        if self.check_due():
+            self._checked = time.monotonic()
+            with self.connect() as conn:
+                generation = data_generation(conn)
+            if generation != index.generation:
+                self._rebuild_async()
+        return index
+
+    def stats(self) -> dict:
+        index = self.index
+        return {"rebuilds": self.rebuilds, **(index.stats() if index else {})}
+
+    def _rebuild_async(self) -> None:
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+
+        def run():
+            # not self.connect: the pool would keep this one-off thread's
+            # connection open after the thread exits
+            try:
+                conn = self.dedicated()
+                try:
+                    self.build(conn)
+                finally:
+                    conn.close()
+            finally:
+                self._building = False
+
+        threading.Thread(target=run, name="suggest-rebuild", daemon=True).start()
@@ -0,0 +1,83 @@
+# benchmarks/bench_async.py
+# Async endpoints + reader-thread executor + request coalescing
+# (backend/executor.py) vs the previous sync endpoints, at high concurrency:
+#   - sync: backend/ as of the last commit before the async change (git archive)
+#   - async, GSE_COALESCE=0: dedicated reader threads only
+#   - async: reader threads + coalescing of identical in-flight requests
+# Bursty search-box mix (everyone types the same few prefixes), response
+# cache off so every request reaches SQLite, and on (the default).
+# Also checks that bodies are identical across the three. Uses the raw
+# asyncio client (loadgen raw=True); httpx would be the bottleneck at 500.
+#
+#   python benchmarks/bench_async.py
+#   python benchmarks/bench_async.py --concurrency 500 --duration 15 --baseline <rev>
+import argparse, io, subprocess, sys, tarfile, tempfile
+from pathlib import Path
+
+import httpx
+
+from loadgen import header, load, report, serve
+from synth import ROOT, make_db
+
+TYPED = ["c", "co", "cou", "coun", "count", "counter", "r", "ru", "rus", "rust", "sim", "simul"]
+PATHS = (
+    ["/games?size=25"] * 4 + ["/games?size=25&page=2", "/games?size=25&sort=peak"]
+    + [f"/games?size=25&q={q}" for q in TYPED]
+    + ["/games/trending?window=24h", "/games/10", "/games/11/history?bucket=day"]
+)
+
+def baseline_rev():
+    """Last commit before the async endpoints."""
+    out = subprocess.run(["git", "log", "--format=%H", "-1", "--grep", r"^\[user-020\]"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    return out or "HEAD"
+
+def export_backend(rev, dest):
+    data = subprocess.run(["git", "archive", rev, "backend"], cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(dest)
+    return Path(dest) / "backend"
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--concurrency", type=int, default=500)
+    p.add_argument("--duration", type=float, default=10.0)
+    p.add_argument("--baseline", default=None, help="git rev of the sync backend (default: the user-020 commit)")
+    args = p.parse_args()
+
+    db = Path(tempfile.gettempdir()) / "gamesearch_bench_async.db"
+    make_db(db, apps=args.apps, snapshots=args.apps * 4)
+    rev = args.baseline or baseline_rev()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_backend = export_backend(rev, tmp)
+        servers = [
+            (f"sync ({rev[:8]})", old_backend, {}),
+            ("async, no coalescing", ROOT / "backend", {"GSE_COALESCE": "0"}),
+            ("async + coalescing", ROOT / "backend", {}),
+        ]
+        bodies, stats = {}, {}
+        for cache in ("0", "1"):
+            print(f"\nresponse cache {'on' if cache == '1' else 'off'}, {args.concurrency} clients, "
+                  f"{args.duration:.0f}s")
+            header()
+            for label, cwd, env in servers:
+                env = {"GSE_DB": str(db), "GSE_RESPONSE_CACHE": cache, **env}
+                with serve(cwd=cwd, env=env) as base:
+                    with httpx.Client(base_url=base) as client:
+                        got = [client.get(path).json() for path in PATHS]
+                    bodies.setdefault(cache, got)
+                    assert got == bodies[cache], f"{label}: responses differ"
+                    load(base, PATHS, 50, 2.0, raw=True)  # warm-up
+                    report(label, load(base, PATHS, args.concurrency, args.duration, raw=True))
+                    if "async" in label:
+                        stats[(cache, label)] = httpx.get(base + "/stats").json()["executor"]
+
+    print("\nidentical bodies across all three")
+    for (cache, label), s in stats.items():
+        print(f"cache {cache} {label:<22} executed {s['executed']:>7}  coalesced {s['coalesced']:>7}  "
+              f"peak queue {s['peak_pending']:>4}  rejected {s['rejected']}")
+
+if __name__ == "__main__":
+    main()
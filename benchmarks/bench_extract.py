@@ -0,0 +1,128 @@
+# benchmarks/bench_extract.py
+# Top-table row extraction: the old per-cell selector queries of both spiders
+# vs. the single-pass extractor in steamcharts_scraper/extract.py, over toppagehtml.txt.
+# Asserts both produce identical items (timestamps aside) and reports rows/sec.
+#
+#   python benchmarks/bench_extract.py
+#   python benchmarks/bench_extract.py --repeat 500
+import argparse, re, sys, time
+from pathlib import Path
+
+from scrapy.http import HtmlResponse
+
+ROOT    = Path(__file__).resolve().parents[1]
+FIXTURE = ROOT / "toppagehtml.txt"
+URL     = "https://steamcharts.com/top/p.1"
+
+sys.path.insert(0, str(ROOT / "steamcharts_scraper"))
+from steamcharts_scraper.extract import top_all_fields, top_fields, top_rows
+
+# --- before: the spiders' original parse loops (timestamps left out) ---
+def old_clean_text(value):
+    return value.strip() if value else None
+
+def old_clean_int(value):
+    if value is None:
+        return None
+    try:
+        return int(value.replace(",", "").replace("+", "").replace("−", "-").replace(" ", ""))
+    except ValueError:
+        return None
+
+def old_top_all(response):
+    out = []
+    for row in response.css("table.common-table tbody tr"):
+        rank_txt   = old_clean_text(row.css("td:nth-child(1)::text").get())
+        name_txt   = old_clean_text(row.css("td:nth-child(2) a::text").get())
+        detail_rel = row.css("td:nth-child(2) a::attr(href)").get()
+        avg_txt    = old_clean_text(row.css("td:nth-child(3)::text").get())
+        peak_txt   = old_clean_text(row.css("td:nth-child(5)::text").get())
+        app_id = None
+        if detail_rel:
+            m = re.search(r"/app/(\d+)", detail_rel)
+            if m:
+                app_id = m.group(1)
+        out.append({
+            "rank": old_clean_int(rank_txt.strip(".") if rank_txt else None),
+            "name": name_txt,
+            "detail_url": response.urljoin(detail_rel) if detail_rel else None,
+            "app_id": app_id,
+            "avg_players": old_clean_int(avg_txt),
+            "peak_players": old_clean_int(peak_txt),
+        })
+    return out
+
+def old_top(response):
+    out = []
+    for row in response.css("table#top-games.common-table tbody tr"):
+        cells = row.xpath("./td")
+        out.append({
+            "app_id":  cells[1].xpath("a/@href").re_first(r"/app/(\d+)"),
+            "name":    cells[1].xpath("normalize-space(.//a/text())").get(),
+            "current": cells[2].xpath("normalize-space(.)").get().replace(",", ""),
+            "peak":    cells[4].xpath("normalize-space(.)").get().replace(",", ""),
+            "hours":   cells[5].xpath("normalize-space(.)").get().replace(",", ""),
+        })
+    return out
+
+# --- after: shared single-pass extractor ---
+def new_top_all(response):
+    out = []
+    for row in top_rows(response):
+        rank, name, href, app_id, avg, peak = top_all_fields(row)
+        out.append({
+            "rank": rank,
+            "name": name,
+            "detail_url": response.urljoin(href) if href else None,
+            "app_id": app_id,
+            "avg_players": avg,
+            "peak_players": peak,
+        })
+    return out
+
+def new_top(response):
+    out = []
+    for row in top_rows(response, "table#top-games.common-table tbody tr"):
+        app_id, name, current, peak, hours = top_fields(row)
+        out.append({"app_id": app_id, "name": name, "current": current, "peak": peak, "hours": hours})
+    return out
+
+def odd_page(body):
+    """Fixture with awkward cells: signs/spaces in numbers, comments, a row without a link."""
+    html = body.decode("utf-8")
+    html = html.replace("<td>1.</td>", "<td><!-- r -->1.</td>", 1)
+    html = html.replace('<td class="num">1,020,466</td>', '<td class="num"> 1 020 466+ </td>', 1)
+    html = re.sub(r'<a href="/app/570">\s*([^<]*?)\s*</a>', r"\1", html, count=1)
+    html = html.replace('<tr>', '<tr><!-- ad -->', 3)
+    return html.encode("utf-8")
+
+def bench(fn, body, repeat):
+    rows = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        # fresh response each time, so HTML parsing is part of the cost
+        rows += len(fn(HtmlResponse(URL, body=body, encoding="utf-8")))
+    return rows / (time.perf_counter() - t0)
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--repeat", type=int, default=200)
+    args = p.parse_args()
+
+    body = FIXTURE.read_bytes()
+    for page in (body, odd_page(body)):
+        for old, new in ((old_top_all, new_top_all), (old_top, new_top)):
+            a = old(HtmlResponse(URL, body=page, encoding="utf-8"))
+            b = new(HtmlResponse(URL, body=page, encoding="utf-8"))
+            assert a and a == b, f"{new.__name__} differs from {old.__name__}:\n{a[:3]}\n{b[:3]}"
+
+    print(f"{'spider':<22}{'before rows/s':>15}{'after rows/s':>15}{'speedup':>10}")
+    for name, old, new in (("steamcharts_top_all", old_top_all, new_top_all),
+                           ("steamcharts_top", old_top, new_top)):
+        before = bench(old, body, args.repeat)
+        after = bench(new, body, args.repeat)
+        print(f"{name:<22}{before:>15,.0f}{after:>15,.0f}{after / before:>9.1f}x")
+    print("old and new extractors produce identical items")
+
+if __name__ == "__main__":
+    main()
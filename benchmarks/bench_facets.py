@@ -0,0 +1,178 @@
+# benchmarks/bench_facets.py
+# Facet tables (migration 0012, maintained by upsert_catalog.py) behind the
+# /games genre / category / developer / publisher filters and facet counts:
+#   - app_facets == the apps JSON columns, both after upserts and after the
+#     migration's seed
+#   - catalog upsert cost with and without the facet merges
+#   - filter latency: json_each / LIKE over apps vs the facet tables
+#   - endpoint totals and facet counts == a Python reference; latency cold and cached
+#
+#   python benchmarks/bench_facets.py
+#   python benchmarks/bench_facets.py --apps 100000
+import argparse, json, random, sqlite3, sys, tempfile, time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+from loadgen import serve
+from synth import DB_DIR, ROOT, make_db, timed
+
+sys.path.insert(0, str(DB_DIR))
+sys.path.insert(0, str(ROOT / "backend"))
+import upsert_catalog
+from bulk import connect
+from facets import KINDS, facet_summary
+
+GENRES = ["Action", "Adventure", "Casual", "Indie", "RPG", "Simulation", "Strategy", "Sports",
+          "Racing", "Massively Multiplayer", "Early Access", "Free to Play", "Violent", "Gore",
+          "Animation & Modeling", "Design & Illustration", "Education", "Utilities", "Audio Production"]
+CATEGORIES = ["Single-player", "Multi-player", "Co-op", "Online Co-op", "PvP", "Online PvP",
+              "Steam Achievements", "Full controller support", "Steam Trading Cards", "Steam Cloud",
+              "Steam Workshop", "In-App Purchases", "Partial Controller Support", "Remote Play Together",
+              "Family Sharing", "Stats", "Steam Leaderboards", "VR Support", "Captions available"]
+
+def catalog(apps, rng):
+    out = []
+    for app_id in range(10, 10 + apps):
+        dev = f"Studio {int(rng.paretovariate(0.8)) % 20000}"
+        out.append({
+            "app_id": app_id,
+            "genres": rng.sample(GENRES, rng.randint(1, 4)),
+            "categories": rng.sample(CATEGORIES, rng.randint(2, 9)),
+            "developers": [dev] + ([f"Studio {rng.randint(0, 19999)}"] if rng.random() < 0.1 else []),
+            "publishers": [dev if rng.random() < 0.4 else f"Publisher {int(rng.paretovariate(0.9)) % 8000}"],
+            "last_refreshed": "2024-06-01T00:00:00+00:00",
+        })
+    return out
+
+FACETS = """
+    SELECT f.kind, f.value, af.app_id FROM app_facets af JOIN facet_values f USING (facet_id)
+"""
+
+def reference_facets(con):
+    cols = {"genre": "genres", "category": "categories", "developer": "developers", "publisher": "publishers"}
+    rows = set()
+    for app_id, *lists in con.execute("SELECT app_id, genres, categories, developers, publishers FROM apps"):
+        for kind, text in zip(cols, lists):
+            for v in json.loads(text) if text else ():
+                rows.add((kind, v, app_id))
+    return sorted(rows)
+
+def upsert(db, records, merge_sqls):
+    con = connect(db)
+    saved, upsert_catalog.MERGE_SQLS = upsert_catalog.MERGE_SQLS, merge_sqls
+    try:
+        return upsert_catalog.load(con, iter(records))["seconds"]
+    finally:
+        upsert_catalog.MERGE_SQLS = saved
+        con.close()
+
+def matches(app, query):
+    """app / query: {kind: set of lower-cased values}; any value per kind, every kind."""
+    return all(not want or want & app[kind] for kind, want in query.items())
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--repeat", type=int, default=200)
+    args = p.parse_args()
+
+    tmp = Path(tempfile.gettempdir())
+    db = tmp / "gamesearch_bench_facets.db"
+    make_db(db, apps=args.apps, snapshots=args.apps)
+    records = catalog(args.apps, random.Random(3))
+
+    plain_db = tmp / "gamesearch_bench_facets_plain.db"
+    plain_db.write_bytes(db.read_bytes())
+    base = [sql for sql in upsert_catalog.MERGE_SQLS if sql not in upsert_catalog.FACET_MERGE_SQLS]
+    s_plain = upsert(plain_db, records, base)
+    s_facets = upsert(db, records, upsert_catalog.MERGE_SQLS)
+    plain_db.unlink()
+
+    # re-upsert a slice with changed lists: stale values must go
+    rng = random.Random(4)
+    for r in records[::7]:
+        r["genres"] = rng.sample(GENRES, rng.randint(1, 3))
+    s_update = upsert(db, records[::7], upsert_catalog.MERGE_SQLS)
+
+    con = sqlite3.connect(db)
+    expected = reference_facets(con)
+    assert sorted(con.execute(FACETS)) == expected, "app_facets differs from the apps JSON columns"
+    seed_db = tmp / "gamesearch_bench_facets_seed.db"
+    seed_db.write_bytes(db.read_bytes())
+    with sqlite3.connect(seed_db, isolation_level=None) as seed:
+        seed.execute("DELETE FROM app_facets")
+        seed.execute("DELETE FROM facet_values")
+        seed.executescript((DB_DIR / "migrations" / "0012_facets.sql").read_text(encoding="utf-8"))
+        assert sorted(seed.execute(FACETS)) == expected, "migration seed differs from the apps JSON columns"
+    seed_db.unlink()
+
+    # Without the tables: json_each / LIKE over the JSON text
+    json_sql = ("SELECT COUNT(*) FROM steamcharts_top WHERE app_id IN (SELECT a.app_id FROM apps a, json_each(a.genres) j"
+                " WHERE j.value IN ('RPG', 'Racing')) AND app_id IN (SELECT a.app_id FROM apps a, json_each(a.categories) j"
+                " WHERE j.value = 'VR Support')")
+    like_sql = ("SELECT COUNT(*) FROM steamcharts_top t JOIN apps a USING (app_id)"
+                " WHERE (a.genres LIKE '%\"RPG\"%' OR a.genres LIKE '%\"Racing\"%') AND a.categories LIKE '%\"VR Support\"%'")
+    facet_sql = ("SELECT COUNT(*) FROM steamcharts_top WHERE app_id IN (SELECT af.app_id FROM facet_values f"
+                 " JOIN app_facets af ON af.facet_id = f.facet_id WHERE f.kind = 'genre' AND f.value IN ('RPG', 'Racing'))"
+                 " AND app_id IN (SELECT af.app_id FROM facet_values f JOIN app_facets af ON af.facet_id = f.facet_id"
+                 " WHERE f.kind = 'category' AND f.value = 'VR Support')")
+    assert con.execute(json_sql).fetchone() == con.execute(like_sql).fetchone() == con.execute(facet_sql).fetchone()
+    sql_rows = [(name, timed(lambda: con.execute(sql).fetchone(), 20)) for name, sql in
+                (("json_each", json_sql), ("LIKE", like_sql), ("facet tables", facet_sql))]
+
+    # Cold facet counts (what the first request per data generation pays)
+    con.row_factory = None
+    cold = {}
+    for name, selected in (("all apps", {}), ("genre=RPG", {"genre": ("RPG",)}),
+                           ("developer=Studio 1", {"developer": ("Studio 1",)})):
+        cold[name] = timed(lambda: facet_summary(con, "app_id", " FROM steamcharts_top", [], (),
+                                                 selected, 10, everything=True), 5)
+    con.close()
+
+    print(f"{args.apps} apps; facet rows: {len(expected)}")
+    print(f"catalog upsert: {s_plain:.2f}s without facet merges, {s_facets:.2f}s with "
+          f"(re-upsert of {len(records[::7])} apps: {s_update:.2f}s)")
+    print("app_facets == apps JSON (after upserts and after the migration seed)")
+    print(f"\n{'genre in (RPG, Racing) and VR':<34}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, t in sql_rows:
+        print(f"{name:<34}{t['p50']:>9.2f}{t['p99']:>9.2f}")
+    print(f"\n{'facet counts, uncached (SQL)':<34}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, t in cold.items():
+        print(f"{name:<34}{t['p50']:>9.2f}{t['p99']:>9.2f}")
+
+    apps = {r["app_id"]: {"genre": r["genres"], "category": r["categories"],
+                          "developer": r["developers"], "publisher": r["publishers"]} for r in records}
+    folded = {a: {k: {x.lower() for x in facets[k]} for k in KINDS} for a, facets in apps.items()}
+    rare = next(v for v, n in Counter(d for r in records for d in set(r["developers"])).items() if n == 5)
+    queries = {
+        "genre=RPG": {"genre": ["RPG"]},
+        "genre=RPG|Racing & VR": {"genre": ["RPG", "Racing"], "category": ["VR Support"]},
+        "developer=Studio 1 (big)": {"developer": ["Studio 1"]},
+        "developer=<5 apps> (rare)": {"developer": [rare]},
+        "publisher=publisher 2 (nocase)": {"publisher": ["publisher 2"]},
+    }
+    print(f"\n{'/games?...':<34}{'p50 ms':>9}{'p99 ms':>9}{'facets=true':>13}{'total':>8}")
+    with serve(env={"GSE_DB": str(db)}) as base_url, httpx.Client(base_url=base_url) as client:
+        for name, query in queries.items():
+            params = [(k, v) for k, values in query.items() for v in values]
+            body = client.get("/games", params=params + [("facets", "true")]).json()
+            want = {k: {x.lower() for x in v} for k, v in query.items()}
+            assert body["total"] == sum(matches(f, want) for f in folded.values()), name
+            # every kind is counted without its own filter
+            for kind in KINDS:
+                others = {k: v for k, v in want.items() if k != kind}
+                counts = Counter(v for a, facets in apps.items() if matches(folded[a], others) for v in set(facets[kind]))
+                got = {f["value"]: f["count"] for f in body["facets"][kind]}
+                top = sorted(counts.values(), reverse=True)
+                assert len(got) == min(10, len(top)), (name, kind)
+                assert all(counts[v] == n for v, n in got.items()), (name, kind)
+                assert not got or min(got.values()) == top[len(got) - 1], (name, kind)
+            plain = timed(lambda: client.get("/games", params=params + [("size", "25")]), args.repeat)
+            faceted = timed(lambda: client.get("/games", params=params + [("facets", "true")]), args.repeat)
+            print(f"{name:<34}{plain['p50']:>9.2f}{plain['p99']:>9.2f}{faceted['p50']:>13.2f}{body['total']:>8}")
+    print("totals and facet counts match the Python reference")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_fts.py
+# Leading-wildcard LIKE vs. FTS5 MATCH on a synthetic catalog (200k apps by default).
+#
+#   python benchmarks/bench_fts.py --apps 200000
+import argparse, sqlite3, sys, tempfile
+from pathlib import Path
+
+from synth import ROOT, make_db, timed
+
+sys.path.insert(0, str(ROOT / "backend"))
+from fts import match_expr
+
+QUERIES = ["war", "counter strike", "sim", "space eng", "zzz"]
+
+def like_page(con, q):
+    params = (f"%{q.lower()}%",)
+    con.execute("SELECT COUNT(*) FROM apps WHERE LOWER(name) LIKE ?", params).fetchone()
+    con.execute(
+        "SELECT a.app_id, a.name, l.avg_players FROM apps a JOIN latest_snapshot l ON l.app_id = a.app_id "
+        "WHERE LOWER(a.name) LIKE ? ORDER BY l.avg_players DESC LIMIT 25", params,
+    ).fetchall()
+
+def fts_page(con, q, order="l.avg_players DESC"):
+    params = (match_expr(q, "name"),)
+    sub = "SELECT rowid AS fts_id, rank AS fts_rank FROM apps_fts WHERE apps_fts MATCH ?"
+    con.execute(f"SELECT COUNT(*) FROM ({sub})", params).fetchone()
+    con.execute(
+        f"SELECT a.app_id, a.name, l.avg_players FROM ({sub}) AS m "
+        f"JOIN apps a ON a.app_id = m.fts_id JOIN latest_snapshot l ON l.app_id = a.app_id "
+        f"ORDER BY {order} LIMIT 25", params,
+    ).fetchall()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=200_000)
+    p.add_argument("--repeat", type=int, default=30)
+    p.add_argument("--db", default=None)
+    p.add_argument("--reuse", action="store_true")
+    args = p.parse_args()
+
+    db = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "gamesearch_bench_fts.db"
+    if not (args.reuse and db.exists()):
+        make_db(db, apps=args.apps, snapshots=args.apps)
+
+    con = sqlite3.connect(db)
+    print(f"{'query':<18}{'LIKE p50':>10}{'LIKE p99':>10}{'FTS p50':>10}{'FTS p99':>10}{'bm25 p50':>10}")
+    for q in QUERIES:
+        a = timed(lambda: like_page(con, q), args.repeat)
+        b = timed(lambda: fts_page(con, q), args.repeat)
+        c = timed(lambda: fts_page(con, q, order="m.fts_rank"), args.repeat)
+        print(f"{q!r:<18}{a['p50']:>10.2f}{a['p99']:>10.2f}{b['p50']:>10.2f}{b['p99']:>10.2f}{c['p50']:>10.2f}")
+    con.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_history.py
+# GET /games/{app_id}/history over years of hourly snapshots: the raw-snapshot
+# GROUP BY each bucket size would need vs. what the endpoint runs (rollup
+# tables for day/week, idx_snapshots_app_ts range scan for hour), plus
+# end-to-end latency through a local uvicorn.
+# Asserts the rollup buckets match a Python aggregation of the raw rows and
+# that LTTB returns exactly `points` points, ordered, with both ends kept, and
+# that `to` is exclusive for every bucket size (history and rollup exports).
+#
+#   python benchmarks/bench_history.py
+#   python benchmarks/bench_history.py --apps 50 --years 5
+import argparse, json, sqlite3, sys, tempfile
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from loadgen import serve
+from synth import ROOT, make_db, timed
+
+sys.path.insert(0, str(ROOT / "backend"))
+from history import BUCKET_SQL, fetch_buckets, lttb
+
+BUCKETS = ("hour", "day", "week")
+
+APP = 15
+
+# What day / week buckets cost without the rollups: group the raw rows
+RAW_SQL = {
+    "day": "SELECT substr(ts, 1, 10) AS b, MIN(avg_players), SUM(avg_players), COUNT(avg_players),"
+           " MAX(avg_players), MAX(peak_players), COUNT(*) FROM snapshots"
+           " WHERE app_id = ? AND ts >= ? AND ts < ? GROUP BY b ORDER BY b",
+    "week": "SELECT date(ts, 'weekday 0', '-6 days') AS b, MIN(avg_players), SUM(avg_players), COUNT(avg_players),"
+            " MAX(avg_players), MAX(peak_players), COUNT(*) FROM snapshots"
+            " WHERE app_id = ? AND ts >= ? AND ts < ? GROUP BY b ORDER BY b",
+}
+
+def check_buckets(con):
+    raw = con.execute("SELECT ts, avg_players, peak_players FROM snapshots WHERE app_id = ?", (APP,)).fetchall()
+    days = defaultdict(list)
+    for ts, avg, peak in raw:
+        days[ts[:10]].append((avg, peak))
+    expected = [
+        (day, min(a for a, _ in v), max(a for a, _ in v), max(p for _, p in v), len(v))
+        for day, v in sorted(days.items())
+    ]
+    got = [(b, lo, hi, peak, samples) for b, lo, _, _, hi, peak, samples in fetch_buckets(con, APP, "day", "", "9999")]
+    assert got == expected, "day buckets differ from the raw-row aggregation"
+    # weeks folded from days: same totals, Monday keys
+    weeks = fetch_buckets(con, APP, "week", "", "9999")
+    assert sum(w[6] for w in weeks) == len(raw) and sum(w[2] for w in weeks) == sum(a for _, a, _ in raw)
+
+def check_lttb():
+    xs = list(range(10_000))
+    ys = [(x * 7919) % 1000 for x in xs]
+    for points in (3, 100, 500):
+        picked = lttb(xs, ys, points)
+        assert len(picked) == points and picked[0] == 0 and picked[-1] == len(xs) - 1
+        assert all(a < b for a, b in zip(picked, picked[1:])), "LTTB indices not increasing"
+    assert lttb(xs[:10], ys[:10], 500) == list(range(10))
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=20)
+    p.add_argument("--years", type=float, default=3)
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--db", default=None)
+    p.add_argument("--reuse", action="store_true")
+    args = p.parse_args()
+
+    hours = int(args.years * 365 * 24)
+    db = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "gamesearch_bench_history.db"
+    if not (args.reuse and db.exists()):
+        make_db(db, apps=args.apps, snapshots=args.apps * hours)
+
+    con = sqlite3.connect(db)
+    check_buckets(con)
+    check_lttb()
+    plan = " ".join(r[3] for r in con.execute("EXPLAIN QUERY PLAN " + BUCKET_SQL["hour"], (APP, "", "9999")))
+    assert "COVERING INDEX idx_snapshots_app_ts" in plan, plan
+    for bucket in RAW_SQL:
+        raw = con.execute(RAW_SQL[bucket], (APP, "", "9999")).fetchall()
+        assert raw == fetch_buckets(con, APP, bucket, "", "9999"), f"{bucket} rollups differ from raw rows"
+
+    print(f"{args.apps} apps x {hours:,} hourly snapshots ({args.years:g} years), full range for one app")
+    print(f"{'bucket':<8}{'buckets':>9}{'raw GROUP BY p50 ms':>22}{'endpoint query p50 ms':>24}")
+    for bucket in BUCKETS:
+        n = len(fetch_buckets(con, APP, bucket, "", "9999"))
+        sql = RAW_SQL.get(bucket, BUCKET_SQL["hour"])
+        raw = timed(lambda: con.execute(sql, (APP, "", "9999")).fetchall(), args.repeat)["p50"]
+        served = timed(lambda: fetch_buckets(con, APP, bucket, "", "9999"), args.repeat)["p50"]
+        print(f"{bucket:<8}{n:>9,}{raw:>22.1f}{served:>24.1f}")
+    con.close()
+
+    print("\nendpoint (uvicorn, 500 points):")
+    with serve(env={"GSE_DB": str(db)}) as base, httpx.Client(base_url=base) as client:
+        for bucket in BUCKETS:
+            path = f"/games/{APP}/history?bucket={bucket}&points=500"
+            body = client.get(path).json()
+            assert len(body["items"]) == min(500, body["buckets"]), body["buckets"]
+            ms = timed(lambda: client.get(path).raise_for_status(), args.repeat)["p50"]
+            print(f"  {path:<44} {body['buckets']:>7,} buckets -> {len(body['items'])} points  p50 {ms:.1f} ms")
+        assert client.get("/games/999999999/history").status_code == 404
+        assert client.get(f"/games/{APP}/history?from=nope").status_code == 400
+        week = client.get(f"/games/{APP}/history?bucket=week&from=2024-03-01&to=2024-04-01").json()["items"]
+        assert week and week[0]["ts"] == "2024-02-26T00:00:00", week[:1]   # Monday of the week holding Mar 1
+        # `to` is exclusive: the last bucket is the one starting before it (history and rollup exports)
+        for bucket, to, last in (("hour", "2024-03-01T05:00:00", "2024-03-01T04:00:00"),
+                                 ("day", "2024-03-07", "2024-03-06T00:00:00"),
+                                 ("day", "2024-03-07T12:00:00", "2024-03-07T00:00:00"),
+                                 ("week", "2024-03-04", "2024-02-26T00:00:00"),
+                                 ("week", "2024-03-05", "2024-03-04T00:00:00")):
+            items = client.get(f"/games/{APP}/history?bucket={bucket}&from=2024-02-01&to={to}").json()["items"]
+            assert items[-1]["ts"] == last, (bucket, to, items[-1:])
+            if bucket != "hour":
+                lines = client.get(f"/export/snapshots?grain={bucket}&app_id={APP}&from=2024-02-01&to={to}").text
+                assert json.loads(lines.splitlines()[-1])[bucket] == last[:10], (bucket, to, lines[-200:])
+    print("history buckets, LTTB and the covering index check out")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_httpcache.py
+# steamcharts_top_all crawls through the SQLite HTTP cache (middlewares.SQLiteCacheStorage)
+# against the local stand-in server from bench_top_crawl.py:
+#   cold   - empty cache, every page downloaded and stored
+#   warm   - same crawl again, served from the cache
+#   replay - HTTPCACHE_REPLAY=True with the server shut down
+# Asserts all three emit identical items, stamped with the cold crawl's fetch
+# times (a cache hit is not a new snapshot), then checks TTL expiry and the
+# LRU size cap.
+#
+#   python benchmarks/bench_httpcache.py
+#   python benchmarks/bench_httpcache.py --pages 40 --latency 0.3
+import argparse, json, shutil, sqlite3, subprocess, sys, tempfile, time
+from pathlib import Path
+
+from bench_top_crawl import ROWS_PER_PAGE, SCRAPY_ROOT, build_pages, serve
+
+def child(out, base, cache_dir, overrides):
+    # One crawl per process (the Twisted reactor cannot be restarted)
+    sys.path.insert(0, str(SCRAPY_ROOT))
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.settings import Settings
+    from steamcharts_scraper.spiders.steamcharts_top_all import SteamChartsTopAllSpider
+
+    class LocalTopAll(SteamChartsTopAllSpider):
+        allowed_domains = ["127.0.0.1"]
+        start_urls = [f"{base}/top/p.1"]
+
+    settings = Settings()
+    settings.setmodule("steamcharts_scraper.settings")
+    settings.update({
+        "ITEM_PIPELINES": {},
+        "ROBOTSTXT_OBEY": False,
+        "DOWNLOAD_DELAY": 0,
+        "LOG_LEVEL": "WARNING",
+        "FEEDS": {out: {"format": "jsonlines", "overwrite": True}},
+        "HTTPCACHE_DIR": cache_dir,
+        **json.loads(overrides),
+    })
+    process = CrawlerProcess(settings)
+    process.crawl(LocalTopAll)
+    process.start()
+
+def crawl(base, cache_dir, out, **overrides):
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, __file__, "--child", str(out), base, str(cache_dir), json.dumps(overrides)],
+        check=True,
+    )
+    dt = time.perf_counter() - t0
+    items = [json.loads(line) for line in Path(out).read_text(encoding="utf-8").splitlines() if line]
+    stamps = [it.pop("timestamp") for it in items]
+    return items, dt, stamps
+
+def cache_rows(cache_dir):
+    con = sqlite3.connect(Path(cache_dir) / "httpcache.sqlite")
+    try:
+        return con.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(compressed), 0) FROM responses").fetchone()
+    finally:
+        con.close()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.2, help="Seconds the stand-in server waits per response")
+    p.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    tmp = Path(tempfile.mkdtemp(prefix="gamesearch_httpcache_"))
+    cache_dir, out = tmp / "cache", tmp / "items.jsonl"
+    expected = args.pages * ROWS_PER_PAGE
+    server, base = serve(build_pages(args.pages), args.latency)
+    try:
+        cold, t_cold, ts_cold = crawl(base, cache_dir, out)
+        warm, t_warm, ts_warm = crawl(base, cache_dir, out)
+        server.shutdown()
+        server.server_close()
+        replay, t_replay, ts_replay = crawl(base, cache_dir, out, HTTPCACHE_REPLAY=True)
+
+        assert len(cold) == expected, f"cold crawl: {len(cold)} items, expected {expected}"
+        assert warm == cold, "warm (cached) crawl differs from the cold crawl"
+        assert replay == cold, "replay crawl differs from the cold crawl"
+        assert ts_warm == ts_cold and ts_replay == ts_cold, "cached pages not stamped with their fetch time"
+        n, size, compressed = cache_rows(cache_dir)
+        assert n == args.pages and compressed == n, f"expected {args.pages} compressed entries, got {n}/{compressed}"
+
+        print(f"{args.pages} pages x {ROWS_PER_PAGE} rows, {args.latency * 1000:.0f} ms latency")
+        print(f"{'crawl':<10}{'seconds':>10}{'items':>8}")
+        for name, t, items in (("cold", t_cold, cold), ("warm", t_warm, warm), ("replay", t_replay, replay)):
+            print(f"{name:<10}{t:>10.2f}{len(items):>8}")
+        print(f"cache: {n} entries, {size / 1024:.0f} KB stored (zlib)")
+
+        # TTL: with a 1s expiry and the server gone, nothing in the cache is usable
+        time.sleep(1.1)
+        expired, _, _ = crawl(base, cache_dir, out, HTTPCACHE_EXPIRATION_SECS_BY_SPIDER={"steamcharts_top_all": 1},
+                           RETRY_ENABLED=False, LOG_LEVEL="CRITICAL")
+        assert expired == [], "expired entries were served"
+
+        # LRU cap: restart the server (new port, so compare without detail_url), cap at ~3 pages
+        server, base = serve(build_pages(args.pages), 0)
+        cap_mb = 3.5 * size / n / 1048576
+        capped, _, _ = crawl(base, tmp / "capped", out, HTTPCACHE_MAX_MB=cap_mb)
+        n_capped, size_capped, _ = cache_rows(tmp / "capped")
+        strip = lambda items: [{k: v for k, v in it.items() if k != "detail_url"} for it in items]
+        assert strip(capped) == strip(cold), "capped crawl differs from the cold crawl"
+        assert size_capped <= cap_mb * 1048576 and n_capped < args.pages, (n_capped, size_capped)
+        print(f"TTL expiry and LRU cap ({n_capped} of {args.pages} entries kept) behave as configured")
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+    print("cached and replayed crawls match the live crawl")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_ingest.py
+# Per-row snapshot loader (pre-bulk load_snapshot.py) vs. the staged bulk path in db/bulk.py.
+#
+#   python benchmarks/bench_ingest.py                         # 1M records
+#   python benchmarks/bench_ingest.py --records 200000 --skip-legacy
+import argparse, json, random, sqlite3, sys, tempfile, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from synth import DB_DIR, game_name, migrate
+
+sys.path.insert(0, str(DB_DIR))
+import bulk, load_snapshot
+
+def write_feed(path, records, apps, seed=7):
+    """Scrapy `-O x.json` style feed: `records // apps` snapshots of `apps` games."""
+    rng = random.Random(seed)
+    names = {app_id: game_name(rng) for app_id in range(10, 10 + apps)}
+    start = datetime(2025, 1, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(records):
+            app_id = 10 + i % apps
+            ts = (start + timedelta(hours=i // apps)).isoformat()
+            avg = rng.randint(0, 500_000)
+            f.write(("" if i == 0 else ",\n") + json.dumps({
+                "timestamp": ts, "rank": i % apps + 1, "app_id": app_id, "name": names[app_id],
+                "avg_players": avg, "peak_players": avg + rng.randint(0, 50_000),
+                "detail_url": f"https://steamcharts.com/app/{app_id}",
+            }))
+        f.write("\n]\n")
+
+def fresh_db(path):
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(path) + suffix).unlink(missing_ok=True)
+    with sqlite3.connect(path, isolation_level=None) as con:
+        migrate.apply(con, log=lambda msg: None)
+
+def legacy_load(db, feed):
+    # Same statements as the old load_snapshot.py: json.loads + one execute per row and table
+    rows = json.loads(Path(feed).read_text(encoding="utf-8"))
+    with sqlite3.connect(db) as con:
+        cur = con.cursor()
+        cur.execute("PRAGMA foreign_keys = ON")
+        for r in rows:
+            app_id = r.get("app_id")
+            if not app_id:
+                continue
+            cur.execute("""
+                INSERT INTO apps (app_id, name) VALUES (?, ?)
+                ON CONFLICT(app_id) DO UPDATE SET name = COALESCE(excluded.name, apps.name)
+            """, (int(app_id), r.get("name")))
+            cur.execute("""
+                INSERT OR REPLACE INTO snapshots
+                  (ts, app_id, rank, avg_players, peak_players, detail_url)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (r.get("timestamp"), int(app_id), r.get("rank"), r.get("avg_players"),
+                  r.get("peak_players"), r.get("detail_url")))
+            cur.execute("""
+                INSERT INTO latest_snapshot
+                  (app_id, ts, rank, avg_players, peak_players, all_time_peak)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(app_id) DO UPDATE SET
+                  ts = excluded.ts, rank = excluded.rank,
+                  avg_players = excluded.avg_players, peak_players = excluded.peak_players,
+                  all_time_peak = MAX(COALESCE(latest_snapshot.all_time_peak, 0),
+                                      COALESCE(excluded.peak_players, 0))
+                WHERE excluded.ts >= latest_snapshot.ts
+            """, (int(app_id), r.get("timestamp"), r.get("rank"), r.get("avg_players"),
+                  r.get("peak_players"), r.get("peak_players")))
+        con.commit()
+
+def bulk_load(db, feed, fast, batch_size):
+    con = bulk.connect(db, fast=fast)
+    try:
+        load_snapshot.load(con, bulk.iter_records(feed), batch_size)
+    finally:
+        con.close()
+
+def fingerprint(db):
+    with sqlite3.connect(db) as con:
+        return tuple(
+            con.execute(sql).fetchone()
+            for sql in (
+                "SELECT COUNT(*), SUM(avg_players) FROM snapshots",
+                "SELECT COUNT(*), SUM(avg_players), SUM(all_time_peak), MAX(ts) FROM latest_snapshot",
+                "SELECT COUNT(*) FROM apps",
+            )
+        )
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--records", type=int, default=1_000_000)
+    p.add_argument("--apps", type=int, default=10_000)
+    p.add_argument("--batch-size", type=int, default=bulk.BATCH_SIZE)
+    p.add_argument("--skip-legacy", action="store_true")
+    p.add_argument("--dir", default=tempfile.gettempdir())
+    args = p.parse_args()
+
+    work = Path(args.dir)
+    feed = work / "gamesearch_bench_ingest.json"
+    db = work / "gamesearch_bench_ingest.db"
+    write_feed(feed, args.records, args.apps)
+    print(f"feed: {args.records:,} records, {feed.stat().st_size / 1e6:.0f} MB")
+
+    cases = [("bulk", lambda: bulk_load(db, feed, False, args.batch_size)),
+             ("bulk --fast", lambda: bulk_load(db, feed, True, args.batch_size))]
+    if not args.skip_legacy:
+        cases.insert(0, ("legacy per-row", lambda: legacy_load(db, feed)))
+
+    print(f"{'case':<20}{'seconds':>10}{'rows/sec':>14}")
+    prints = {}
+    for name, fn in cases:
+        fresh_db(db)
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        prints[name] = fingerprint(db)
+        print(f"{name:<20}{dt:>10.2f}{args.records / dt:>14,.0f}")
+
+    assert len(set(prints.values())) == 1, f"loaders disagree: {prints}"
+    print("all loaders produced identical tables")
+
+if __name__ == "__main__":
+    main()
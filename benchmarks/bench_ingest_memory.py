@@ -0,0 +1,93 @@
+# benchmarks/bench_ingest_memory.py
+# Peak RSS of db/upsert_catalog.py-style loads as the feed grows; it should stay flat.
+# Each load runs in a fresh child process so ru_maxrss is per load.
+#
+#   python benchmarks/bench_ingest_memory.py
+#   python benchmarks/bench_ingest_memory.py --sizes 20000 80000 320000 --formats jsonl.gz
+import argparse, gzip, json, random, resource, subprocess, sys, tempfile
+from pathlib import Path
+
+from synth import DB_DIR, game_name, migrate
+
+sys.path.insert(0, str(DB_DIR))
+import bulk, upsert_catalog
+
+# The smallest size warms SQLite's page caches (capped by bulk.CACHE_SIZE);
+# from the second size on, peak RSS may only wobble by allocator noise.
+TOLERANCE_MB = 32
+
+def write_catalog(path, records, seed=7):
+    """Catalog records with ~2 KB descriptions (scrapy jsonl, json array, optionally gzipped)."""
+    rng = random.Random(seed)
+    descriptions = [" ".join(game_name(rng) for _ in range(150)) for _ in range(256)]
+    fmt = bulk.feed_format(path)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        if fmt == "json":
+            f.write("[\n")
+        for i in range(records):
+            rec = {
+                "app_id": 10 + i, "name": game_name(rng),
+                "short_description": rng.choice(descriptions),
+                "release_date": "1 Jan, 2024", "developers": ["Studio"], "publishers": ["Pub"],
+                "genres": ["Action", "Indie"], "categories": ["Single-player"],
+                "store_app_url": f"https://store.steampowered.com/app/{10 + i}/",
+                "last_refreshed": "2025-01-01T00:00:00",
+            }
+            line = json.dumps(rec, ensure_ascii=False)
+            f.write((",\n" if fmt == "json" and i else "") + line + ("\n" if fmt == "jsonl" else ""))
+        if fmt == "json":
+            f.write("\n]\n")
+
+def child(feed, db):
+    con = bulk.connect(db)
+    try:
+        stats = upsert_catalog.load(con, bulk.iter_records(feed))
+    finally:
+        con.close()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print(json.dumps({"read": stats["read"], "peak_mb": peak_kb / 1024}))
+
+def measure(feed, db):
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(db) + suffix).unlink(missing_ok=True)
+    with migrate.sqlite3.connect(db, isolation_level=None) as con:
+        migrate.apply(con, log=lambda msg: None)
+    out = subprocess.run([sys.executable, __file__, "--child", str(feed), str(db)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--sizes", type=int, nargs="+", default=[20_000, 80_000, 240_000])
+    p.add_argument("--formats", nargs="+", default=["jsonl", "jsonl.gz", "json"])
+    p.add_argument("--dir", default=tempfile.gettempdir())
+    p.add_argument("--child", nargs=2, metavar=("FEED", "DB"), help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    work = Path(args.dir)
+    db = work / "gamesearch_bench_ingest_mem.db"
+    print(f"{'format':<10}{'records':>10}{'feed MB':>10}{'peak RSS MB':>14}")
+    failed = False
+    for fmt in args.formats:
+        peaks = []
+        for n in args.sizes:
+            feed = work / f"gamesearch_bench_catalog_{n}.{fmt}"
+            write_catalog(feed, n)
+            res = measure(feed, db)
+            assert res["read"] == n, res
+            peaks.append(res["peak_mb"])
+            print(f"{fmt:<10}{n:>10,}{feed.stat().st_size / 1e6:>10.0f}{res['peak_mb']:>14.1f}")
+            feed.unlink()
+        growth = peaks[-1] - peaks[min(1, len(peaks) - 1)]
+        ok = growth <= TOLERANCE_MB
+        failed |= not ok
+        print(f"{fmt:<10} growth {growth:+.1f} MB from {args.sizes[min(1, len(peaks) - 1)]:,} "
+              f"to {args.sizes[-1]:,} records: "
+              f"{'OK' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_keyset.py
+# Keyset cursors end to end, then LIMIT/OFFSET vs. cursor cost by page depth.
+#   - walks: /games and /api/search through TestClient on a small DB with few
+#     distinct player counts, NULL current players / peaks, NULL and duplicate
+#     names; every sort (plain, FTS, LIKE fallback) follows next_cursor to the
+#     end and must list exactly the OFFSET walk's rows, each once, `total` rows
+#   - timings: the compiled /games plans (backend/query.py) on a large DB
+#
+#   python benchmarks/bench_keyset.py --apps 200000
+import argparse, os, sqlite3, sys, tempfile
+from pathlib import Path
+
+from bench_serialize import add_steam_items
+from synth import ROOT, make_db, timed
+
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT))
+from paging import keyset_params
+
+SIZE = 200        # timed pages
+WALK_SIZE = 37    # walked pages: page breaks fall inside runs of equal keys
+
+GAMES_QUERIES = ("", "&q=counter", "&q=trike")                # all, FTS, LIKE fallback
+API_QUERIES = ("", "&q=item", "&q=tem%201", "&q=12")          # all, FTS, LIKE fallback, id or FTS
+API_SORTS = [s + k for k in ("current", "peak", "timestamp", "name") for s in "+-"] + ["relevance"]
+
+def walk_db(path, apps):
+    """Few distinct values per sort column, NULL sort keys and names (steam_items:
+    NULL names only; api/app.py renders current / peak as int)."""
+    make_db(path, apps=apps, snapshots=apps)
+    add_steam_items(path, rows=apps)
+    with sqlite3.connect(path) as con:
+        con.execute("""UPDATE latest_snapshot SET
+                         avg_players   = CASE WHEN app_id % 7 = 0 THEN NULL ELSE app_id % 5 END,
+                         peak_players  = app_id % 4,
+                         all_time_peak = CASE WHEN app_id % 9 = 0 THEN NULL ELSE app_id % 3 END""")
+        con.execute("""UPDATE apps SET name = CASE WHEN app_id % 11 = 0 THEN NULL
+                                                   WHEN app_id % 4 = 0 THEN 'Counter Strike'
+                                                   ELSE name END""")
+        con.execute("""UPDATE steam_items SET current = rowid % 5, peak = rowid % 4,
+                         name = CASE WHEN rowid % 11 = 0 THEN NULL WHEN rowid % 4 = 0 THEN 'Item 12'
+                                     ELSE name END""")
+
+def walk(client, path, items, ident):
+    """Rows of `path` by next_cursor and by page=N; both must match, once each."""
+    def get(url):
+        r = client.get(url)
+        assert r.status_code == 200, (url, r.status_code, r.text)
+        return r.json()
+
+    body = get(path)
+    total = body["total"]
+    by_cursor = [row[ident] for row in body[items]]
+    while body["next_cursor"]:
+        body = get(f"{path}&cursor={body['next_cursor']}")
+        by_cursor += [row[ident] for row in body[items]]
+
+    by_offset, page = [], 1
+    while True:
+        rows = get(f"{path}&page={page}")[items]
+        by_offset += [row[ident] for row in rows]
+        if len(rows) < WALK_SIZE:
+            break
+        page += 1
+
+    assert by_cursor == by_offset, f"{path}: cursor walk diverged from OFFSET walk"
+    assert len(set(by_cursor)) == len(by_cursor) == total, \
+        f"{path}: {len(by_cursor)} rows, {len(set(by_cursor))} distinct, total {total}"
+    return total
+
+def walks(db):
+    os.environ.update(GSE_DB=str(db), GSE_API_DB=str(db), GSE_RESPONSE_CACHE="0")
+    from fastapi.testclient import TestClient
+    import main
+    from api import app as legacy
+
+    with sqlite3.connect(db) as con:
+        apps = con.execute("SELECT COUNT(*) FROM steamcharts_top").fetchone()[0]
+        items = con.execute("SELECT COUNT(*) FROM steam_items").fetchone()[0]
+    n = 0
+    with TestClient(main.app) as client:
+        for q in GAMES_QUERIES:
+            for sort in main.SORT_KEYS:
+                total = walk(client, f"/games?size={WALK_SIZE}&sort={sort}{q}", "items", "app_id")
+                assert q or total == apps, f"/games sort={sort}: {total} of {apps} rows"
+                n += 1
+    with TestClient(legacy.app) as client:
+        for q in API_QUERIES:
+            for sort in API_SORTS:
+                total = walk(client, f"/api/search?page_size={WALK_SIZE}&sort={sort.replace('+', '%2B')}{q}",
+                             "data", "app_id")
+                assert q or total == items, f"/api/search sort={sort}: {total} of {items} rows"
+                n += 1
+    print(f"cursor walks OK: {n} walks (every sort x query path), identical to OFFSET, no duplicates or gaps")
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=200_000)
+    p.add_argument("--walk-apps", type=int, default=1500)
+    p.add_argument("--repeat", type=int, default=10)
+    p.add_argument("--db", default=None)
+    p.add_argument("--reuse", action="store_true")
+    args = p.parse_args()
+
+    walk_path = Path(tempfile.gettempdir()) / "gamesearch_bench_keyset_walk.db"
+    walk_db(walk_path, args.walk_apps)
+    walks(walk_path)
+
+    from main import GAMES
+    db = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "gamesearch_bench_keyset.db"
+    if not (args.reuse and db.exists()):
+        make_db(db, apps=args.apps, snapshots=args.apps)
+    con = sqlite3.connect(db)
+    con.row_factory = sqlite3.Row
+    rows = con.execute("SELECT COUNT(*) FROM steamcharts_top").fetchone()[0]    # --reuse: not --apps
+    pages = max(1, -(-rows // SIZE))
+    offset_sql = GAMES.plan(False, (), "current").page_sql
+
+    def offset_page(page):
+        return con.execute(offset_sql, (SIZE, (page - 1) * SIZE)).fetchall()
+
+    def cursor_page(after):
+        if after is None:
+            return offset_page(1)
+        key, row_id = after["sort_key"], after["row_id"]
+        plan = GAMES.plan(False, (), "current", "after" if key is not None else "after_null")
+        return con.execute(plan.page_sql, keyset_params(key, row_id) + (SIZE,)).fetchall()
+
+    print(f"\n{rows} rows, {pages} pages of {SIZE}")
+    print(f"{'page':>8}{'OFFSET p50':>12}{'cursor p50':>12}")
+    for depth in sorted({d for d in (1, 10, 100, pages // 2, pages) if 1 <= d <= pages}):
+        after = con.execute(offset_sql, (1, (depth - 1) * SIZE - 1)).fetchone() if depth > 1 else None
+        assert [r["app_id"] for r in offset_page(depth)] == [r["app_id"] for r in cursor_page(after)], depth
+        a = timed(lambda: offset_page(depth), args.repeat)
+        b = timed(lambda: cursor_page(after), args.repeat)
+        print(f"{depth:>8}{a['p50']:>12.2f}{b['p50']:>12.2f}")
+    con.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_latest_snapshot.py
+# Correlated-subquery view vs. materialized latest_snapshot, using the /games queries.
+#
+#   python benchmarks/bench_latest_snapshot.py                       # 10M snapshots (slow to build)
+#   python benchmarks/bench_latest_snapshot.py --snapshots 1000000 --db /tmp/bench.db
+import argparse, sqlite3, tempfile
+from pathlib import Path
+
+from synth import make_db, timed
+
+OLD_VIEW = """
+CREATE VIEW IF NOT EXISTS top_old AS
+SELECT a.app_id AS app_id, a.name AS name,
+       s.avg_players AS current_players, s.peak_players AS peak_24h, s.peak_players AS all_time_peak
+FROM apps a
+JOIN snapshots s ON s.app_id = a.app_id
+WHERE s.ts = (SELECT MAX(s2.ts) FROM snapshots s2 WHERE s2.app_id = a.app_id)
+"""
+
+NEW_VIEW = """
+CREATE VIEW IF NOT EXISTS top_new AS
+SELECT a.app_id AS app_id, a.name AS name,
+       l.avg_players AS current_players, l.peak_players AS peak_24h, l.all_time_peak AS all_time_peak
+FROM latest_snapshot l
+JOIN apps a ON a.app_id = l.app_id
+"""
+
+def games_page(con, table, q=None):
+    # Same shape as backend/main.py:list_games (COUNT + page)
+    where, params = "", ()
+    if q:
+        where, params = " WHERE LOWER(name) LIKE ?", (f"%{q}%",)
+    con.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()
+    con.execute(
+        f"SELECT app_id, name, current_players, peak_24h, all_time_peak FROM {table}{where} "
+        f"ORDER BY current_players DESC LIMIT ? OFFSET ?",
+        params + (25, 0),
+    ).fetchall()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=5000)
+    p.add_argument("--snapshots", type=int, default=10_000_000)
+    p.add_argument("--repeat", type=int, default=30)
+    p.add_argument("--old-repeat", type=int, default=3,
+                   help="Runs for the old view (it is O(snapshots x rows-per-app); keep this small)")
+    p.add_argument("--db", default=None, help="Reuse/build DB at this path (default: temp file)")
+    p.add_argument("--reuse", action="store_true", help="Skip building if --db already exists")
+    args = p.parse_args()
+
+    db = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "gamesearch_bench_latest.db"
+    if not (args.reuse and db.exists()):
+        make_db(db, apps=args.apps, snapshots=args.snapshots)
+
+    con = sqlite3.connect(db)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_app_id ON snapshots(app_id)")
+    con.execute(OLD_VIEW)
+    con.execute(NEW_VIEW)
+
+    print(f"{'case':<28}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, q in (("unfiltered", None), ("q='war'", "war")):
+        for table in ("top_old", "top_new"):
+            n = args.old_repeat if table == "top_old" else args.repeat
+            r = timed(lambda: games_page(con, table, q), n)
+            print(f"{table + ' ' + label:<28}{r['p50']:>10.2f}{r['p99']:>10.2f}")
+    con.close()
+
+if __name__ == "__main__":
+    main()
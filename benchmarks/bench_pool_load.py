@@ -0,0 +1,41 @@
+# benchmarks/bench_pool_load.py
+# Throughput of /games with the pooled read-only connections vs. connect-per-request
+# (GSE_POOL=0), against a local uvicorn.
+#
+#   python benchmarks/bench_pool_load.py --apps 50000 --concurrency 64 --duration 15
+import argparse, tempfile
+from pathlib import Path
+
+from loadgen import header, load, report, serve
+from synth import make_db
+
+PATHS = [
+    "/games?size=25",
+    "/games?size=25&page=2",
+    "/games?size=50&sort=peak",
+    "/games?size=25&sort=name",
+    "/games?size=25&q=war",
+    "/games/10",
+]
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("--duration", type=float, default=15.0)
+    p.add_argument("--db", default=None)
+    p.add_argument("--reuse", action="store_true")
+    args = p.parse_args()
+
+    db = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "gamesearch_bench_pool.db"
+    if not (args.reuse and db.exists()):
+        make_db(db, apps=args.apps, snapshots=args.apps * 4)
+
+    header()
+    for label, pool in (("connect per request", "0"), ("pooled read-only", "1")):
+        with serve(env={"GSE_DB": str(db), "GSE_POOL": pool}) as base:
+            load(base, PATHS, args.concurrency, 2.0)  # warm-up
+            report(label, load(base, PATHS, args.concurrency, args.duration))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# benchmarks/bench_query_engine.py
+# One query layer for /games (backend/main.py) and /api/search (api/app.py):
+# request shapes compiled once into parameterized SQL (backend/query.py),
+# prepared statements kept by sqlite3's per-connection cache.
+#   - response bodies == the previous commit, for every request shape of both
+#     APIs: plain, FTS, LIKE fallback, app id, facets (filter and probe),
+#     range filters, estimates, 3-page cursor walks in both directions
+#   - per-request CPU (in-process TestClient, time.process_time), previous
+#     commit vs this tree vs this tree without the statement cache
+#   - compile vs cached plan lookup; plan cache hits after the run
+#
+#   python benchmarks/bench_query_engine.py
+import argparse, io, json, os, random, sqlite3, subprocess, sys, tarfile, tempfile, time
+from pathlib import Path
+
+from bench_serialize import add_steam_items
+from synth import ROOT, make_db
+
+PATHS = {
+    "main": [
+        "/games?size=25",
+        "/games?size=25&q=counter%20strike",
+        "/games?size=25&q=trike",
+        "/games?size=50&sort=name&include_total=estimate",
+        "/games?size=25&genre=RPG",
+        "/games?size=25&genre=RPG&genre=Racing&category=Co-op&sort=-peak",
+        "/games?size=25&genre=Indie&facets=true",
+    ],
+    "api": [
+        "/api/search?page_size=50",
+        "/api/search?page_size=25&q=item%201",
+        "/api/search?page_size=25&q=12",
+        "/api/search?page_size=25&q=tem%2012&sort=name",
+        "/api/search?page_size=25&q=item&sort=relevance&include_total=estimate",
+        "/api/search?page_size=25&min_current=1000&from=2024-05-03&to=2024-05-20&sort=+timestamp",
+    ],
+}
+# cursor walks: page 1, then next_cursor twice (CPU measured on page 2)
+WALKS = {
+    "main": ["/games?size=50&sort=-peak24", "/games?size=50&sort=current&genre=RPG"],
+    "api": ["/api/search?page_size=50&sort=-peak", "/api/search?page_size=50&sort=+current&min_current=100"],
+}
+GENRES = ["Action", "RPG", "Racing", "Indie", "Strategy", "Simulation"]
+CATEGORIES = ["Single-player", "Multi-player", "Co-op"]
+
+def baseline_rev():
+    """Last commit before the shared query layer."""
+    out = subprocess.run(["git", "log", "--format=%H", "-1", "--grep", r"^\[user-023\]"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    return out or "HEAD"
+
+def add_facets(db, seed=7):
+    """A genre or two and a category per app (facet tables of migration 0012)."""
+    rng = random.Random(seed)
+    with sqlite3.connect(db) as con:
+        con.execute("DELETE FROM app_facets")
+        con.execute("DELETE FROM facet_values")
+        values = [("genre", g) for g in GENRES] + [("category", c) for c in CATEGORIES]
+        con.executemany("INSERT INTO facet_values (facet_id, kind, value) VALUES (?, ?, ?)",
+                        ((i, k, v) for i, (k, v) in enumerate(values, 1)))
+        genre_ids = range(1, len(GENRES) + 1)
+        category_ids = range(len(GENRES) + 1, len(values) + 1)
+        rows = set()
+        for (app_id,) in con.execute("SELECT app_id FROM apps").fetchall():
+            for fid in rng.sample(genre_ids, rng.randint(1, 2)):
+                rows.add((fid, app_id))
+            rows.add((rng.choice(category_ids), app_id))
+        con.executemany("INSERT INTO app_facets (facet_id, app_id) VALUES (?, ?)", sorted(rows))
+
+def cpu_p50(client, path, repeat):
+    for _ in range(20):
+        client.get(path)
+    cpu = []
+    for _ in range(repeat):
+        t = time.process_time()
+        client.get(path)
+        cpu.append((time.process_time() - t) * 1000)
+    cpu.sort()
+    return cpu[len(cpu) // 2]
+
+def measure(tree, db, repeat):
+    """Child process: bodies and per-request CPU of the apps in `tree` (backend/ + api/)."""
+    sys.path.insert(0, str(Path(tree) / "backend"))
+    sys.path.insert(0, str(tree))
+    os.environ.update(GSE_DB=str(db), GSE_API_DB=str(db), GSE_RESPONSE_CACHE="0")
+    from fastapi.testclient import TestClient
+    import main
+    from api import app as legacy
+    from db import ReadPool
+    if legacy.DB_PATH != str(db):                      # before GSE_API_DB
+        legacy.POOL = ReadPool(db)
+    out = {}
+    for name, app in (("main", main.app), ("api", legacy.app)):
+        with TestClient(app) as client:
+            for path in PATHS[name]:
+                r = client.get(path)
+                assert r.status_code == 200, (path, r.status_code, r.text)
+                out[path] = {"body": r.json(), "cpu_ms": cpu_p50(client, path, repeat)}
+            for path in WALKS[name]:
+                pages, url = [], path
+                for _ in range(3):
+                    body = client.get(url).json()
+                    pages.append(body)
+                    url = f"{path}&cursor={body['next_cursor']}"
+                    if len(pages) == 1:
+                        page2 = url
+                out[path + " (walk)"] = {"body": pages, "cpu_ms": cpu_p50(client, page2, repeat)}
+    if hasattr(main, "GAMES"):
+        out["plans"] = {"main": main.GAMES.stats(), "api": legacy.ITEMS.stats()}
+    print(json.dumps(out))
+
+def compile_cost(repeat):
+    sys.path.insert(0, str(ROOT / "backend"))
+    from query import Source
+    import main
+    src = Source(main.GAMES.from_sql, main.GAMES.columns, main.GAMES.id_col, main.GAMES.sorts,
+                 main.GAMES.conds, main.GAMES.text_from)
+    shape = (False, (("like", 1), ("facet", 2), ("facet", 1)), "-peak", "after")
+    t = time.process_time()
+    for _ in range(repeat):
+        src._compile(*shape)
+    compiled = (time.process_time() - t) * 1e6 / repeat
+    t = time.process_time()
+    for _ in range(repeat):
+        src.plan(*shape)
+    cached = (time.process_time() - t) * 1e6 / repeat
+    print(f"compile a /games plan: {compiled:.1f} us, cached lookup: {cached:.1f} us")
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--repeat", type=int, default=300)
+    p.add_argument("--baseline", default=None, help="git rev to compare with (default: the user-023 commit)")
+    p.add_argument("--measure", nargs=2, metavar=("TREE", "DB"), help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.measure:
+        return measure(args.measure[0], args.measure[1], args.repeat)
+
+    db = Path(tempfile.gettempdir()) / "gamesearch_bench_query_engine.db"
+    make_db(db, apps=args.apps, snapshots=args.apps * 4)
+    add_steam_items(db)
+    add_facets(db)
+    compile_cost(args.repeat * 10)
+
+    rev = args.baseline or baseline_rev()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data = subprocess.run(["git", "archive", rev, "backend", "api"], cwd=ROOT, capture_output=True,
+                              check=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            tar.extractall(tmp)
+        runs = ((rev[:8], tmp, {}), ("now", str(ROOT), {}),
+                ("no stmt cache", str(ROOT), {"GSE_CACHED_STATEMENTS": "0"}))
+        for label, tree, env in runs:
+            out = subprocess.run([sys.executable, __file__, "--measure", tree, str(db), "--repeat", str(args.repeat)],
+                                 capture_output=True, text=True, check=True, env={**os.environ, **env})
+            results[label] = json.loads(out.stdout)
+
+    before, after, uncached = results.values()
+    keys = PATHS["main"] + [w + " (walk)" for w in WALKS["main"]] + PATHS["api"] + [w + " (walk)" for w in WALKS["api"]]
+    for key in keys:
+        assert before[key]["body"] == after[key]["body"] == uncached[key]["body"], f"{key}: body differs"
+    print(f"\n{'per-request CPU, p50 ms':<88}{rev[:8]:>10}{'now':>8}{'no stmt cache':>15}")
+    for key in keys:
+        print(f"{key:<88}{before[key]['cpu_ms']:>10.2f}{after[key]['cpu_ms']:>8.2f}{uncached[key]['cpu_ms']:>15.2f}")
+    print(f"\nplan cache after the run: {after['plans']}")
+    print("identical bodies (backend/main.py and api/app.py, every shape)")
+
+if __name__ == "__main__":
+    main()
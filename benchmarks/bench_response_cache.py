@@ -0,0 +1,80 @@
+# benchmarks/bench_response_cache.py
+# /games response cache (backend/respcache.py): throughput of a frontend-like
+# mix (default listing pages, search-as-you-type prefixes) with the cache off
+# (GSE_RESPONSE_CACHE=0) and on, plus the correctness checks:
+#   - cached bodies == uncached bodies
+#   - If-None-Match with the current ETag -> 304, no body
+#   - a snapshot load (data generation bump) invalidates: new ETag, fresh data
+#   - hit ratio reported by /stats
+#
+#   python benchmarks/bench_response_cache.py --apps 50000 --concurrency 32 --duration 10
+import argparse, sys, tempfile
+from pathlib import Path
+
+import httpx
+
+from loadgen import header, load, report, serve
+from synth import DB_DIR, make_db, timed
+
+sys.path.insert(0, str(DB_DIR))
+import load_snapshot
+from bulk import connect
+
+TYPED = ["s", "st", "str", "stri", "strik", "strike", "w", "wa", "war"]
+PATHS = (
+    ["/games?size=25"] * 6 + ["/games?size=25&page=2", "/games?size=25&page=3", "/games?size=25&sort=peak"]
+    + [f"/games?size=25&q={q}" for q in TYPED]
+    + ["/games?size=25&sort=name", "/games?size=25&genre=RPG&facets=true"]
+)
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--duration", type=float, default=10.0)
+    args = p.parse_args()
+
+    db = Path(tempfile.gettempdir()) / "gamesearch_bench_response_cache.db"
+    make_db(db, apps=args.apps, snapshots=args.apps * 4)
+
+    bodies, single = {}, {}
+    header()
+    for label, enabled in (("response cache off", "0"), ("response cache on", "1")):
+        with serve(env={"GSE_DB": str(db), "GSE_RESPONSE_CACHE": enabled}) as base:
+            with httpx.Client(base_url=base) as client:
+                bodies[enabled] = [client.get(path).json() for path in PATHS]
+                single[enabled] = {path: timed(lambda: client.get(path), 50)["p50"] for path in PATHS[-5:]}
+            load(base, PATHS, args.concurrency, 2.0)  # warm-up
+            report(label, load(base, PATHS, args.concurrency, args.duration))
+    assert bodies["0"] == bodies["1"], "cached responses differ from uncached ones"
+
+    print(f"\n{'one client, p50 ms':<42}{'off':>8}{'on':>8}")
+    for path in PATHS[-5:]:
+        print(f"{path:<42}{single['0'][path]:>8.2f}{single['1'][path]:>8.2f}")
+
+    with serve(env={"GSE_DB": str(db)}) as base, httpx.Client(base_url=base) as client:
+        first = client.get("/games?size=5")
+        etag = first.headers["etag"]
+        again = client.get("/games?size=5", headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+        assert "hit" in again.headers["server-timing"]
+
+        # An ingest bumps the data generation: old ETag no longer matches, new data shows
+        top = first.json()["items"][0]
+        con = connect(db)
+        load_snapshot.load(con, iter([{"timestamp": "2030-01-01T00:00:00", "app_id": top["app_id"],
+                                       "rank": 1, "avg_players": 10**9, "peak_players": 10**9}]))
+        con.close()
+        after = client.get("/games?size=5", headers={"If-None-Match": etag})
+        assert after.status_code == 200 and after.headers["etag"] != etag
+        assert after.json()["items"][0]["current"] == 10**9
+
+        for path in PATHS * 20:
+            client.get(path)
+        stats = client.get("/stats").json()["response_cache"]
+    print(f"\ncached == uncached bodies; 304 on If-None-Match; ingest invalidates "
+          f"(ETag {etag} -> {after.headers['etag']})")
+    print(f"/stats response_cache: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_rollups.py
+# Daily / weekly rollups (db/rollups.py, migration 0010):
+#   - per-crawl ingest cost of load_snapshot with and without the rollup merges
+#   - incrementally maintained rollups == a full rebuild from raw rows
+#   - compaction: raw rows / file size before and after, rollups and
+#     all_time_peak unchanged, replaying a compacted day changes nothing
+#
+#   python benchmarks/bench_rollups.py
+#   python benchmarks/bench_rollups.py --apps 500 --days 365 --keep-days 30
+import argparse, os, random, sqlite3, sys, tempfile, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from synth import DB_DIR, make_db
+
+sys.path.insert(0, str(DB_DIR))
+import load_snapshot, rollups
+from bulk import connect
+from rebuild_latest import rebuild as rebuild_latest
+
+def crawl(apps, ts, rng):
+    return [
+        {"timestamp": ts, "app_id": app_id, "rank": rank, "avg_players": int(rng.paretovariate(1.2) * 50),
+         "peak_players": int(rng.paretovariate(1.2) * 80), "name": None}
+        for rank, app_id in enumerate(range(10, 10 + apps), start=1)
+    ]
+
+def dump(con, sql):
+    return con.execute(sql).fetchall()
+
+ROLLUPS = ("SELECT * FROM snapshots_daily ORDER BY app_id, day", "SELECT * FROM snapshots_weekly ORDER BY app_id, week")
+PEAKS = "SELECT app_id, all_time_peak FROM latest_snapshot ORDER BY app_id"
+
+def ingest(db, crawls, merge_sqls):
+    con = connect(db)
+    saved, load_snapshot.MERGE_SQLS = load_snapshot.MERGE_SQLS, merge_sqls
+    try:
+        t0 = time.perf_counter()
+        for records in crawls:
+            load_snapshot.load(con, iter(records))
+        return (time.perf_counter() - t0) / len(crawls) * 1000
+    finally:
+        load_snapshot.MERGE_SQLS = saved
+        con.close()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=200)
+    p.add_argument("--days", type=int, default=180, help="Days of hourly history")
+    p.add_argument("--keep-days", type=int, default=30)
+    p.add_argument("--crawls", type=int, default=24, help="Extra crawls loaded through load_snapshot")
+    args = p.parse_args()
+
+    tmp = Path(tempfile.gettempdir())
+    db = tmp / "gamesearch_bench_rollups.db"
+    make_db(db, apps=args.apps, snapshots=args.apps * args.days * 24)
+
+    # Next day's crawls, loaded twice: without rollup merges (copy) and with them
+    rng = random.Random(11)
+    start = datetime(2024, 1, 1) + timedelta(days=args.days)
+    crawls = [crawl(args.apps, (start + timedelta(hours=h)).isoformat(), rng) for h in range(args.crawls)]
+    base = [sql for sql in load_snapshot.MERGE_SQLS if sql not in rollups.ROLLUP_MERGE_SQLS]
+    plain_db = tmp / "gamesearch_bench_rollups_plain.db"
+    plain_db.write_bytes(db.read_bytes())
+    ms_plain = ingest(plain_db, crawls, base)
+    ms_rollup = ingest(db, crawls, load_snapshot.MERGE_SQLS)
+    plain_db.unlink()
+
+    con = connect(db)
+    incremental = [dump(con, sql) for sql in ROLLUPS]
+    con.execute("BEGIN")
+    rollups.rebuild(con, since="")
+    con.execute("COMMIT")
+    assert [dump(con, sql) for sql in ROLLUPS] == incremental, "incremental rollups differ from a full rebuild"
+
+    print(f"{args.apps} apps x {args.days} days hourly + {args.crawls} crawls through load_snapshot")
+    print(f"ingest per crawl: {ms_plain:.1f} ms without rollups, {ms_rollup:.1f} ms with")
+
+    # Compaction relative to the last loaded day
+    today = (start + timedelta(days=1)).date()
+    raw_before = con.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    peaks = dump(con, PEAKS)
+    con.close()
+    size_before = os.path.getsize(db)
+
+    con = connect(db)
+    t0 = time.perf_counter()
+    con.execute("BEGIN")
+    horizon, deleted = rollups.compact(con, args.keep_days, today=today)
+    con.execute("COMMIT")
+    t_compact = time.perf_counter() - t0
+    con.execute("VACUUM")
+    size_after = os.path.getsize(db)
+
+    assert [dump(con, sql) for sql in ROLLUPS] == incremental, "compaction changed the rollups"
+    assert con.execute("SELECT MIN(ts) FROM snapshots").fetchone()[0] >= horizon
+    con.execute("BEGIN")
+    rebuild_latest(con)
+    con.execute("COMMIT")
+    assert dump(con, PEAKS) == peaks, "all_time_peak changed after compaction + rebuild_latest"
+
+    # A replayed feed for a compacted day must not clobber that day's rollup
+    old = crawl(args.apps, "2024-01-02T05:00:00", random.Random(3))
+    load_snapshot.load(con, iter(old))
+    assert [dump(con, sql) for sql in ROLLUPS] == incremental, "replaying a compacted day changed the rollups"
+
+    print(f"compact --keep-days {args.keep_days}: raw rows {raw_before:,} -> {raw_before - deleted:,} "
+          f"in {t_compact:.2f}s, file {size_before / 1048576:.1f} MB -> {size_after / 1048576:.1f} MB (after VACUUM)")
+    con.close()
+    print("rollups match a full rebuild and survive compaction unchanged")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/bench_serialize.py
+# Response serialization without per-row Pydantic models (backend/encode.py):
+#   - encode step alone: Pydantic models + model_dump_json vs dicts + orjson
+#     (and the json fallback), same bytes, CPU per page of 25 / 200 rows
+#   - per-request CPU end to end (in-process TestClient, time.process_time)
+#     for backend/main.py and api/app.py, previous commit vs this tree;
+#     response bodies and /openapi.json must be identical
+#
+#   python benchmarks/bench_serialize.py
+import argparse, io, json, os, sqlite3, subprocess, sys, tarfile, tempfile, time
+from pathlib import Path
+
+from synth import DB_DIR, ROOT, make_db
+
+PATHS = {
+    "main": ["/games?size=200", "/games?size=25", "/games?size=200&sort=name&include_total=false",
+             "/games/trending?size=200&min_players=0", "/games/10/history?bucket=hour&points=500",
+             "/games/suggest?q=co&limit=20"],
+    "api": ["/api/search?page_size=200", "/api/search?page_size=25&sort=name"],
+}
+
+def baseline_rev():
+    """Last commit before the direct serialization path."""
+    out = subprocess.run(["git", "log", "--format=%H", "-1", "--grep", r"^\[user-021\]"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    return out or "HEAD"
+
+def add_steam_items(db, rows=20_000, indexes=True):
+    """The legacy table api/app.py reads (not in the migrated schema), with the
+    FTS index of migration 0006 and the sort indexes of 0013 unless `indexes`
+    is false (both skip steam_items when it comes after the migrations)."""
+    with sqlite3.connect(db) as con:
+        con.execute("DROP TABLE IF EXISTS steam_items")
+        con.execute("DROP TABLE IF EXISTS steam_items_fts")
+        con.execute("CREATE TABLE steam_items (app_id INTEGER, name TEXT, current INTEGER, peak INTEGER,"
+                    " hours INTEGER, timestamp TEXT)")
+        con.executemany("INSERT INTO steam_items VALUES (?, ?, ?, ?, ?, ?)", (
+            (i, f"Item {i}", (i * 7919) % 50_000, (i * 104729) % 90_000, None if i % 3 else i % 500,
+             f"2024-05-{1 + i % 28:02d}T12:00:00") for i in range(rows)))
+        if indexes:
+            sys.path.insert(0, str(DB_DIR / "migrations"))
+            __import__("0006_steam_items_fts").up(con)
+            for col in ("current", "peak", "timestamp", "name"):
+                con.execute(f"CREATE INDEX IF NOT EXISTS idx_items_{col} ON steam_items({col})")
+
+def measure(tree, db, repeat):
+    """Child process: per-request CPU of the apps in `tree` (backend/ + api/)."""
+    sys.path.insert(0, str(Path(tree) / "backend"))
+    sys.path.insert(0, str(tree))
+    os.environ.update(GSE_DB=str(db), GSE_RESPONSE_CACHE="0")
+    from fastapi.testclient import TestClient
+    import main
+    from api import app as legacy
+    from db import ReadPool
+    legacy.POOL = ReadPool(db)
+    out = {}
+    for name, app in (("main", main.app), ("api", legacy.app)):
+        with TestClient(app) as client:
+            out[f"{name} openapi"] = {"body": client.get("/openapi.json").json()}
+            for path in PATHS[name]:
+                body = client.get(path).json()
+                for _ in range(20):
+                    client.get(path)
+                cpu = []
+                for _ in range(repeat):
+                    t = time.process_time()
+                    client.get(path)
+                    cpu.append((time.process_time() - t) * 1000)
+                cpu.sort()
+                out[path] = {"body": body, "cpu_ms": cpu[len(cpu) // 2]}
+    print(json.dumps(out))
+
+def encode_only(db, repeat):
+    sys.path.insert(0, str(ROOT / "backend"))
+    import encode
+    from main import GAME_FIELDS, Game, PagedResponse
+
+    con = sqlite3.connect(db)
+    con.row_factory = sqlite3.Row
+    print(f"{'encode step only':<30}{'rows':>6}{'pydantic ms':>13}{'orjson ms':>11}{'json ms':>9}")
+    for size in (25, 200):
+        rows = con.execute("SELECT app_id, name, current_players AS current, peak_24h AS peak24,"
+                           " all_time_peak AS peak, current_players AS sort_key, app_id AS row_id"
+                           " FROM steamcharts_top ORDER BY current_players DESC LIMIT ?", (size,)).fetchall()
+
+        def old():
+            items = [Game(**dict(r)) for r in rows]
+            return PagedResponse(total=50_000, total_exact=True, page=1, size=size, items=items,
+                                 next_cursor="x").model_dump_json().encode("utf-8")
+
+        def new():
+            return encode.dumps({"total": 50_000, "total_exact": True, "page": 1, "size": size,
+                                 "items": encode.records(rows, GAME_FIELDS), "next_cursor": "x", "facets": None})
+
+        def cpu(fn):
+            t = time.process_time()
+            for _ in range(repeat):
+                fn()
+            return (time.process_time() - t) * 1000 / repeat
+
+        assert new() == old(), "bytes differ from Pydantic's"
+        t_old, t_new = cpu(old), cpu(new)
+        saved, encode.orjson = encode.orjson, None
+        assert new() == old(), "json fallback bytes differ from Pydantic's"
+        t_json = cpu(new)
+        encode.orjson = saved
+        print(f"{'/games page':<30}{size:>6}{t_old:>13.3f}{t_new:>11.3f}{t_json:>9.3f}")
+    con.close()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--repeat", type=int, default=300)
+    p.add_argument("--baseline", default=None, help="git rev to compare with (default: the user-021 commit)")
+    p.add_argument("--measure", nargs=2, metavar=("TREE", "DB"), help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.measure:
+        return measure(args.measure[0], args.measure[1], args.repeat)
+
+    db = Path(tempfile.gettempdir()) / "gamesearch_bench_serialize.db"
+    make_db(db, apps=args.apps, snapshots=args.apps * 4)
+    add_steam_items(db)
+    encode_only(db, args.repeat)
+
+    rev = args.baseline or baseline_rev()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data = subprocess.run(["git", "archive", rev, "backend", "api"], cwd=ROOT, capture_output=True,
+                              check=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            tar.extractall(tmp)
+        for label, tree in ((rev[:8], tmp), ("this tree", str(ROOT))):
+            out = subprocess.run([sys.executable, __file__, "--measure", tree, str(db),
+                                  "--repeat", str(args.repeat)], capture_output=True, text=True, check=True)
+            results[label] = json.loads(out.stdout)
+
+    before, after = results.values()
+    for key in before:
+        assert before[key]["body"] == after[key]["body"], f"{key}: body or OpenAPI schema differs"
+    print(f"\n{'per-request CPU, p50 ms':<52}{rev[:8]:>10}{'now':>8}")
+    for path in PATHS["main"] + PATHS["api"]:
+        print(f"{path:<52}{before[path]['cpu_ms']:>10.2f}{after[path]['cpu_ms']:>8.2f}")
+    print("\nidentical bodies and /openapi.json (backend/main.py and api/app.py)")
+
+if __name__ == "__main__":
+    main()
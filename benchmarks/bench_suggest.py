@@ -0,0 +1,101 @@
+# benchmarks/bench_suggest.py
+# /games/suggest prefix index (backend/suggest.py):
+#   - build time and memory (tracemalloc: held after the build, peak during it)
+#   - suggestions == a brute-force reference (word-start prefix, most players first)
+#   - lookup latency in-process and over HTTP, vs /games?q= for the same prefixes
+#   - a snapshot load (data generation bump) rebuilds the index in the background
+#
+#   python benchmarks/bench_suggest.py
+#   python benchmarks/bench_suggest.py --apps 200000
+import argparse, random, sqlite3, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+import httpx
+
+from loadgen import serve
+from synth import DB_DIR, ROOT, make_db, timed
+
+sys.path.insert(0, str(DB_DIR))
+sys.path.insert(0, str(ROOT / "backend"))
+import load_snapshot
+from bulk import connect
+from suggest import SOURCE_SQL, SuggestIndex, fold
+
+def reference(rows, q, limit):
+    want = fold(q)
+    out = []
+    for app_id, name, current in rows:
+        words = fold(name).split(" ")
+        if want and any(" ".join(words[k:]).startswith(want) for k in range(len(words))):
+            out.append((app_id, name, current or 0))
+            if len(out) == limit:
+                break
+    return out
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=200_000)
+    p.add_argument("--repeat", type=int, default=2000)
+    args = p.parse_args()
+
+    db = Path(tempfile.gettempdir()) / "gamesearch_bench_suggest.db"
+    make_db(db, apps=args.apps, snapshots=args.apps)
+    con = sqlite3.connect(db)
+    rows = con.execute(SOURCE_SQL).fetchall()
+    con.close()
+
+    tracemalloc.start()
+    index = SuggestIndex(rows)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    index = SuggestIndex(rows)           # build time without tracemalloc overhead
+    print(f"index: {index.stats()}")
+    print(f"memory: {held / 2**20:.1f} MiB held, {peak / 2**20:.1f} MiB peak while building")
+
+    rng = random.Random(5)
+    sample = [name for _, name, _ in rng.sample(rows, 200)]
+    queries = ["s", "st", "str", "counter s", "rocket league 1", "zzz", "Ω"]
+    queries += [n[:k] for n in sample for k in (1, 3, 6, 12)]
+    queries += [n.split(" ")[-2][:4] for n in sample if " " in n]
+    for q in queries:
+        assert index.suggest(q, 10) == reference(rows, q, 10), q
+    print(f"{len(queries)} prefixes == brute-force reference")
+
+    cases = {"1 char": "s", "3 chars": "str", "6 chars": "counte", "two words": "counter str",
+             "rare": sample[0][:12], "no match": "zzz"}
+    print(f"\n{'lookup, in-process':<24}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, q in cases.items():
+        t = timed(lambda: index.suggest(q, 10), args.repeat)
+        print(f"{name:<24}{t['p50']:>9.3f}{t['p99']:>9.3f}")
+
+    print(f"\n{'over HTTP':<24}{'suggest p50':>12}{'p99':>8}{'/games?q= p50':>15}{'p99':>8}")
+    with serve(env={"GSE_DB": str(db), "GSE_RESPONSE_CACHE": "0", "GSE_SUGGEST_RECHECK": "0"}) as base, \
+            httpx.Client(base_url=base) as client:
+        for name, q in cases.items():
+            s = timed(lambda: client.get("/games/suggest", params={"q": q}), args.repeat // 4)
+            g = timed(lambda: client.get("/games", params={"q": q, "size": 10, "include_total": "false"}),
+                      args.repeat // 20)
+            print(f"{name:<24}{s['p50']:>12.2f}{s['p99']:>8.2f}{g['p50']:>15.2f}{g['p99']:>8.2f}")
+
+        # An ingest makes an unknown app the most played: the index picks it up
+        top = min(rows, key=lambda r: r[2] or 0)
+        q = fold(top[1]).split(" ")[0]
+        stats = client.get("/stats").json()
+        before, pool = stats["suggest"], stats["pool"]
+        con = connect(db)
+        load_snapshot.load(con, iter([{"timestamp": "2030-01-01T00:00:00", "app_id": top[0],
+                                       "rank": 1, "avg_players": 10**9, "peak_players": 10**9}]))
+        con.close()
+        t0 = time.perf_counter()
+        while client.get("/games/suggest", params={"q": q}).json()["items"][0]["app_id"] != top[0]:
+            assert time.perf_counter() - t0 < 60, "index was not rebuilt after the ingest"
+            time.sleep(0.05)
+        stats = client.get("/stats").json()
+        after = stats["suggest"]
+        # the rebuild thread reads on its own connection, not a pooled one
+        assert stats["pool"]["connections"] == pool["connections"], (pool, stats["pool"])
+    print(f"\ningest -> rebuilt index serving in {time.perf_counter() - t0:.1f}s "
+          f"(generation {before['generation']} -> {after['generation']}, rebuild {after['build_ms']:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
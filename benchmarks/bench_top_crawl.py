@@ -0,0 +1,160 @@
+# benchmarks/bench_top_crawl.py
+# Serial ("Next"-following) vs. fan-out (-a parallel=N) steamcharts_top_all crawls
+# against a local stand-in for steamcharts.com built from toppagehtml.txt.
+# Asserts both modes emit the same items in the same (rank) order, with and
+# without a min_players cutoff, and reports wall-clock time for each, when the
+# first row reached the feed (fan-out streams pages as their predecessors
+# land) and how many pages were fetched.
+#
+#   python benchmarks/bench_top_crawl.py
+#   python benchmarks/bench_top_crawl.py --pages 40 --latency 0.3 --parallel 8
+import argparse, copy, json, subprocess, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import lxml.html
+
+ROOT        = Path(__file__).resolve().parents[1]
+SCRAPY_ROOT = ROOT / "steamcharts_scraper"
+FIXTURE     = ROOT / "toppagehtml.txt"
+ROWS_PER_PAGE = 25
+
+def players(rank):
+    return 2_000_000 // rank
+
+def build_pages(n_pages):
+    """{path: html} for /top/p.1 .. /top/p.N, rows and Next links rewritten per page."""
+    base = lxml.html.fromstring(FIXTURE.read_bytes())
+    pages = {}
+    for page in range(1, n_pages + 1):
+        doc = copy.deepcopy(base)
+        for i, tr in enumerate(doc.xpath('//table[@id="top-games"]/tbody/tr')):
+            rank = (page - 1) * ROWS_PER_PAGE + i + 1
+            td = tr.xpath("./td")
+            td[0].text = f"{rank}."
+            a = td[1].xpath(".//a")[0]
+            a.set("href", f"/app/{1000 + rank}")
+            a.text = f"\n\t\t\t\t\t\tGame {rank}\n\t\t\t\t\t"
+            td[2].text = f"{players(rank):,}"
+            td[4].text = f"{players(rank) * 3 // 2:,}"
+        for a in doc.xpath('//link[@rel="next"] | //a[normalize-space(.)="Next"]'):
+            if page == n_pages:
+                a.getparent().remove(a)
+            else:
+                a.set("href", f"/top/p.{page + 1}")
+        pages[f"/top/p.{page}"] = lxml.html.tostring(doc, encoding="utf-8", doctype="<!DOCTYPE html>")
+    return pages
+
+def serve(pages, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server.fetched += 1
+            time.sleep(latency)
+            body = pages.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body or b"")))
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.fetched = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def child(out, base, parallel, min_players, delay):
+    # One crawl per process (the Twisted reactor cannot be restarted)
+    sys.path.insert(0, str(SCRAPY_ROOT))
+    from scrapy import signals
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.settings import Settings
+    from steamcharts_scraper.spiders.steamcharts_top_all import SteamChartsTopAllSpider
+
+    class LocalTopAll(SteamChartsTopAllSpider):
+        allowed_domains = ["127.0.0.1"]
+        start_urls = [f"{base}/top/p.1"]
+
+    settings = Settings()
+    settings.setmodule("steamcharts_scraper.settings")
+    settings.update({
+        "ITEM_PIPELINES": {},
+        "HTTPCACHE_ENABLED": False,
+        "ROBOTSTXT_OBEY": False,
+        "DOWNLOAD_DELAY": delay,
+        "LOG_LEVEL": "WARNING",
+        "FEEDS": {out: {"format": "jsonlines", "overwrite": True}},
+    })
+    kwargs = {}
+    if parallel:
+        kwargs["parallel"] = parallel
+    if min_players:
+        kwargs["min_players"] = min_players
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(LocalTopAll)
+    t0, first = time.perf_counter(), []
+
+    def first_row(item, **kwargs):          # signals hold receivers weakly: keep a named one
+        if not first:
+            first.append(time.perf_counter() - t0)
+
+    crawler.signals.connect(first_row, signal=signals.item_scraped)
+    process.crawl(crawler, **kwargs)
+    process.start()
+    Path(out + ".first").write_text(str(first[0] if first else 0.0))
+
+def crawl(server, base, parallel, min_players, delay, out):
+    server.fetched = 0
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, __file__, "--child", str(out), base, str(parallel), str(min_players), str(delay)],
+        check=True,
+    )
+    dt = time.perf_counter() - t0
+    items = [json.loads(line) for line in Path(out).read_text(encoding="utf-8").splitlines() if line]
+    for it in items:
+        it.pop("timestamp")
+    first = float(Path(f"{out}.first").read_text())
+    return items, dt, first, server.fetched
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.2, help="Seconds the stand-in server waits per response")
+    p.add_argument("--parallel", type=int, default=4)
+    p.add_argument("--delay", type=float, default=0.0, help="DOWNLOAD_DELAY for both crawls")
+    p.add_argument("--child", nargs=5, help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        out, base, parallel, min_players, delay = args.child
+        return child(out, base, int(parallel), int(min_players), float(delay))
+
+    server, base = serve(build_pages(args.pages), args.latency)
+    out = Path(tempfile.gettempdir()) / "gamesearch_bench_top_crawl.jsonl"
+    # no cutoff; cutoff mid-way through a page in the middle of the list
+    cutoff_rank = (args.pages // 2) * ROWS_PER_PAGE + 7
+    cases = [("full list", 0), (f"min_players cutoff after rank {cutoff_rank}", players(cutoff_rank))]
+
+    print(f"{args.pages} pages x {ROWS_PER_PAGE} rows, {args.latency * 1000:.0f} ms latency, delay {args.delay}s")
+    print(f"{'case':<40}{'serial s':>10}{'fan-out s':>11}{'first row s':>13}{'items':>8}{'pages fetched':>15}")
+    try:
+        for name, min_players in cases:
+            serial, t_serial, _, fetched_serial = crawl(server, base, 0, min_players, args.delay, out)
+            fanout, t_fanout, first, fetched = crawl(server, base, args.parallel, min_players, args.delay, out)
+            diff = next(((a, b) for a, b in zip(serial, fanout) if a != b), None)
+            assert len(serial) == len(fanout) and diff is None, f"{name}: fan-out differs from serial crawl: {diff}"
+            ranks = [it["rank"] for it in fanout]
+            assert ranks == list(range(1, len(ranks) + 1)), f"{name}: items out of rank order"
+            expected = cutoff_rank if min_players else args.pages * ROWS_PER_PAGE
+            assert len(fanout) == expected, f"{name}: {len(fanout)} items, expected {expected}"
+            print(f"{name:<40}{t_serial:>10.2f}{t_fanout:>11.2f}{first:>13.2f}{len(fanout):>8}"
+                  f"{f'{fetched_serial} / {fetched}':>15}")
+    finally:
+        server.shutdown()
+    print("fan-out output matches the serial crawl")
+
+if __name__ == "__main__":
+    main()
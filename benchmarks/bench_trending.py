@@ -0,0 +1,147 @@
+# benchmarks/bench_trending.py
+# Trending scores (db/trending.py, migration 0011, GET /games/trending):
+#   - scores maintained by load_snapshot == a full refresh == a Python
+#     reference computed from the raw snapshots
+#   - per-crawl ingest cost of load_snapshot with and without the trending merges
+#   - endpoint latency vs /games, and vs ranking from snapshots per request
+#
+#   python benchmarks/bench_trending.py
+#   python benchmarks/bench_trending.py --apps 5000 --days 45
+import argparse, bisect, random, sys, tempfile, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from loadgen import serve
+from synth import DB_DIR, make_db, timed
+
+sys.path.insert(0, str(DB_DIR))
+import load_snapshot, trending
+from bulk import connect
+
+SCORES = "SELECT span, app_id, ts, current, previous, delta, pct FROM trending ORDER BY span, app_id"
+
+# What the endpoint would cost without the table: rank straight from snapshots
+ON_THE_FLY_SQL = """
+    SELECT l.app_id, l.avg_players - b.avg_players AS delta
+    FROM latest_snapshot l
+    JOIN snapshots b ON b.app_id = l.app_id AND b.ts = (
+      SELECT MAX(s.ts) FROM snapshots s
+      WHERE s.app_id = l.app_id
+        AND s.ts <= strftime('%Y-%m-%dT%H:%M:%f', l.ts, '-7 days', '+10 minutes')
+        AND s.ts >= strftime('%Y-%m-%dT%H:%M:%f', l.ts, '-14 days'))
+    WHERE b.avg_players >= 100
+    ORDER BY delta DESC, l.app_id DESC LIMIT 25
+"""
+
+def crawl(apps, ts, rng):
+    return [
+        {"timestamp": ts, "app_id": app_id, "rank": rank, "avg_players": int(rng.paretovariate(1.2) * 50),
+         "peak_players": int(rng.paretovariate(1.2) * 80), "name": None}
+        for rank, app_id in enumerate(range(10, 10 + apps), start=1)
+    ]
+
+def reference(con):
+    """Trending rows computed in Python from the raw snapshots."""
+    series = {}
+    for app_id, ts, avg in con.execute("SELECT app_id, ts, avg_players FROM snapshots ORDER BY app_id, ts"):
+        if avg is not None:
+            series.setdefault(app_id, ([], []))
+            series[app_id][0].append(ts)
+            series[app_id][1].append(avg)
+    newest = con.execute("SELECT MAX(ts) FROM latest_snapshot").fetchone()[0]
+    cutoff = (datetime.fromisoformat(newest) - timedelta(days=2)).isoformat(timespec="milliseconds")
+    out = []
+    for span, ago in (("24h", 1), ("30d", 30), ("7d", 7)):
+        for app_id, ts, cur in con.execute("SELECT app_id, ts, avg_players FROM latest_snapshot ORDER BY app_id"):
+            if cur is None or app_id not in series or ts < cutoff:
+                continue
+            t = datetime.fromisoformat(ts)
+            hi = (t - timedelta(days=ago) + timedelta(minutes=10)).isoformat(timespec="milliseconds")
+            lo = (t - timedelta(days=2 * ago)).isoformat(timespec="milliseconds")
+            times, avgs = series[app_id]
+            i = bisect.bisect_right(times, hi) - 1
+            if i < 0 or times[i] < lo:
+                continue
+            prev = avgs[i]
+            pct = round((cur - prev) * 100.0 / prev, 2) if prev > 0 else None
+            out.append((span, app_id, ts, cur, prev, cur - prev, pct))
+    return sorted(out, key=lambda r: (r[0], r[1]))
+
+def ingest(db, crawls, merge_sqls):
+    con = connect(db)
+    saved, load_snapshot.MERGE_SQLS = load_snapshot.MERGE_SQLS, merge_sqls
+    try:
+        t0 = time.perf_counter()
+        for records in crawls:
+            load_snapshot.load(con, iter(records))
+        return (time.perf_counter() - t0) / len(crawls) * 1000
+    finally:
+        load_snapshot.MERGE_SQLS = saved
+        con.close()
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--apps", type=int, default=2000)
+    p.add_argument("--days", type=int, default=35, help="Days of hourly history")
+    p.add_argument("--crawls", type=int, default=12, help="Extra crawls loaded through load_snapshot")
+    p.add_argument("--repeat", type=int, default=200)
+    args = p.parse_args()
+
+    tmp = Path(tempfile.gettempdir())
+    db = tmp / "gamesearch_bench_trending.db"
+    make_db(db, apps=args.apps, snapshots=args.apps * args.days * 24)
+
+    # Next crawls, loaded without the trending merges (copy) and with them;
+    # the last one skips 10% of the apps, which must keep their earlier scores
+    rng = random.Random(5)
+    start = datetime(2024, 1, 1) + timedelta(days=args.days)
+    crawls = [crawl(args.apps, (start + timedelta(hours=h, seconds=rng.random())).isoformat(), rng)
+              for h in range(args.crawls)]
+    crawls[-1] = [r for r in crawls[-1] if r["app_id"] % 10]
+    base = [sql for sql in load_snapshot.MERGE_SQLS if sql not in trending.TRENDING_MERGE_SQLS]
+    plain_db = tmp / "gamesearch_bench_trending_plain.db"
+    plain_db.write_bytes(db.read_bytes())
+    ms_plain = ingest(plain_db, crawls, base)
+    ms_trending = ingest(db, crawls, load_snapshot.MERGE_SQLS)
+    plain_db.unlink()
+
+    con = connect(db)
+    incremental = con.execute(SCORES).fetchall()
+    con.execute("BEGIN")
+    trending.refresh(con)
+    con.execute("COMMIT")
+    assert con.execute(SCORES).fetchall() == incremental, "incremental scores differ from a full refresh"
+    expected = reference(con)
+    assert len(incremental) == len(expected) and all(
+        a[:6] == b[:6] and (a[6] == b[6] or abs(a[6] - b[6]) < 0.015)   # ROUND(x, 2) vs round() on halves
+        for a, b in zip(incremental, expected)
+    ), "scores differ from the Python reference"
+    spans = dict(con.execute("SELECT span, COUNT(*) FROM trending GROUP BY span").fetchall())
+    on_the_fly = timed(lambda: con.execute(ON_THE_FLY_SQL).fetchall(), 5)
+    con.close()
+
+    print(f"{args.apps} apps x {args.days} days hourly; rows per window: {spans}")
+    print(f"ingest per crawl: {ms_plain:.1f} ms without trending, {ms_trending:.1f} ms with")
+    print("incremental scores == full refresh == Python reference")
+
+    paths = {
+        "/games?sort=current": "/games?sort=current&size=25",
+        "/games/trending 24h abs": "/games/trending?window=24h&sort=abs",
+        "/games/trending 7d pct": "/games/trending?window=7d&sort=pct",
+        "/games/trending 30d -abs p5": "/games/trending?window=30d&sort=-abs&page=5",
+    }
+    print(f"\n{'request':<30}{'p50 ms':>9}{'p99 ms':>9}")
+    print(f"{'7d from snapshots (SQL only)':<30}{on_the_fly['p50']:>9.2f}{on_the_fly['p99']:>9.2f}")
+    with serve(env={"GSE_DB": str(db)}) as base_url, httpx.Client(base_url=base_url) as client:
+        for name, path in paths.items():
+            r = client.get(path)
+            assert r.status_code == 200, (path, r.status_code, r.text)
+            t = timed(lambda: client.get(path), args.repeat)
+            print(f"{name:<30}{t['p50']:>9.2f}{t['p99']:>9.2f}")
+        items = client.get("/games/trending?window=24h&sort=abs&min_players=0&size=200").json()["items"]
+        assert [i["delta"] for i in items] == sorted((i["delta"] for i in items), reverse=True)
+
+if __name__ == "__main__":
+    main()
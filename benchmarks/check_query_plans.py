@@ -0,0 +1,202 @@
+# benchmarks/check_query_plans.py
+# EXPLAIN QUERY PLAN regression check for the API's queries: every /games
+# shape (sort x filter x page mode, counts, FTS), trending, one game, history,
+# exports and every /api/search shape, taken from the same compiled plans
+# and SQL constants the endpoints run. Exits 1 when a plan does a full table
+# scan or builds a temp B-tree (sort / GROUP BY / DISTINCT) that is not in
+# ALLOWED with its reason.
+# On the synthetic DB it also times the heavy shapes on schema 12 vs the
+# workload indexes of migration 0013.
+#
+#   python benchmarks/check_query_plans.py
+#   python benchmarks/check_query_plans.py --db path/to/steamcharts.db   # plans only
+import argparse, re, sqlite3, sys, tempfile
+from pathlib import Path
+
+from bench_query_engine import add_facets
+from bench_serialize import add_steam_items
+from synth import DB_DIR, ROOT, make_db, timed
+
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT))
+
+# label regex -> why that plan may sort or scan
+ALLOWED = {
+    r"^/games q=fts ": "FTS matches come in rank order; other orders sort the matches (bounded by the match count)",
+    r"^/games .*facet=filter": "under PROBE_MIN matches the facet set drives and is sorted; main.py probes above",
+    r"^/export/games": "every row, in app_id order",
+    r"^/export/snapshots day|^/export/snapshots week": "every rollup row, grouped by app",
+    r"^/games/\{app_id\}/history bucket=hour": "hour buckets group one app's raw rows (compaction horizon bounds them)",
+    r"^/api/search .*from\+to": "the date range drives (usually the narrower bound); its matches are sorted",
+    r"^/api/search .*q=like .*count|^/api/search .*q=id_or_like .*count": "infix LIKE reads every name; counts are cached per data generation",
+    r"^/api/search q=fts ": "FTS matches are sorted (bounded by the match count)",
+    r"^/api/search .*q=id_or_fts": "id OR FTS match: both sets are read, then sorted",
+}
+
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)\S+$")
+
+def violations(detail):
+    if FULL_SCAN.match(detail):
+        return "full scan"
+    if "USE TEMP B-TREE" in detail:
+        return "temp b-tree"
+    return None
+
+def workload():
+    """[(label, sql, params)] for every query shape the endpoints run."""
+    import main
+    import history
+    from api import app as legacy
+
+    out = []
+    games_filters = {
+        "none": ((), ()),
+        "like": ((("like", 1),), ("%ke%",)),
+        "facet=filter": ((("facet", 2),), ("genre", "RPG", "Racing")),
+        "facet=probe": ((("facet_probe", 2),), ("genre", "RPG", "Racing")),
+        "like+facet=probe": ((("like", 1), ("facet_probe", 1)), ("%ke%", "genre", "RPG")),
+    }
+    for sort in main.SORT_KEYS:
+        if sort == "relevance":
+            continue
+        for fname, (conds, params) in games_filters.items():
+            label = f"/games sort={sort} {fname}"
+            out.append((f"{label} offset", main.GAMES.plan(False, conds, sort).page_sql, params + (25, 2000)))
+            plan = main.GAMES.plan(False, conds, sort, "after")
+            out.append((f"{label} cursor", plan.page_sql, params + (50, 50, 1000, 25)))
+            if plan.tail_sql:
+                out.append((f"{label} cursor tail", plan.tail_sql, params + (25,)))
+            plan = main.GAMES.plan(False, conds, sort, "after_null")
+            out.append((f"{label} cursor null", plan.page_sql, params + (1000, 25)))
+            if sort == "current":
+                out.append((f"/games {fname} count", main.GAMES.plan(False, conds, sort).count_sql, params))
+    for sort in ("relevance", "current", "name"):
+        plan = main.GAMES.plan(True, (), sort)
+        out.append((f"/games q=fts sort={sort} offset", plan.page_sql, ("strike*", 25, 0)))
+    out.append(("/games fts probe", main.GAMES.plan(True, (), "relevance").exists_sql, ("strike*",)))
+
+    for sort in main.TRENDING_SORT_KEYS:
+        out.append((f"/games/trending sort={sort}", main.TRENDING_PAGE_SQL[sort], ("24h", 100, 25, 0)))
+    for pct, sql in main.TRENDING_COUNT_SQL.items():
+        out.append((f"/games/trending count pct={pct}", sql, ("24h", 100)))
+    out.append(("/games/{app_id}", main.GAME_ROW_SQL, (100,)))
+    for bucket, sql in history.BUCKET_SQL.items():
+        out.append((f"/games/{{app_id}}/history bucket={bucket}", sql, (100, "2024-01-01", "9999")))
+    out.append(("/export/games", main.GAME_EXPORT_SQL, ()))
+    for grain, sql in main.SNAPSHOT_EXPORT_SQL.items():
+        out.append((f"/export/snapshots {grain}", sql.format(app=""), ("2024-01-01", "9999")))
+        out.append((f"/export/snapshots {grain} app_id", sql.format(app=" AND app_id = ?"),
+                    ("2024-01-01", "9999", 100)))
+
+    api_filters = {
+        "none": ((), ()),
+        "q=like": ((("like", 1),), ("%tem 1%",)),
+        "q=id_or_like": ((("id_or_like", 2),), ("12", "%12%")),
+        "q=id_or_fts": ((("id_or_fts", 2),), ("12", "12*")),
+        "min_current": ((("min_current", 1),), (1000,)),
+        "from+to": ((("from", 1), ("to", 1)), ("2024-05-03", "2024-05-20")),
+    }
+    for order in legacy.ITEMS.sorts:
+        if order[0] == "fts_rank":
+            continue
+        for fname, (conds, params) in api_filters.items():
+            label = f"/api/search sort={' '.join(order)} {fname}"
+            out.append((f"{label} offset", legacy.ITEMS.plan(False, conds, order).page_sql, params + (25, 2000)))
+            plan = legacy.ITEMS.plan(False, conds, order, "after")
+            out.append((f"{label} cursor", plan.page_sql, params + ("x", "x", 1000, 25)))
+            if order == ("current", "DESC"):
+                out.append((f"/api/search {fname} count", plan.count_sql, params))
+    for order in (("fts_rank", "ASC"), ("current", "DESC")):
+        out.append((f"/api/search q=fts sort={' '.join(order)} offset",
+                    legacy.ITEMS.plan(True, (), order).page_sql, ("item*", 25, 0)))
+    return out
+
+def check(db):
+    con = sqlite3.connect(db)
+    failed, allowed, ok = [], 0, 0
+    for label, sql, params in workload():
+        plan = [row[3] for row in con.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        bad = [(v, d) for d in plan for v in [violations(d)] if v]
+        if not bad:
+            ok += 1
+            continue
+        reason = next((why for pat, why in ALLOWED.items() if re.search(pat, label)), None)
+        if reason:
+            allowed += 1
+            continue
+        failed.append((label, plan))
+    con.close()
+    print(f"{ok} plans use indexes only, {allowed} allowed sorts / scans, {len(failed)} regressions")
+    for label, plan in failed:
+        print(f"\n❌ {label}")
+        for detail in plan:
+            print(f"     {detail}")
+    return not failed
+
+def timings(db12, db13, repeat):
+    """Heavy shapes on both schemas; schema 12 has no apps_app_id, so its name sorts tie on app_id."""
+    import main
+    from query import Source
+    from api import app as legacy
+
+    g = main.GAMES
+    before = Source(g.from_sql, g.columns, g.id_col, g.sorts, g.conds, g.text_from)
+    shapes = [
+        ("/games sort=name page 1", "name", (), (25, 0)),
+        ("/games sort=-name page 81", "-name", (), (25, 2000)),
+        ("/games sort=current page 81", "current", (), (25, 2000)),
+        ("/games sort=-peak24 page 81", "-peak24", (), (25, 2000)),
+        ("/games q=ke sort=name", "name", (("like", 1),), ("%ke%", 25, 0)),
+    ]
+    api_shapes = [
+        ("/api/search sort=-current page 81", ("current", "DESC"), (), (25, 2000)),
+        ("/api/search sort=name", ("name", "ASC"), (), (25, 0)),
+        ("/api/search min_current=1000", ("current", "DESC"), (("min_current", 1),), (1000, 25, 0)),
+        ("/api/search from..to sort=+timestamp", ("timestamp", "ASC"),
+         (("from", 1), ("to", 1)), ("2024-05-03", "2024-05-05", 25, 0)),
+    ]
+    print(f"\n{'p50 ms':<44}{'schema 12':>10}{'0013':>8}")
+    c12, c13 = sqlite3.connect(db12), sqlite3.connect(db13)
+    for label, sort, conds, params in shapes:
+        old, new = before.plan(False, conds, sort).page_sql, g.plan(False, conds, sort).page_sql
+        assert c12.execute(old, params).fetchall() == c13.execute(new, params).fetchall(), label
+        t12 = timed(lambda: c12.execute(old, params).fetchall(), repeat)["p50"]
+        t13 = timed(lambda: c13.execute(new, params).fetchall(), repeat)["p50"]
+        print(f"{label:<44}{t12:>10.2f}{t13:>8.2f}")
+    for label, order, conds, params in api_shapes:
+        sql = legacy.ITEMS.plan(False, conds, order).page_sql
+        assert c12.execute(sql, params).fetchall() == c13.execute(sql, params).fetchall(), label
+        t12 = timed(lambda: c12.execute(sql, params).fetchall(), repeat)["p50"]
+        t13 = timed(lambda: c13.execute(sql, params).fetchall(), repeat)["p50"]
+        print(f"{label:<44}{t12:>10.2f}{t13:>8.2f}")
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--db", default=None, help="check this (migrated) DB instead of a synthetic one")
+    p.add_argument("--apps", type=int, default=50_000)
+    p.add_argument("--repeat", type=int, default=50)
+    args = p.parse_args()
+    if args.db:
+        sys.exit(0 if check(args.db) else 1)
+
+    import migrate
+    tmp = Path(tempfile.gettempdir())
+    db12, db13 = tmp / "gamesearch_plans_v12.db", tmp / "gamesearch_plans.db"
+    make_db(db12, apps=args.apps, snapshots=args.apps * 4, version=12)
+    add_steam_items(db12, rows=args.apps, indexes=False)
+    add_facets(db12)
+    with sqlite3.connect(db12) as con:                  # 0006 skipped: steam_items came later
+        sys.path.insert(0, str(DB_DIR / "migrations"))
+        __import__("0006_steam_items_fts").up(con)
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(db13) + suffix).unlink(missing_ok=True)
+    with sqlite3.connect(db12) as src, sqlite3.connect(db13, isolation_level=None) as con:
+        src.backup(con)                                  # WAL DB: not a file copy
+        migrate.apply(con, log=lambda msg: None)
+
+    ok = check(db13)
+    timings(db12, db13, args.repeat)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
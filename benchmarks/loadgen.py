@@ -0,0 +1,117 @@
+# benchmarks/loadgen.py
+# Tiny load generator (httpx, or raw asyncio streams with raw=True) + local
+# uvicorn launcher for the API benchmarks.
+import asyncio, os, socket, subprocess, sys, time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+from synth import ROOT, percentiles
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@contextmanager
+def serve(app="main:app", cwd=ROOT / "backend", env=None, workers=1):
+    """Run uvicorn on a free port; yields the base URL."""
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=str(cwd), env={**os.environ, **(env or {})},
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(200):
+            try:
+                if httpx.get(base + "/health", timeout=0.5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.05)
+        else:
+            raise RuntimeError("uvicorn did not come up")
+        yield base
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+async def _run(base, paths, concurrency, duration):
+    latencies, errors = [], 0
+    stop = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        async def worker(i):
+            nonlocal errors
+            n = i
+            while time.perf_counter() < stop:
+                t = time.perf_counter()
+                try:
+                    r = await client.get(paths[n % len(paths)])
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - t) * 1000)
+                n += concurrency
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    out = percentiles(latencies) if latencies else {"p50": 0, "p99": 0, "max": 0}
+    out.update(requests=len(latencies), rps=len(latencies) / elapsed, errors=errors)
+    return out
+
+async def _get_raw(reader, writer, host, path):
+    """One keep-alive HTTP/1.1 GET -> status (the body is read and dropped)."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        if line[:15].lower() == b"content-length:":
+            length = int(line[15:])
+    await reader.readexactly(length)
+    return int(head[9:12])
+
+async def _run_raw(base, paths, concurrency, duration):
+    # Same loop as _run over bare asyncio streams: httpx costs ~5 ms of client
+    # CPU per request, so on a small box it, not the server, sets the ceiling
+    host, port = base.split("//")[1].split(":")
+    latencies, errors = [], 0
+    stop = time.perf_counter() + duration
+
+    async def worker(i):
+        nonlocal errors
+        n, conn = i, None
+        while time.perf_counter() < stop:
+            t = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = await asyncio.open_connection(host, int(port))
+                status = await asyncio.wait_for(_get_raw(*conn, host, paths[n % len(paths)]), 30)
+                if status >= 400:
+                    errors += 1
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                errors += 1
+                conn = None
+            latencies.append((time.perf_counter() - t) * 1000)
+            n += concurrency
+        if conn is not None:
+            conn[1].close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    out = percentiles(latencies) if latencies else {"p50": 0, "p99": 0, "max": 0}
+    out.update(requests=len(latencies), rps=len(latencies) / elapsed, errors=errors)
+    return out
+
+def load(base, paths, concurrency=32, duration=10.0, raw=False):
+    return asyncio.run((_run_raw if raw else _run)(base, paths, concurrency, duration))
+
+def report(label, r):
+    print(f"{label:<28}{r['rps']:>10.0f}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['errors']:>8}")
+
+def header():
+    print(f"{'case':<28}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
@@ -0,0 +1,79 @@
+# benchmarks/synth.py
+# Synthetic SQLite databases (schema from steamcharts_scraper/db/migrate.py) for benchmarks.
+import random, sqlite3, sys, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT    = Path(__file__).resolve().parents[1]
+DB_DIR  = ROOT / "steamcharts_scraper" / "db"
+
+sys.path.insert(0, str(DB_DIR))
+import migrate
+
+WORDS = [
+    "counter", "strike", "dota", "path", "exile", "apex", "legends", "rust", "terraria",
+    "stardew", "valley", "elden", "ring", "baldur", "gate", "cyber", "punk", "civilization",
+    "football", "manager", "war", "thunder", "dead", "daylight", "sim", "racing", "space",
+    "engineers", "farming", "simulator", "total", "hunt", "showdown", "rocket", "league",
+]
+
+def game_name(rng):
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4))) + f" {rng.randint(1, 999)}"
+
+def make_db(path, apps=5000, snapshots=100_000, seed=7, batch=50_000, version=None):
+    """Create a fresh DB at `path` with `apps` apps and ~`snapshots` snapshot rows
+    (schema migrated to `version`, default latest)."""
+    path = Path(path)
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(path) + suffix).unlink(missing_ok=True)
+
+    rng = random.Random(seed)
+    per_app = max(1, snapshots // apps)
+    start = datetime(2024, 1, 1)
+    t0 = time.perf_counter()
+
+    with sqlite3.connect(path, isolation_level=None) as con:
+        migrate.apply(con, target=version, log=lambda msg: None)
+    with sqlite3.connect(path) as con:
+        con.execute("PRAGMA synchronous = OFF")
+        con.executemany(
+            "INSERT INTO apps (app_id, name) VALUES (?, ?)",
+            ((app_id, game_name(rng)) for app_id in range(10, 10 + apps)),
+        )
+
+        # One crawl = one ts per app; `per_app` crawls, hourly.
+        buf = []
+        for crawl in range(per_app):
+            ts = (start + timedelta(hours=crawl)).isoformat()
+            for rank, app_id in enumerate(range(10, 10 + apps), start=1):
+                avg = int(rng.paretovariate(1.2) * 50)
+                buf.append((ts, app_id, rank, avg, avg + rng.randint(0, avg // 2 + 1), None))
+                if len(buf) >= batch:
+                    con.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)", buf)
+                    buf.clear()
+        if buf:
+            con.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)", buf)
+
+        from rollups import rebuild as rebuild_rollups
+        from rebuild_latest import rebuild
+        from trending import refresh as refresh_trending
+        rebuild_rollups(con)
+        rebuild(con)
+        refresh_trending(con)
+        con.commit()
+
+    print(f"built {path.name}: {apps} apps, {apps * per_app} snapshots in {time.perf_counter() - t0:.1f}s")
+    return path
+
+def percentiles(samples_ms):
+    s = sorted(samples_ms)
+    pick = lambda p: s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+    return {"p50": pick(50), "p99": pick(99), "max": s[-1]}
+
+def timed(fn, repeat):
+    out = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t) * 1000)
+    return percentiles(out)
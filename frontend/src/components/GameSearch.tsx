@@ -12,12 +12,16 @@ type Game = {
 };
 
 type Paged = {
-  total: number;
+  total: number | null;
+  total_exact?: boolean;
   page: number;
   size: number;
   items: Game[];
+  next_cursor?: string | null;
 };
 
+type Suggestion = { app_id: number; name: string; current: number };
+
 const sortOptions = [
   { key: "current", label: "Current ↓" },
   { key: "-current", label: "Current ↑" },
@@ -37,6 +41,8 @@ export default function GameSearch() {
   const [page, setPage] = useState(1);
   const [size, setSize] = useState(25);
 
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+
   const [data, setData] = useState<Paged | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
@@ -46,6 +52,8 @@ export default function GameSearch() {
       page: String(page),
       size: String(size),
       sort,
+      // cheap total: cached/capped count; a capped count is shown as "N+"
+      include_total: "estimate",
     });
     if (q.trim()) params.set("q", q.trim());
     return `${API_BASE}/games?${params.toString()}`;
@@ -57,6 +65,26 @@ export default function GameSearch() {
     setHasSearched(true);
   };
 
+  // Typeahead: /games/suggest answers from an in-memory index, so a short debounce is enough
+  useEffect(() => {
+    const prefix = inputQ.trim();
+    if (!prefix) {
+      setSuggestions([]);
+      return;
+    }
+    const ctrl = new AbortController();
+    const t = setTimeout(() => {
+      fetch(`${API_BASE}/games/suggest?${new URLSearchParams({ q: prefix, limit: "8" })}`, { signal: ctrl.signal })
+        .then((r) => (r.ok ? r.json() : { items: [] }))
+        .then((json: { items: Suggestion[] }) => setSuggestions(json.items))
+        .catch(() => {});
+    }, 80);
+    return () => {
+      clearTimeout(t);
+      ctrl.abort();
+    };
+  }, [inputQ]);
+
   useEffect(() => {
     if (!hasSearched) return;
 
@@ -80,7 +108,11 @@ export default function GameSearch() {
     };
   }, [url, hasSearched]);
 
-  const totalPages = data ? Math.max(1, Math.ceil(data.total / size)) : 1;
+  const totalPages = data ? Math.max(1, Math.ceil((data.total ?? 0) / size)) : 1;
+  // An estimated total is a lower bound, so a full page may have more after it
+  const hasMore = data
+    ? page < totalPages || (data.total_exact === false && data.items.length === size)
+    : false;
 
   const canSearch = !loading && inputQ.trim() !== q.trim();
 
@@ -96,10 +128,16 @@ export default function GameSearch() {
           onKeyDown={(e) => {
             if (e.key === "Enter") runSearch();
           }}
+          list="game-suggestions"
           placeholder="Search games…"
           className="md:col-span-2 h-11 rounded-2xl border px-4 outline-none focus:ring-2"
           disabled={loading}
         />
+        <datalist id="game-suggestions">
+          {suggestions.map((g) => (
+            <option key={g.app_id} value={g.name} />
+          ))}
+        </datalist>
 
         <button
           onClick={runSearch}
@@ -216,7 +254,9 @@ export default function GameSearch() {
         <div className="text-sm text-gray-600">
           {data && (
             <>
-              Total <b>{data.total}</b> games • Page {data.page} / {totalPages}
+              Total <b>{data.total ?? "—"}{data.total_exact === false ? "+" : ""}</b> games • Page {data.page} /{" "}
+              {totalPages}
+              {data.total_exact === false ? "+" : ""}
             </>
           )}
         </div>
@@ -230,7 +270,7 @@ export default function GameSearch() {
           </button>
           <button
             className="px-3 py-2 rounded-xl border disabled:opacity-50"
-            disabled={page >= totalPages || loading}
+            disabled={!hasMore || loading}
             onClick={() => setPage((p) => p + 1)}
           >
             Next
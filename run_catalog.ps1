@@ -1,5 +1,5 @@
 <# run_catalog.ps1
-   Build app ID list from SQLite (apps/snapshots/union), scrape app details, then upsert into SQLite.
+   Build app ID list from SQLite (apps/snapshots/union), scrape app details straight into SQLite.
 #>
 
 $ErrorActionPreference = "Stop"
@@ -14,68 +14,97 @@ $VenvPython = Join-Path $RepoRoot ".venv\Scripts\python.exe"
 # --- CONFIG ---
 # Where to read ids from: apps | snapshots | union
 $IdSource  = "apps"
-# Only include apps with NULL/old last_refreshed. 0 = include all.
+# Only include apps not checked within this many days. 0 = include all.
 $StaleDays = 30
+# Most-played apps first (activity) or plain id order; cap per run, 0 = no cap.
+$Order     = "activity"
+$Limit     = 0
+# Parallel crawler processes splitting the id list (1 = single process)
+$Shards    = 1
 
 # --- PREP ---
 if (-not (Test-Path $DataDir)) { New-Item -ItemType Directory -Path $DataDir | Out-Null }
 if (-not (Test-Path $VenvPython)) { throw "Can't find venv python: $VenvPython" }
 if (-not (Test-Path (Join-Path $ScrapyDir "scrapy.cfg"))) { throw "scrapy.cfg missing under $ScrapyDir" }
 
-# 1) Export app_ids from DB
+# Schema migrations first (no-op when current); make_app_ids and the SQLite pipeline need the latest schema
+& $VenvPython (Join-Path $DbDir "migrate.py")
+
+# 1) Export app_ids from DB, unless an unfinished run is waiting to be resumed.
+#    The spider records finished ids per run (catalog_progress) keyed by the ids
+#    file's contents, so re-running with the same file skips completed work.
 $IdsFile = Join-Path $DataDir "app_ids_from_db.txt"
 $MakeIds = Join-Path $DbDir "make_app_ids.py"
+$RunFile = Join-Path $DataDir "catalog_run.txt"   # feed base name of the unfinished run
 
 if (-not (Test-Path $MakeIds)) { throw "Missing $MakeIds - add steamcharts_scraper\db\make_app_ids.py" }
 
-Write-Host "Exporting IDs from DB: source=$IdSource, staleDays=$StaleDays"
-$argsList = @("--source", $IdSource, "--out", $IdsFile)
-if ($StaleDays -gt 0) { $argsList += @("--stale-days", $StaleDays) }
+if ((Test-Path $RunFile) -and (Test-Path $IdsFile)) {
+  $catalogBase = (Get-Content $RunFile -TotalCount 1).Trim()
+  Write-Host "Resuming unfinished catalog run ($catalogBase) with the existing $IdsFile"
+}
+else {
+  Write-Host "Exporting IDs from DB: source=$IdSource, staleDays=$StaleDays, order=$Order, limit=$Limit"
+  $argsList = @("--source", $IdSource, "--out", $IdsFile, "--order", $Order)
+  if ($StaleDays -gt 0) { $argsList += @("--stale-days", $StaleDays) }
+  if ($Limit -gt 0) { $argsList += @("--limit", $Limit) }
 
-& $VenvPython $MakeIds @argsList
+  & $VenvPython $MakeIds @argsList
 
-# 2) Run catalog spider -> timestamped output
-$today   = Get-Date -Format "MMddyyyy"
-$catalog = Join-Path $DataDir ("catalog_{0}.json" -f $today)
-if (Test-Path $catalog) {
-  $n = 2
-  do {
-    $catalog = Join-Path $DataDir ("catalog_{0}_{1}.json" -f $today, $n)
-    $n++
-  } while (Test-Path $catalog)
+  # Timestamped output name (per shard: <base>_s<N>.jsonl)
+  $today       = Get-Date -Format "MMddyyyy"
+  $catalogBase = Join-Path $DataDir ("catalog_{0}" -f $today)
+  if (Test-Path "$catalogBase*.jsonl") {
+    $n = 2
+    do {
+      $catalogBase = Join-Path $DataDir ("catalog_{0}_{1}" -f $today, $n)
+      $n++
+    } while (Test-Path "$catalogBase*.jsonl")
+  }
+  Set-Content -Path $RunFile -Value $catalogBase
 }
 
+# 2) Run catalog spider(s). With $Shards > 1 the id list is split by app_id % $Shards
+#    over that many parallel processes.
+# Details are upserted into SQLite as they are scraped (pipelines.CatalogSQLitePipeline);
+# the feed files (appended to on resume) are kept as an archive / for replay with db\upsert_catalog.py.
 Push-Location $ScrapyDir
 try {
+  $procs = @()
+  $feeds = @()
+  for ($shard = 0; $shard -lt $Shards; $shard++) {
+    $catalog = if ($Shards -gt 1) { "{0}_s{1}.jsonl" -f $catalogBase, $shard } else { "$catalogBase.jsonl" }
+    $feeds += $catalog
+    $scrapyArgs = @(
+      "-m","scrapy","crawl","steam_app_catalog",
+      "-o","`"$catalog`"",
+      "-s","FEED_EXPORT_ENCODING=utf-8",
+      "-s","LOG_LEVEL=INFO",
+      "-s","AUTOTHROTTLE_ENABLED=True",
+      "-s","AUTOTHROTTLE_START_DELAY=0.5",
+      "-s","AUTOTHROTTLE_MAX_DELAY=3",
+      "-s","DOWNLOAD_DELAY=0.2",
+      "-a","`"app_ids_file=$IdsFile`"",
+      "-a","stale_days=$StaleDays",
+      "-a","shard=$shard",
+      "-a","shards=$Shards"
+    )
+    Write-Host "Scraping app details (shard $shard of $Shards) into SQLite and $catalog"
+    $p = Start-Process -FilePath $VenvPython -ArgumentList $scrapyArgs -NoNewWindow -PassThru
+    $null = $p.Handle   # keeps ExitCode readable after Wait-Process
+    $procs += $p
+  }
+  $procs | Wait-Process
+  $failed = @($procs | Where-Object { $_.ExitCode -ne 0 })
+
   Write-Host ""
-  Write-Host "Scraping app details into $catalog"
-  $scrapyArgs = @(
-    "-m","scrapy","crawl","steam_app_catalog",
-    "-O",$catalog,
-    "-s","FEED_EXPORT_ENCODING=utf-8",
-    "-s","LOG_LEVEL=INFO",
-    "-s","AUTOTHROTTLE_ENABLED=True",
-    "-s","AUTOTHROTTLE_START_DELAY=0.5",
-    "-s","AUTOTHROTTLE_MAX_DELAY=3",
-    "-s","DOWNLOAD_DELAY=0.2",
-    "-a","app_ids_file=$IdsFile",
-    "-a","stale_days=30"
-  )
-  & $VenvPython @scrapyArgs
-  Write-Host ""
-  Write-Host "Saved: $catalog"
+  $feeds | ForEach-Object { Write-Host "Saved: $_" }
+  if ($failed.Count -gt 0) {
+    throw "$($failed.Count) catalog shard(s) failed; re-run this script to resume."
+  }
+  Remove-Item $RunFile
+  Write-Host "Catalog upsert complete."
 }
 finally {
   Pop-Location
 }
-
-# 3) Upsert into SQLite
-$Upsert = Join-Path $DbDir "upsert_catalog.py"
-if (Test-Path $Upsert) {
-  Write-Host ""
-  Write-Host "Upserting into SQLite..."
-  & $VenvPython $Upsert $catalog
-  Write-Host "Catalog upsert complete."
-} else {
-  Write-Host "Missing $Upsert - skipping DB upsert."
-}
@@ -0,0 +1,166 @@
+# db/bulk.py
+# Shared bulk-ingest path for load_snapshot.py and upsert_catalog.py:
+# stream records -> executemany into a TEMP staging table in batches ->
+# one set-based INSERT ... ON CONFLICT merge, all in a single transaction.
+import gzip, json, sqlite3, time
+from itertools import islice
+from pathlib import Path
+
+BATCH_SIZE = 10_000
+READ_CHUNK = 1 << 20
+CACHE_SIZE = -65536   # KiB per schema (main, temp)
+
+def open_feed(path):
+    """Text handle for a feed file; `.gz` files are decompressed on the fly."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def feed_format(path):
+    """'jsonl' for .jsonl/.ndjson (optionally .gz), else 'json'."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    return "jsonl" if suffixes and suffixes[-1] in (".jsonl", ".ndjson", ".jl") else "json"
+
+def iter_records(path):
+    """Yield feed records one at a time, whatever the feed format.
+
+    Memory stays bounded by the largest single record (plus READ_CHUNK for
+    JSON arrays), not by the size of the feed.
+    """
+    with open_feed(path) as f:
+        if feed_format(path) == "jsonl":
+            yield from iter_jsonl_records(f)
+        else:
+            yield from iter_json_records(f)
+
+def iter_jsonl_records(f):
+    """Scrapy's `-O x.jsonl`: one JSON object per line."""
+    for lineno, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {lineno}: {e}") from None
+        if isinstance(obj, dict):
+            yield obj
+
+def iter_json_records(f):
+    """Yield objects from a JSON array (or a single object) without loading the file.
+
+    Scrapy's `-O x.json` writes `[` + one object per line + `]`; this decodes
+    object by object with JSONDecoder.raw_decode over a rolling buffer.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    while True:
+        # skip whitespace, separators and the array brackets
+        while pos < len(buf) and buf[pos] in " \t\r\n,[]":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            buf, pos = f.read(READ_CHUNK), 0
+            eof = not buf
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(READ_CHUNK)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        pos = end
+        if isinstance(obj, dict):
+            yield obj
+        elif isinstance(obj, list):
+            yield from (o for o in obj if isinstance(o, dict))
+
+def batched(iterable, n):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, n))
+        if not chunk:
+            return
+        yield chunk
+
+def connect(db_path, fast=False):
+    """Connection for a bulk load. fast=True trades crash safety for speed
+    (synchronous=OFF for this connection only; WAL keeps readers consistent)."""
+    con = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    con.execute("PRAGMA foreign_keys = ON")
+    # Staging goes to a temp *file* with a capped page cache so memory stays
+    # bounded however large the feed is (temp_store=MEMORY would hold it all).
+    con.execute("PRAGMA temp_store = FILE")
+    con.execute(f"PRAGMA main.cache_size = {CACHE_SIZE}")
+    con.execute(f"PRAGMA temp.cache_size = {CACHE_SIZE}")
+    if fast:
+        con.execute("PRAGMA synchronous = OFF")
+    return con
+
+def bump_generation(con):
+    # Invalidate API caches (cached totals etc.)
+    con.execute("""
+        INSERT INTO meta (key, value) VALUES ('data_generation', 1)
+        ON CONFLICT(key) DO UPDATE SET value = value + 1
+    """)
+
+def stage_and_merge(con, records, stage_table, stage_ddl, to_row, merge_sqls,
+                    batch_size=BATCH_SIZE, stage_indexes=()):
+    """Load `records` through a TEMP staging table and merge it set-based.
+
+    to_row(record) returns a tuple matching stage_ddl's columns, or None to skip.
+    merge_sqls run in order after staging, inside the same transaction.
+    Returns a stats dict (read, staged, skipped, seconds, rows_per_sec).
+    """
+    t0 = time.perf_counter()
+    read = staged = skipped = 0
+
+    con.execute(f"DROP TABLE IF EXISTS temp.{stage_table}")
+    con.execute(f"CREATE TEMP TABLE {stage_table} ({stage_ddl})")
+    ncols = con.execute(f"SELECT COUNT(*) FROM pragma_table_info('{stage_table}')").fetchone()[0]
+    insert_sql = f"INSERT INTO temp.{stage_table} VALUES ({', '.join('?' * ncols)})"
+
+    con.execute("BEGIN")
+    try:
+        for chunk in batched(records, batch_size):
+            rows = []
+            for r in chunk:
+                row = to_row(r)
+                if row is None:
+                    skipped += 1
+                else:
+                    rows.append(row)
+            read += len(chunk)
+            con.executemany(insert_sql, rows)
+            staged += len(rows)
+
+        for ddl in stage_indexes:
+            con.execute(ddl)
+        for sql in merge_sqls:
+            con.execute(sql)
+        bump_generation(con)
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.execute(f"DROP TABLE IF EXISTS temp.{stage_table}")
+
+    seconds = time.perf_counter() - t0
+    return {
+        "read": read,
+        "staged": staged,
+        "skipped": skipped,
+        "seconds": seconds,
+        "rows_per_sec": read / seconds if seconds > 0 else 0.0,
+    }
+
+def default_db_path():
+    return Path(__file__).resolve().parent / "steamcharts.db"
@@ -0,0 +1,96 @@
+# db/catalog_state.py
+# Change detection for the catalog refresh (table catalog_state, migration 0007)
+# and run progress for resumable crawls (table catalog_progress, migration 0008).
+# Used by the steam_app_catalog spider (validators, content hashes, "checked" and
+# "done" marks) and by upsert_catalog.py (records the hash of every upserted app).
+import hashlib, json, sqlite3
+from pathlib import Path
+from collections import namedtuple
+
+# Item fields that end up in the apps table; a change in anything else
+# (price, last_refreshed, ...) does not warrant an upsert.
+HASH_FIELDS = (
+    "name", "short_description", "release_date", "developers",
+    "publishers", "genres", "categories", "store_app_url",
+)
+
+AppState = namedtuple("AppState", "content_hash etag last_modified checked_at")
+
+def content_hash(record):
+    payload = json.dumps({k: record.get(k) for k in HASH_FIELDS}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def load_states(con):
+    """{app_id: AppState} for every app the catalog spider has seen."""
+    try:
+        rows = con.execute(
+            "SELECT app_id, content_hash, etag, last_modified, checked_at FROM catalog_state"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}   # DB not migrated to 0007 yet: everything counts as unseen
+    return {r[0]: AppState(*r[1:]) for r in rows}
+
+def run_id_for(path):
+    """Default run id for an ids file: "<stem>-<sha1 of contents>", stable across restarts."""
+    path = Path(path)
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return f"{path.stem}-{h.hexdigest()[:12]}"
+
+def load_done(con, run_id):
+    """Set of app_ids already finished in run_id."""
+    try:
+        rows = con.execute("SELECT app_id FROM catalog_progress WHERE run_id = ?", (run_id,))
+        return {r[0] for r in rows}
+    except sqlite3.OperationalError:
+        return set()   # DB not migrated to 0008 yet: nothing to resume
+
+CHECKED_SQL = """
+    UPDATE catalog_state SET
+      checked_at = ?,
+      etag = COALESCE(?, etag),
+      last_modified = COALESCE(?, last_modified)
+    WHERE app_id = ?
+"""
+
+DONE_SQL = "INSERT OR IGNORE INTO catalog_progress (run_id, app_id, done_at) VALUES (?, ?, ?)"
+
+class CheckLog:
+    """Buffers "fetched, nothing changed" marks (and, with a run_id, "done"
+    marks for catalog_progress) and writes them in batches."""
+
+    def __init__(self, con, flush_every=500, run_id=None):
+        # con: autocommit connection (bulk.connect)
+        self.con = con
+        self.flush_every = flush_every
+        self.run_id = run_id
+        self.rows = []
+        self.done_rows = []
+        self.written = 0
+
+    def add(self, app_id, checked_at, etag=None, last_modified=None):
+        self.rows.append((checked_at, etag, last_modified, int(app_id)))
+        self.done(app_id, checked_at)
+
+    def done(self, app_id, done_at):
+        if self.run_id is not None:
+            self.done_rows.append((self.run_id, int(app_id), done_at))
+        if len(self.rows) + len(self.done_rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.rows and not self.done_rows:
+            return
+        self.con.execute("BEGIN")
+        try:
+            self.con.executemany(CHECKED_SQL, self.rows)
+            self.con.executemany(DONE_SQL, self.done_rows)
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+        self.written += len(self.rows)
+        self.rows = []
+        self.done_rows = []
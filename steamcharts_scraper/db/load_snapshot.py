@@ -1,74 +1,112 @@
 # db/load_snapshot.py
-import json, sqlite3, sys
+import argparse, sys
 from pathlib import Path
 
+from bulk import BATCH_SIZE, connect, default_db_path, iter_records, stage_and_merge
+from rollups import ROLLUP_MERGE_SQLS
+from trending import TRENDING_MERGE_SQLS
+
+STAGE_DDL = """
+    ts TEXT, app_id INTEGER, rank INTEGER, avg_players INTEGER,
+    peak_players INTEGER, detail_url TEXT, name TEXT
+"""
+
+MERGE_SQLS = [
+    # Seed/refresh minimal app name from snapshot (non-destructive)
+    """
+    INSERT INTO apps (app_id, name)
+    SELECT app_id, name FROM temp.stage_snapshots WHERE true
+    ON CONFLICT(app_id) DO UPDATE SET
+      name = COALESCE(excluded.name, apps.name)
+    """,
+    # Insert/replace snapshot rows
+    """
+    INSERT OR REPLACE INTO snapshots
+      (ts, app_id, rank, avg_players, peak_players, detail_url)
+    SELECT ts, app_id, rank, avg_players, peak_players, detail_url
+    FROM temp.stage_snapshots
+    """,
+    # Keep latest_snapshot current (only move forward in time).
+    # Backfilling older files? Run rebuild_latest.py afterwards.
+    """
+    INSERT INTO latest_snapshot
+      (app_id, ts, rank, avg_players, peak_players, all_time_peak)
+    SELECT s.app_id, s.ts, s.rank, s.avg_players, s.peak_players, m.max_peak
+    FROM (
+      SELECT app_id, MAX(ts) AS ts, MAX(peak_players) AS max_peak
+      FROM temp.stage_snapshots
+      GROUP BY app_id
+    ) AS m
+    JOIN temp.stage_snapshots s ON s.app_id = m.app_id AND s.ts = m.ts
+    WHERE true
+    ON CONFLICT(app_id) DO UPDATE SET
+      ts = excluded.ts,
+      rank = excluded.rank,
+      avg_players = excluded.avg_players,
+      peak_players = excluded.peak_players,
+      all_time_peak = MAX(COALESCE(latest_snapshot.all_time_peak, 0),
+                          COALESCE(excluded.all_time_peak, 0))
+    WHERE excluded.ts >= latest_snapshot.ts
+    """,
+    # Daily / weekly rollups for every (app, day) and (app, week) touched
+    *ROLLUP_MERGE_SQLS,
+    # Momentum scores of every app in the batch (after latest_snapshot)
+    *TRENDING_MERGE_SQLS,
+]
+
+STAGE_INDEXES = [
+    "CREATE INDEX temp.idx_stage_snapshots_app_ts ON stage_snapshots(app_id, ts)",
+]
+
+def to_row(r):
+    app_id = r.get("app_id")
+    if not app_id:
+        return None
+    return (
+        r.get("timestamp"),
+        int(app_id),
+        r.get("rank"),
+        r.get("avg_players"),
+        r.get("peak_players"),
+        r.get("detail_url"),
+        r.get("name"),
+    )
+
+def load(con, records, batch_size=BATCH_SIZE):
+    return stage_and_merge(
+        con, records, "stage_snapshots", STAGE_DDL, to_row, MERGE_SQLS,
+        batch_size=batch_size, stage_indexes=STAGE_INDEXES,
+    )
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python load_snapshot.py <path-to-snapshot.json>")
-        sys.exit(1)
+    p = argparse.ArgumentParser(description="Load a steamcharts_top_all snapshot feed into SQLite.")
+    p.add_argument("path", help="Snapshot feed (.jsonl or .json, optionally .gz)")
+    p.add_argument("--db", default=str(default_db_path()))
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    p.add_argument("--fast", action="store_true",
+                   help="PRAGMA synchronous=OFF during the load (faster, not crash-safe)")
+    args = p.parse_args()
 
-    snap_path = Path(sys.argv[1]).resolve()
+    snap_path = Path(args.path).resolve()
     if not snap_path.exists():
         print(f"❌ File not found: {snap_path}")
         sys.exit(1)
 
-    db_path = Path(__file__).resolve().parent / "steamcharts.db"
+    db_path = Path(args.db).resolve()
+    con = connect(db_path, fast=args.fast)
     try:
-        rows = json.loads(snap_path.read_text(encoding="utf-8"))
+        stats = load(con, iter_records(snap_path), args.batch_size)
     except Exception as e:
-        print(f"❌ Failed to read/parse JSON: {e}")
+        print(f"❌ Failed to load snapshot: {e}")
         sys.exit(1)
-
-    # Support either a list of objects or a single object
-    if isinstance(rows, dict):
-        rows = [rows]
-
-    total = len(rows)
-    inserted_snapshots = 0
-    seeded_apps = 0
-    skipped_no_appid = 0
-
-    with sqlite3.connect(db_path) as con:
-        cur = con.cursor()
-        cur.execute("PRAGMA foreign_keys = ON")
-
-        for r in rows:
-            app_id = r.get("app_id")
-            if not app_id:
-                skipped_no_appid += 1
-                continue
-
-            # Seed/refresh minimal app name from snapshot (non-destructive)
-            cur.execute("""
-                INSERT INTO apps (app_id, name)
-                VALUES (?, ?)
-                ON CONFLICT(app_id) DO UPDATE SET
-                  name = COALESCE(excluded.name, apps.name)
-            """, (int(app_id), r.get("name")))
-            seeded_apps += 1
-
-            # Insert/replace snapshot row
-            cur.execute("""
-                INSERT OR REPLACE INTO snapshots
-                  (ts, app_id, rank, avg_players, peak_players, detail_url)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                r.get("timestamp"),
-                int(app_id),
-                r.get("rank"),
-                r.get("avg_players"),
-                r.get("peak_players"),
-                r.get("detail_url"),
-            ))
-            inserted_snapshots += 1
-
-        con.commit()
+    finally:
+        con.close()
 
     print(f"✅ Loaded snapshot into {db_path}")
-    print(f"   Read records:          {total}")
-    print(f"   Inserted snapshots:    {inserted_snapshots}")
-    print(f"   Seeded/updated apps:   {seeded_apps}")
-    print(f"   Skipped (no app_id):   {skipped_no_appid}")
+    print(f"   Read records:          {stats['read']}")
+    print(f"   Inserted snapshots:    {stats['staged']}")
+    print(f"   Skipped (no app_id):   {stats['skipped']}")
+    print(f"   Elapsed:               {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
 
 if __name__ == "__main__":
     main()
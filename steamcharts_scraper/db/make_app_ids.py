@@ -14,7 +14,12 @@ def main():
     p.add_argument("--source", choices=["apps", "snapshots", "union"], default="apps",
                    help="Where to read ids from: apps table, snapshots table, or union of both.")
     p.add_argument("--stale-days", type=int, default=0,
-                   help="If >0, include only apps with NULL last_refreshed or older than N days (apps table).")
+                   help="If >0, include only apps never checked or last checked more than N days ago.")
+    p.add_argument("--order", choices=["activity", "id"], default="activity",
+                   help="activity: most players in the last --activity-days first, then least recently checked.")
+    p.add_argument("--activity-days", type=int, default=7)
+    p.add_argument("--limit", type=int, default=0,
+                   help="If >0, export only the first N ids (in --order).")
     p.add_argument("--out", default=str(DATA_DIR / "app_ids_from_db.txt"),
                    help="Output file (one app_id per line).")
     args = p.parse_args()
@@ -33,20 +38,46 @@ def main():
                 SELECT DISTINCT app_id FROM snapshots
             """
 
-        params = ()
+        # Last check: catalog_state (migration 0007), else apps.last_refreshed
+        params = {
+            "since": (datetime.utcnow() - timedelta(days=args.activity_days)).isoformat(),
+            "limit": args.limit if args.limit > 0 else -1,
+        }
+        where = ""
         if args.stale_days and args.source != "snapshots":
-            cutoff = (datetime.utcnow() - timedelta(days=args.stale_days)).isoformat()
-            base_sql = f"""
-                SELECT t.app_id
-                FROM ({base_sql}) AS t
-                LEFT JOIN apps a ON a.app_id = t.app_id
-                WHERE a.last_refreshed IS NULL OR a.last_refreshed < ?
+            params["cutoff"] = (datetime.utcnow() - timedelta(days=args.stale_days)).isoformat()
+            where = """
+                WHERE COALESCE(c.checked_at, a.last_refreshed) IS NULL
+                   OR COALESCE(c.checked_at, a.last_refreshed) < :cutoff
             """
-            params = (cutoff,)
 
-        rows = cur.execute(base_sql, params).fetchall()
+        if args.order == "activity":
+            # Busiest apps first (recent snapshots only, via idx_snapshots_ts), then least recently checked
+            order = """
+                ORDER BY COALESCE(act.players, 0) DESC,
+                         COALESCE(c.checked_at, a.last_refreshed) ASC,
+                         t.app_id
+            """
+        else:
+            order = "ORDER BY t.app_id"
+
+        rows = cur.execute(f"""
+            WITH act AS (
+              SELECT app_id, MAX(avg_players) AS players
+              FROM snapshots WHERE ts >= :since
+              GROUP BY app_id
+            )
+            SELECT t.app_id
+            FROM ({base_sql}) AS t
+            LEFT JOIN apps a ON a.app_id = t.app_id
+            LEFT JOIN catalog_state c ON c.app_id = t.app_id
+            LEFT JOIN act ON act.app_id = t.app_id
+            {where}
+            {order}
+            LIMIT :limit
+        """, params).fetchall()
 
-    ids = sorted({int(r[0]) for r in rows if r and r[0] is not None})
+    ids = [int(r[0]) for r in rows if r and r[0] is not None]
     out_path = Path(args.out)
     out_path.write_text("\n".join(map(str, ids)), encoding="utf-8")
 
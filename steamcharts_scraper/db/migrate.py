@@ -0,0 +1,94 @@
+# db/migrate.py
+# Versioned schema migrations. Run once per deploy / before ingest:
+#   python migrate.py [path-to-db] [--status]
+#
+# Version 1 is schema.sql; later steps are migrations/NNNN_name.sql|.py
+# (a .py step defines up(con)). The applied version is PRAGMA user_version.
+# Each step runs in its own transaction; PRAGMA lines in a .sql step run first.
+import importlib.util, sqlite3, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+DB_PATH = ROOT / "steamcharts.db"
+SCHEMA_PATH = ROOT / "schema.sql"
+MIGRATIONS_DIR = ROOT / "migrations"
+
+def migrations():
+    """[(version, name, path)] in order, starting with schema.sql as version 1."""
+    steps = [(1, "schema", SCHEMA_PATH)]
+    for path in sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9][0-9]_*")):
+        if path.suffix not in (".sql", ".py"):
+            continue
+        version = int(path.name[:4])
+        steps.append((version, path.stem[5:], path))
+    versions = [v for v, _, _ in steps]
+    if versions != list(range(1, len(steps) + 1)):
+        raise RuntimeError(f"Migration versions must be contiguous from 1: {versions}")
+    return steps
+
+LATEST_VERSION = len(migrations())
+
+def current_version(con):
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+def _apply_sql(con, path):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    pragmas = [l for l in lines if l.strip().upper().startswith("PRAGMA ")]
+    body = "\n".join(l for l in lines if l not in pragmas)
+    for p in pragmas:
+        con.execute(p)
+    return body
+
+def apply(con, target=None, log=print):
+    """Apply pending migrations up to target (default: latest). Returns applied versions."""
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    for version, name, path in migrations():
+        if version <= current_version(con) or version > target:
+            continue
+        log(f"   → {version:04d} {name}")
+        if path.suffix == ".sql":
+            body = _apply_sql(con, path)
+            con.executescript(f"BEGIN;\n{body}\nPRAGMA user_version = {version};\nCOMMIT;")
+        else:
+            spec = importlib.util.spec_from_file_location(f"migration_{version:04d}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            try:
+                con.execute("BEGIN")
+                module.up(con)
+                con.execute(f"PRAGMA user_version = {version}")
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        applied.append(version)
+    return applied
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    db_path = Path(args[0]).resolve() if args else DB_PATH
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # isolation_level=None: transactions are managed explicitly per step
+    con = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    try:
+        version = current_version(con)
+        if "--status" in sys.argv:
+            print(f"{db_path}: schema version {version} (latest {LATEST_VERSION})")
+            return
+        print(f"Migrating {db_path} from version {version} to {LATEST_VERSION}")
+        applied = apply(con)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        con.close()
+
+    if applied:
+        print(f"✅ Applied {len(applied)} migration(s); schema version {LATEST_VERSION}.")
+    else:
+        print("✅ Schema already up to date.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+-- 0002: materialized latest snapshot per app
+-- Latest snapshot per app, maintained by load_snapshot.py.
+-- Rebuild from history with: python rebuild_latest.py
+CREATE TABLE IF NOT EXISTS latest_snapshot (
+  app_id         INTEGER PRIMARY KEY,
+  ts             TEXT NOT NULL,
+  rank           INTEGER,
+  avg_players    INTEGER,
+  peak_players   INTEGER,
+  all_time_peak  INTEGER,          -- max peak_players seen across all snapshots
+  FOREIGN KEY (app_id) REFERENCES apps(app_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_latest_avg_players   ON latest_snapshot(avg_players);
+CREATE INDEX IF NOT EXISTS idx_latest_peak_players  ON latest_snapshot(peak_players);
+CREATE INDEX IF NOT EXISTS idx_latest_all_time_peak ON latest_snapshot(all_time_peak);
+
+-- Seed from existing history (no-op on a fresh DB)
+INSERT OR IGNORE INTO latest_snapshot
+  (app_id, ts, rank, avg_players, peak_players, all_time_peak)
+SELECT s.app_id, s.ts, s.rank, s.avg_players, s.peak_players, m.max_peak
+FROM (
+  SELECT app_id, MAX(ts) AS ts, MAX(peak_players) AS max_peak
+  FROM snapshots
+  GROUP BY app_id
+) AS m
+JOIN snapshots s ON s.ts = m.ts AND s.app_id = m.app_id;
@@ -0,0 +1,36 @@
+-- 0003: FTS5 search index over apps
+-- Full-text/prefix index over apps (external content; triggers keep it in sync).
+-- Rebuild with: INSERT INTO apps_fts(apps_fts) VALUES('rebuild');
+CREATE VIRTUAL TABLE IF NOT EXISTS apps_fts USING fts5(
+  name, short_description, developers, genres,
+  content = 'apps',
+  content_rowid = 'app_id',
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS apps_fts_ai AFTER INSERT ON apps BEGIN
+  INSERT INTO apps_fts (rowid, name, short_description, developers, genres)
+  VALUES (new.app_id, new.name, new.short_description, new.developers, new.genres);
+END;
+
+CREATE TRIGGER IF NOT EXISTS apps_fts_ad AFTER DELETE ON apps BEGIN
+  INSERT INTO apps_fts (apps_fts, rowid, name, short_description, developers, genres)
+  VALUES ('delete', old.app_id, old.name, old.short_description, old.developers, old.genres);
+END;
+
+-- Only re-index when an indexed column actually changed (snapshot loads touch name on every row)
+CREATE TRIGGER IF NOT EXISTS apps_fts_au AFTER UPDATE OF name, short_description, developers, genres ON apps
+WHEN old.name IS NOT new.name
+  OR old.short_description IS NOT new.short_description
+  OR old.developers IS NOT new.developers
+  OR old.genres IS NOT new.genres
+BEGIN
+  INSERT INTO apps_fts (apps_fts, rowid, name, short_description, developers, genres)
+  VALUES ('delete', old.app_id, old.name, old.short_description, old.developers, old.genres);
+  INSERT INTO apps_fts (rowid, name, short_description, developers, genres)
+  VALUES (new.app_id, new.name, new.short_description, new.developers, new.genres);
+END;
+
+-- Index rows that predate the table
+INSERT INTO apps_fts(apps_fts) VALUES('rebuild');
@@ -0,0 +1,8 @@
+-- 0004: key/value metadata
+-- Small key/value table. data_generation is bumped by every loader write so
+-- the API can invalidate cached totals/responses.
+CREATE TABLE IF NOT EXISTS meta (
+  key    TEXT PRIMARY KEY,
+  value  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('data_generation', 0);
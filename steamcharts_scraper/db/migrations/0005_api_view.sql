@@ -0,0 +1,13 @@
+-- 0005: objects the API reads (was created by backend/main.py at startup)
+CREATE INDEX IF NOT EXISTS idx_apps_name ON apps(name);
+
+DROP VIEW IF EXISTS steamcharts_top;
+CREATE VIEW steamcharts_top AS
+SELECT
+  a.app_id         AS app_id,
+  a.name           AS name,
+  l.avg_players    AS current_players,
+  l.peak_players   AS peak_24h,
+  l.all_time_peak  AS all_time_peak
+FROM latest_snapshot l
+JOIN apps a ON a.app_id = l.app_id;
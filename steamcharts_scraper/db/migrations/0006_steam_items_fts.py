@@ -0,0 +1,33 @@
+# 0006: FTS5 index for the legacy api/app.py table (only if steam_items exists)
+
+def up(con):
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'steam_items'").fetchone():
+        return
+    con.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS steam_items_fts USING fts5(
+          name,
+          content = 'steam_items',
+          content_rowid = 'rowid',
+          tokenize = 'unicode61 remove_diacritics 2',
+          prefix = '2 3'
+        )
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS steam_items_fts_ai AFTER INSERT ON steam_items BEGIN
+          INSERT INTO steam_items_fts (rowid, name) VALUES (new.rowid, new.name);
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS steam_items_fts_ad AFTER DELETE ON steam_items BEGIN
+          INSERT INTO steam_items_fts (steam_items_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS steam_items_fts_au AFTER UPDATE OF name ON steam_items
+        WHEN old.name IS NOT new.name
+        BEGIN
+          INSERT INTO steam_items_fts (steam_items_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+          INSERT INTO steam_items_fts (rowid, name) VALUES (new.rowid, new.name);
+        END
+    """)
+    con.execute("INSERT INTO steam_items_fts(steam_items_fts) VALUES('rebuild')")
@@ -0,0 +1,19 @@
+-- 0007: change detection for the steam_app_catalog refresh
+-- One row per app the catalog spider has looked at. content_hash covers the
+-- fields upserted into apps; etag / last_modified are the appdetails HTTP
+-- validators, sent back as If-None-Match / If-Modified-Since next time.
+CREATE TABLE IF NOT EXISTS catalog_state (
+  app_id         INTEGER PRIMARY KEY,
+  content_hash   TEXT,
+  etag           TEXT,
+  last_modified  TEXT,
+  checked_at     TEXT,    -- ISO8601 UTC of the last request (changed or not)
+  changed_at     TEXT,    -- ISO8601 UTC of the last upsert into apps
+  FOREIGN KEY (app_id) REFERENCES apps(app_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_catalog_state_checked_at ON catalog_state(checked_at);
+
+-- Apps refreshed before this migration count as checked at last_refreshed
+INSERT OR IGNORE INTO catalog_state (app_id, checked_at, changed_at)
+SELECT app_id, last_refreshed, last_refreshed FROM apps WHERE last_refreshed IS NOT NULL;
@@ -0,0 +1,12 @@
+-- 0008: resumable steam_app_catalog runs
+-- One row per app id finished within a run (upserted, unchanged, 304, or no
+-- data on the store). run_id names one app-id list, by default the ids file's
+-- stem plus a hash of its contents, so restarting with the same list skips
+-- everything recorded here. Rows for items are written in the same
+-- transaction as the apps upsert (upsert_catalog.MERGE_SQLS).
+CREATE TABLE IF NOT EXISTS catalog_progress (
+  run_id   TEXT NOT NULL,
+  app_id   INTEGER NOT NULL,
+  done_at  TEXT NOT NULL,    -- ISO8601 UTC
+  PRIMARY KEY (run_id, app_id)
+) WITHOUT ROWID;
@@ -0,0 +1,5 @@
+-- 0009: per-app history lookups (GET /games/{app_id}/history)
+-- (app_id, ts) range scans, covering the aggregated columns so history
+-- queries never touch the table. Supersedes the single-column app_id index.
+CREATE INDEX IF NOT EXISTS idx_snapshots_app_ts ON snapshots(app_id, ts, avg_players, peak_players);
+DROP INDEX IF EXISTS idx_snapshots_app_id;
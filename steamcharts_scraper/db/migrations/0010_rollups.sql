@@ -0,0 +1,42 @@
+-- 0010: daily / weekly player rollups per app
+-- Maintained by every snapshot load (rollups.ROLLUP_MERGE_SQLS, run from
+-- load_snapshot.py and the scraper's SQLite pipeline). rollups.py compact
+-- folds raw snapshots older than a retention window into these tables and
+-- deletes them; meta.snapshots_compacted_before (unix time of the first kept
+-- day) marks that horizon. Averages are sum_avg / n_avg so buckets merge exactly.
+CREATE TABLE IF NOT EXISTS snapshots_daily (
+  app_id    INTEGER NOT NULL,
+  day       TEXT NOT NULL,       -- YYYY-MM-DD (UTC)
+  min_avg   INTEGER,             -- min / max of avg_players
+  max_avg   INTEGER,
+  sum_avg   INTEGER,             -- sum / count of non-NULL avg_players
+  n_avg     INTEGER NOT NULL,
+  peak      INTEGER,             -- max peak_players
+  samples   INTEGER NOT NULL,    -- snapshot rows folded in
+  PRIMARY KEY (app_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS snapshots_weekly (
+  app_id    INTEGER NOT NULL,
+  week      TEXT NOT NULL,       -- YYYY-MM-DD of the Monday
+  min_avg   INTEGER,
+  max_avg   INTEGER,
+  sum_avg   INTEGER,
+  n_avg     INTEGER NOT NULL,
+  peak      INTEGER,
+  samples   INTEGER NOT NULL,
+  PRIMARY KEY (app_id, week)
+) WITHOUT ROWID;
+
+-- Seed from existing history (no-op on a fresh DB)
+INSERT OR REPLACE INTO snapshots_daily (app_id, day, min_avg, max_avg, sum_avg, n_avg, peak, samples)
+SELECT app_id, substr(ts, 1, 10), MIN(avg_players), MAX(avg_players),
+       SUM(avg_players), COUNT(avg_players), MAX(peak_players), COUNT(*)
+FROM snapshots
+GROUP BY app_id, substr(ts, 1, 10);
+
+INSERT OR REPLACE INTO snapshots_weekly (app_id, week, min_avg, max_avg, sum_avg, n_avg, peak, samples)
+SELECT app_id, date(day, 'weekday 0', '-6 days'), MIN(min_avg), MAX(max_avg),
+       SUM(sum_avg), SUM(n_avg), MAX(peak), SUM(samples)
+FROM snapshots_daily
+GROUP BY app_id, date(day, 'weekday 0', '-6 days');
@@ -0,0 +1,19 @@
+-- 0011: player-count momentum per app and window (GET /games/trending)
+-- One row per (span, app): the app's latest avg_players against its
+-- avg_players about one span earlier. Maintained by every snapshot load
+-- (trending.TRENDING_MERGE_SQLS, after latest_snapshot); run
+-- `python trending.py` once to fill it for an existing DB.
+CREATE TABLE IF NOT EXISTS trending (
+  span      TEXT NOT NULL,       -- '24h' | '7d' | '30d'
+  app_id    INTEGER NOT NULL,
+  ts        TEXT NOT NULL,       -- latest snapshot the score is based on
+  current   INTEGER NOT NULL,    -- avg_players at ts
+  previous  INTEGER NOT NULL,    -- avg_players about one span before ts
+  delta     INTEGER NOT NULL,    -- current - previous
+  pct       REAL,                -- delta * 100 / previous (NULL when previous = 0)
+  PRIMARY KEY (span, app_id)
+) WITHOUT ROWID;
+
+-- Ranking scans, either direction; app_id breaks ties
+CREATE INDEX IF NOT EXISTS idx_trending_delta ON trending(span, delta, app_id);
+CREATE INDEX IF NOT EXISTS idx_trending_pct ON trending(span, pct, app_id);
@@ -0,0 +1,42 @@
+-- 0012: normalized facets (genres, categories, developers, publishers)
+-- apps keeps the JSON arrays; these tables index them for /games facet
+-- filters and counts. One row per distinct value in facet_values, one row per
+-- (value, app) in app_facets. Maintained by upsert_catalog.py (FACET_MERGE_SQLS)
+-- for every upserted app; seeded here from the existing catalog.
+CREATE TABLE IF NOT EXISTS facet_values (
+  facet_id  INTEGER PRIMARY KEY,
+  kind      TEXT NOT NULL,                  -- genre | category | developer | publisher
+  value     TEXT NOT NULL COLLATE NOCASE,
+  UNIQUE (kind, value)
+);
+
+CREATE TABLE IF NOT EXISTS app_facets (
+  facet_id  INTEGER NOT NULL,
+  app_id    INTEGER NOT NULL,
+  PRIMARY KEY (facet_id, app_id)            -- apps with a value (filters)
+) WITHOUT ROWID;
+
+-- values of an app (counts over a result set, re-indexing an app)
+CREATE INDEX IF NOT EXISTS idx_app_facets_app ON app_facets(app_id, facet_id);
+
+CREATE TEMP VIEW seed_facets AS
+SELECT a.app_id, 'genre' AS kind, trim(j.value) AS value
+FROM apps a, json_each(CASE WHEN json_valid(a.genres) THEN a.genres END) j WHERE j.type = 'text'
+UNION ALL
+SELECT a.app_id, 'category', trim(j.value)
+FROM apps a, json_each(CASE WHEN json_valid(a.categories) THEN a.categories END) j WHERE j.type = 'text'
+UNION ALL
+SELECT a.app_id, 'developer', trim(j.value)
+FROM apps a, json_each(CASE WHEN json_valid(a.developers) THEN a.developers END) j WHERE j.type = 'text'
+UNION ALL
+SELECT a.app_id, 'publisher', trim(j.value)
+FROM apps a, json_each(CASE WHEN json_valid(a.publishers) THEN a.publishers END) j WHERE j.type = 'text';
+
+INSERT OR IGNORE INTO facet_values (kind, value)
+SELECT kind, value FROM seed_facets WHERE value <> '';
+
+INSERT OR IGNORE INTO app_facets (facet_id, app_id)
+SELECT f.facet_id, s.app_id
+FROM seed_facets s CROSS JOIN facet_values f ON f.kind = s.kind AND f.value = s.value;
+
+DROP VIEW seed_facets;
@@ -0,0 +1,42 @@
+# 0013: indexes for the API's actual queries (checked by benchmarks/check_query_plans.py)
+#
+# /games pages are ORDER BY <sort>, <id> LIMIT: every SORT_KEYS order should
+# be an index walk that stops at the page, never a sort of the whole result.
+#   - name sorts are LOWER(name): expression index on apps; it carries app_id
+#     (the tie-breaker) and name, so pages and LIKE filters never read apps rows
+#   - player sorts: latest_snapshot indexes with the tie-breaker right after
+#     the sort column, covering the other listed columns
+#   - the view exposes app_id from latest_snapshot and again from apps
+#     (apps_app_id): each sort breaks ties on the copy its index holds
+# /api/search (legacy steam_items, only if present): one index per sort
+# column; the rowid tie-breaker is implicit.
+# Snapshot history keeps idx_snapshots_app_ts (0009): SQLite walks it
+# backwards for newest-first lookups, so no separate (app_id, ts DESC) index.
+
+def up(con):
+    con.execute("DROP INDEX IF EXISTS idx_apps_name")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_apps_name_lower ON apps(LOWER(name), app_id, name)")
+
+    for col, rest in (("avg_players", "peak_players, all_time_peak"),
+                      ("peak_players", "avg_players, all_time_peak"),
+                      ("all_time_peak", "avg_players, peak_players")):
+        con.execute(f"DROP INDEX IF EXISTS idx_latest_{col}")
+        con.execute(f"CREATE INDEX idx_latest_{col} ON latest_snapshot({col}, app_id, {rest})")
+
+    con.execute("DROP VIEW IF EXISTS steamcharts_top")
+    con.execute("""
+        CREATE VIEW steamcharts_top AS
+        SELECT
+          l.app_id         AS app_id,
+          a.name           AS name,
+          l.avg_players    AS current_players,
+          l.peak_players   AS peak_24h,
+          l.all_time_peak  AS all_time_peak,
+          a.app_id         AS apps_app_id
+        FROM latest_snapshot l
+        JOIN apps a ON a.app_id = l.app_id
+    """)
+
+    if con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'steam_items'").fetchone():
+        for col in ("current", "peak", "timestamp", "name"):
+            con.execute(f"CREATE INDEX IF NOT EXISTS idx_items_{col} ON steam_items({col})")
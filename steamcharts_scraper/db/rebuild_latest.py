@@ -0,0 +1,53 @@
+# db/rebuild_latest.py
+import sqlite3, sys, time
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parent / "steamcharts.db"
+
+# Latest row per app, plus the all-time max of peak_players (raw rows and the
+# daily rollups, which keep the peaks of compacted history; see rollups.py).
+# The join back to snapshots uses the (ts, app_id) primary key.
+REBUILD_SQL = """
+    INSERT OR REPLACE INTO latest_snapshot
+      (app_id, ts, rank, avg_players, peak_players, all_time_peak)
+    SELECT s.app_id, s.ts, s.rank, s.avg_players, s.peak_players,
+           MAX(COALESCE(m.max_peak, 0),
+               COALESCE((SELECT MAX(peak) FROM snapshots_daily d WHERE d.app_id = m.app_id), 0))
+    FROM (
+      SELECT app_id, MAX(ts) AS ts, MAX(peak_players) AS max_peak
+      FROM snapshots
+      GROUP BY app_id
+    ) AS m
+    JOIN snapshots s ON s.ts = m.ts AND s.app_id = m.app_id
+"""
+
+def rebuild(con):
+    # Apps whose raw history was all compacted away keep their last known row
+    con.execute("""
+        DELETE FROM latest_snapshot
+        WHERE app_id NOT IN (SELECT app_id FROM snapshots_daily)
+    """)
+    con.execute(REBUILD_SQL)
+    return con.execute("SELECT COUNT(*) FROM latest_snapshot").fetchone()[0]
+
+def main():
+    db_path = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else DB_PATH
+    if not db_path.exists():
+        print(f"❌ DB not found: {db_path}")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as con:
+        n = rebuild(con)
+        con.execute("""
+            INSERT INTO meta (key, value) VALUES ('data_generation', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+        """)
+        con.commit()
+
+    print(f"✅ Rebuilt latest_snapshot in {db_path}")
+    print(f"   Apps:     {n}")
+    print(f"   Elapsed:  {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
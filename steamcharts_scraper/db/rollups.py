@@ -0,0 +1,156 @@
+# db/rollups.py
+# Daily / weekly rollups of snapshots (tables from migration 0010) and
+# retention for raw snapshot rows.
+#
+#   python rollups.py rebuild [--db PATH]                   # recompute rollups from raw snapshots
+#   python rollups.py compact --keep-days 90 [--db PATH]    # fold older raw rows into the rollups, delete them
+#
+# Snapshot loads keep the rollups current through ROLLUP_MERGE_SQLS (appended
+# to load_snapshot.MERGE_SQLS): every (app, day) touched by the staged rows is
+# recomputed from its raw rows, then every touched (app, week) from its days.
+# Days before the compaction horizon have no raw rows left and are never
+# recomputed, so late or replayed feeds cannot clobber compacted history.
+import argparse, sys, time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from bulk import bump_generation, connect, default_db_path
+
+HORIZON_KEY = "snapshots_compacted_before"
+
+# First day that still has raw rows ('' = nothing compacted yet)
+HORIZON_SQL = f"COALESCE((SELECT date(value, 'unixepoch') FROM meta WHERE key = '{HORIZON_KEY}'), '')"
+
+# Recompute whole (app, day) buckets from raw rows; keys come from `keys_sql`,
+# which yields (app_id, day). The join is a range scan on idx_snapshots_app_ts.
+DAILY_SQL = """
+    INSERT OR REPLACE INTO snapshots_daily (app_id, day, min_avg, max_avg, sum_avg, n_avg, peak, samples)
+    SELECT s.app_id, k.day, MIN(s.avg_players), MAX(s.avg_players),
+           SUM(s.avg_players), COUNT(s.avg_players), MAX(s.peak_players), COUNT(*)
+    FROM ({keys_sql}) AS k
+    JOIN snapshots s ON s.app_id = k.app_id AND s.ts >= k.day AND s.ts < date(k.day, '+1 day')
+    WHERE k.day >= {horizon}
+    GROUP BY s.app_id, k.day
+"""
+
+# Recompute whole (app, week) buckets from their days; keys yield (app_id, week).
+WEEKLY_SQL = """
+    INSERT OR REPLACE INTO snapshots_weekly (app_id, week, min_avg, max_avg, sum_avg, n_avg, peak, samples)
+    SELECT d.app_id, k.week, MIN(d.min_avg), MAX(d.max_avg),
+           SUM(d.sum_avg), SUM(d.n_avg), MAX(d.peak), SUM(d.samples)
+    FROM ({keys_sql}) AS k
+    JOIN snapshots_daily d ON d.app_id = k.app_id AND d.day >= k.week AND d.day < date(k.week, '+7 days')
+    GROUP BY d.app_id, k.week
+"""
+
+STAGE_DAYS = "SELECT DISTINCT app_id, substr(ts, 1, 10) AS day FROM temp.stage_snapshots"
+STAGE_WEEKS = "SELECT DISTINCT app_id, date(ts, 'weekday 0', '-6 days') AS week FROM temp.stage_snapshots"
+
+ROLLUP_MERGE_SQLS = [
+    DAILY_SQL.format(keys_sql=STAGE_DAYS, horizon=HORIZON_SQL),
+    WEEKLY_SQL.format(keys_sql=STAGE_WEEKS, horizon=HORIZON_SQL),
+]
+
+def week_start(day):
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+def horizon(con):
+    return con.execute(f"SELECT {HORIZON_SQL}").fetchone()[0]
+
+def rebuild(con, since=None):
+    """Recompute daily rows from raw snapshots (days >= since, default: the
+    compaction horizon) and weekly rows for the weeks they fall in."""
+    since = horizon(con) if since is None else max(since, horizon(con))
+    con.execute("DELETE FROM snapshots_daily WHERE day >= ?", (since,))
+    con.execute(
+        DAILY_SQL.format(
+            keys_sql="SELECT DISTINCT app_id, substr(ts, 1, 10) AS day FROM snapshots WHERE ts >= :since",
+            horizon=":since",
+        ),
+        {"since": since},
+    )
+    # weeks holding any recomputed day, whole (their earlier days may be compacted)
+    week = week_start(since) if since else ""
+    week_keys = (
+        "SELECT DISTINCT app_id, date(day, 'weekday 0', '-6 days') AS week"
+        " FROM snapshots_daily WHERE day >= :week"
+    )
+    con.execute("DELETE FROM snapshots_weekly WHERE week >= ?", (week,))
+    con.execute(WEEKLY_SQL.format(keys_sql=week_keys), {"week": week})
+    return con.execute("SELECT COUNT(*) FROM snapshots_daily WHERE day >= ?", (since,)).fetchone()[0]
+
+def compact(con, keep_days, today=None):
+    """Fold raw snapshots older than keep_days into the rollups and delete them.
+
+    Runs in the caller's transaction. The horizon only moves forward.
+    Returns (new horizon, raw rows deleted)."""
+    today = today or datetime.now(timezone.utc).date()
+    new_horizon = (today - timedelta(days=keep_days)).isoformat()
+    old_horizon = horizon(con)
+    if new_horizon <= old_horizon:
+        return old_horizon, 0
+
+    # Make sure every day about to lose its raw rows is rolled up in full
+    # (normally a no-op: loads keep the rollups current)
+    days = "SELECT DISTINCT app_id, substr(ts, 1, 10) AS day FROM snapshots WHERE ts >= :old AND ts < :new"
+    weeks = (
+        "SELECT DISTINCT app_id, date(ts, 'weekday 0', '-6 days') AS week"
+        " FROM snapshots WHERE ts >= :old AND ts < :new"
+    )
+    params = {"old": old_horizon, "new": new_horizon}
+    con.execute(DAILY_SQL.format(keys_sql=days, horizon=":old"), params)
+    con.execute(WEEKLY_SQL.format(keys_sql=weeks), params)
+
+    deleted = con.execute("DELETE FROM snapshots WHERE ts < ?", (new_horizon,)).rowcount
+    con.execute(
+        "INSERT INTO meta (key, value) VALUES (?, CAST(strftime('%s', ?) AS INTEGER))"
+        " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (HORIZON_KEY, new_horizon),
+    )
+    return new_horizon, deleted
+
+def main():
+    p = argparse.ArgumentParser(description="Maintain snapshot rollups and raw-snapshot retention.")
+    p.add_argument("command", choices=["rebuild", "compact"])
+    p.add_argument("--db", default=str(default_db_path()))
+    p.add_argument("--keep-days", type=int, default=90, help="compact: raw snapshots kept (days)")
+    p.add_argument("--vacuum", action="store_true", help="compact: VACUUM afterwards to return space to the OS")
+    args = p.parse_args()
+
+    db_path = Path(args.db).resolve()
+    if not db_path.exists():
+        print(f"❌ DB not found: {db_path}")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    con = connect(db_path)
+    try:
+        con.execute("BEGIN")
+        if args.command == "rebuild":
+            n = rebuild(con)
+        else:
+            new_horizon, deleted = compact(con, args.keep_days)
+        bump_generation(con)
+        con.execute("COMMIT")
+        if args.command == "compact" and args.vacuum and deleted:
+            con.execute("VACUUM")
+    except Exception as e:
+        if con.in_transaction:
+            con.execute("ROLLBACK")
+        print(f"❌ {args.command} failed: {e}")
+        sys.exit(1)
+    finally:
+        con.close()
+
+    if args.command == "rebuild":
+        print(f"✅ Rebuilt rollups in {db_path}")
+        print(f"   Daily rows:  {n}")
+    else:
+        print(f"✅ Compacted raw snapshots in {db_path}")
+        print(f"   Raw rows kept from: {new_horizon}")
+        print(f"   Deleted raw rows:   {deleted}")
+    print(f"   Elapsed:     {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# db/trending.py
+# Player-count momentum per app (table trending, migration 0011), served by
+# GET /games/trending.
+#
+#   python trending.py [--db PATH]      # recompute every app (new DB, backfills)
+#
+# Snapshot loads keep it current through TRENDING_MERGE_SQLS (appended to
+# load_snapshot.MERGE_SQLS after latest_snapshot): every app in the staged
+# rows is rescored against its latest snapshot, and apps that dropped out of
+# the crawls are removed once their latest snapshot is STALE_AFTER old.
+import argparse, sys, time
+from pathlib import Path
+
+from bulk import bump_generation, connect, default_db_path
+from rollups import HORIZON_SQL
+
+# span -> how far back the baseline snapshot is
+WINDOWS = {"24h": "1 day", "7d": "7 days", "30d": "30 days"}
+
+# Crawls take a while; a baseline this much younger than the span still counts
+SLACK = "+10 minutes"
+STALE_AFTER = "2 days"
+
+ISO = "'%Y-%m-%dT%H:%M:%f'"   # same text shape as snapshots.ts
+
+# Baseline: the last snapshot between two spans and one span before the
+# latest one (index seek on idx_snapshots_app_ts), else the daily rollup of
+# that day once raw rows are compacted away. Apps without one get no row.
+# MATERIALIZED: a flattened subquery would rerun the lookups per use of previous.
+TRENDING_SQL = """
+    WITH b AS MATERIALIZED (
+      SELECT l.app_id, l.ts, l.avg_players AS current, COALESCE(
+        (SELECT s.avg_players FROM snapshots s
+         WHERE s.app_id = l.app_id
+           AND s.ts <= strftime({iso}, l.ts, '-{ago}', '{slack}')
+           AND s.ts >= strftime({iso}, l.ts, '-{ago}', '-{ago}')
+           AND s.avg_players IS NOT NULL
+         ORDER BY s.ts DESC LIMIT 1),
+        (SELECT CAST(ROUND(d.sum_avg * 1.0 / d.n_avg) AS INTEGER) FROM snapshots_daily d
+         WHERE d.app_id = l.app_id
+           AND d.day <= date(l.ts, '-{ago}')
+           AND d.day >= date(l.ts, '-{ago}', '-{ago}')
+           AND d.day < {horizon}
+           AND d.n_avg > 0
+         ORDER BY d.day DESC LIMIT 1)
+      ) AS previous
+      FROM latest_snapshot l
+      WHERE l.avg_players IS NOT NULL {apps}
+    )
+    INSERT OR REPLACE INTO trending (span, app_id, ts, current, previous, delta, pct)
+    SELECT '{span}', app_id, ts, current, previous, current - previous,
+           CASE WHEN previous > 0 THEN ROUND((current - previous) * 100.0 / previous, 2) END
+    FROM b
+    WHERE previous IS NOT NULL
+"""
+
+STAGE_APPS = "AND l.app_id IN (SELECT app_id FROM temp.stage_snapshots)"
+
+def _score_sql(span, apps):
+    return TRENDING_SQL.format(span=span, ago=WINDOWS[span], slack=SLACK, iso=ISO,
+                               horizon=HORIZON_SQL, apps=apps)
+
+def _merge_sqls():
+    sqls = []
+    for span in WINDOWS:
+        # drop first: an app whose baseline fell out of range loses its row
+        sqls.append(f"DELETE FROM trending WHERE span = '{span}'"
+                    " AND app_id IN (SELECT app_id FROM temp.stage_snapshots)")
+        sqls.append(_score_sql(span, STAGE_APPS))
+    sqls.append(
+        f"DELETE FROM trending WHERE ts < strftime({ISO},"
+        f" (SELECT MAX(ts) FROM temp.stage_snapshots), '-{STALE_AFTER}')"
+    )
+    return sqls
+
+TRENDING_MERGE_SQLS = _merge_sqls()
+
+def refresh(con):
+    """Rescore every app with a recent latest snapshot. Runs in the caller's transaction."""
+    con.execute("DELETE FROM trending")
+    for span in WINDOWS:
+        con.execute(_score_sql(span, ""))
+    con.execute(
+        f"DELETE FROM trending WHERE ts < strftime({ISO},"
+        f" (SELECT MAX(ts) FROM latest_snapshot), '-{STALE_AFTER}')"
+    )
+    return con.execute("SELECT COUNT(DISTINCT app_id) FROM trending").fetchone()[0]
+
+def main():
+    p = argparse.ArgumentParser(description="Recompute trending scores from snapshots.")
+    p.add_argument("--db", default=str(default_db_path()))
+    args = p.parse_args()
+
+    db_path = Path(args.db).resolve()
+    if not db_path.exists():
+        print(f"❌ DB not found: {db_path}")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    con = connect(db_path)
+    try:
+        con.execute("BEGIN")
+        n = refresh(con)
+        bump_generation(con)
+        con.execute("COMMIT")
+    except Exception as e:
+        if con.in_transaction:
+            con.execute("ROLLBACK")
+        print(f"❌ Trending refresh failed: {e}")
+        sys.exit(1)
+    finally:
+        con.close()
+
+    print(f"✅ Rebuilt trending in {db_path}")
+    print(f"   Apps:     {n}")
+    print(f"   Elapsed:  {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
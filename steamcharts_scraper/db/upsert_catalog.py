@@ -1,64 +1,150 @@
 # db/upsert_catalog.py
-import json, sqlite3, sys
+import argparse, json, sys
 from pathlib import Path
 
+from bulk import BATCH_SIZE, connect, default_db_path, iter_records, stage_and_merge
+from catalog_state import content_hash
+
 def to_json_text(x):
-    import json as _j
-    return None if x in (None, [], {}) else _j.dumps(x, ensure_ascii=False)
+    return None if x in (None, [], {}) else json.dumps(x, ensure_ascii=False)
+
+STAGE_DDL = """
+    app_id INTEGER, name TEXT, short_description TEXT, release_date TEXT,
+    developers TEXT, publishers TEXT, genres TEXT, categories TEXT,
+    store_app_url TEXT, last_refreshed TEXT,
+    content_hash TEXT, etag TEXT, last_modified TEXT, run_id TEXT
+"""
+
+# apps column -> facet kind (facet_values / app_facets, migration 0012)
+FACET_COLUMNS = {
+    "genre": "genres",
+    "category": "categories",
+    "developer": "developers",
+    "publisher": "publishers",
+}
+
+# (app_id, kind, value) for every staged app, read back from apps after the
+# upsert (a NULL in the feed keeps the stored list)
+STAGED_FACETS = " UNION ALL ".join(
+    f"SELECT a.app_id, '{kind}' AS kind, trim(j.value) AS value"
+    f" FROM apps a, json_each(CASE WHEN json_valid(a.{col}) THEN a.{col} END) j"
+    f" WHERE j.type = 'text' AND a.app_id IN (SELECT app_id FROM temp.stage_apps)"
+    for kind, col in FACET_COLUMNS.items()
+)
+
+# Re-index the facets of every staged app
+FACET_MERGE_SQLS = [
+    f"""
+    INSERT OR IGNORE INTO facet_values (kind, value)
+    SELECT kind, value FROM ({STAGED_FACETS}) WHERE value <> ''
+    """,
+    "DELETE FROM app_facets WHERE app_id IN (SELECT app_id FROM temp.stage_apps)",
+    # s first, then one UNIQUE(kind, value) lookup per row (otherwise the
+    # planner scans every value of a kind per staged app)
+    f"""
+    WITH s AS MATERIALIZED ({STAGED_FACETS})
+    INSERT OR IGNORE INTO app_facets (facet_id, app_id)
+    SELECT f.facet_id, s.app_id
+    FROM s CROSS JOIN facet_values f ON f.kind = s.kind AND f.value = s.value
+    """,
+]
+
+MERGE_SQLS = [
+    """
+    INSERT INTO apps (
+      app_id, name, short_description, release_date,
+      developers, publishers, genres, categories,
+      store_app_url, last_refreshed
+    )
+    SELECT app_id, name, short_description, release_date,
+           developers, publishers, genres, categories,
+           store_app_url, last_refreshed
+    FROM temp.stage_apps WHERE true
+    ON CONFLICT(app_id) DO UPDATE SET
+      name = COALESCE(excluded.name, apps.name),
+      short_description = COALESCE(excluded.short_description, apps.short_description),
+      release_date = COALESCE(excluded.release_date, apps.release_date),
+      developers = COALESCE(excluded.developers, apps.developers),
+      publishers = COALESCE(excluded.publishers, apps.publishers),
+      genres = COALESCE(excluded.genres, apps.genres),
+      categories = COALESCE(excluded.categories, apps.categories),
+      store_app_url = COALESCE(excluded.store_app_url, apps.store_app_url),
+      last_refreshed = excluded.last_refreshed
+    """,
+    # Remember what was upserted (catalog_state drives conditional refreshes)
+    """
+    INSERT INTO catalog_state (app_id, content_hash, etag, last_modified, checked_at, changed_at)
+    SELECT app_id, content_hash, etag, last_modified, last_refreshed, last_refreshed
+    FROM temp.stage_apps WHERE true
+    ON CONFLICT(app_id) DO UPDATE SET
+      content_hash = excluded.content_hash,
+      etag = excluded.etag,
+      last_modified = excluded.last_modified,
+      checked_at = COALESCE(excluded.checked_at, catalog_state.checked_at),
+      changed_at = COALESCE(excluded.changed_at, catalog_state.changed_at)
+    """,
+    # Items from a resumable spider run: mark them done in the same transaction
+    """
+    INSERT OR IGNORE INTO catalog_progress (run_id, app_id, done_at)
+    SELECT run_id, app_id, COALESCE(last_refreshed, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    FROM temp.stage_apps WHERE run_id IS NOT NULL
+    """,
+    # Facet tables follow the final genres / categories / developers / publishers
+    *FACET_MERGE_SQLS,
+]
+
+def to_row(r):
+    app_id = r.get("app_id")
+    if not app_id:
+        return None
+    return (
+        int(app_id),
+        r.get("name"),
+        r.get("short_description"),
+        r.get("release_date"),
+        to_json_text(r.get("developers")),
+        to_json_text(r.get("publishers")),
+        to_json_text(r.get("genres")),
+        to_json_text(r.get("categories")),
+        r.get("store_app_url"),
+        r.get("last_refreshed"),
+        r.get("content_hash") or content_hash(r),
+        r.get("etag"),
+        r.get("last_modified"),
+        r.get("run_id"),
+    )
+
+def load(con, records, batch_size=BATCH_SIZE):
+    return stage_and_merge(con, records, "stage_apps", STAGE_DDL, to_row, MERGE_SQLS, batch_size=batch_size)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python upsert_catalog.py <path-to-catalog.json>")
-        sys.exit(1)
+    p = argparse.ArgumentParser(description="Upsert a steam_app_catalog feed into the apps table.")
+    p.add_argument("path", help="Catalog feed (.jsonl or .json, optionally .gz)")
+    p.add_argument("--db", default=str(default_db_path()))
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    p.add_argument("--fast", action="store_true",
+                   help="PRAGMA synchronous=OFF during the load (faster, not crash-safe)")
+    args = p.parse_args()
 
-    cat_path = Path(sys.argv[1]).resolve()
+    cat_path = Path(args.path).resolve()
     if not cat_path.exists():
-        print(f"File not found: {cat_path}")
+        print(f"❌ File not found: {cat_path}")
         sys.exit(1)
 
-    db_path = Path(__file__).resolve().parent / "steamcharts.db"
-    rows = json.loads(cat_path.read_text(encoding="utf-8"))
-    if isinstance(rows, dict):
-        rows = [rows]
-
-    with sqlite3.connect(db_path) as con:
-        cur = con.cursor()
-        for r in rows:
-            app_id = r.get("app_id")
-            if not app_id:
-                continue
-
-            cur.execute("""
-                INSERT INTO apps (
-                  app_id, name, short_description, release_date,
-                  developers, publishers, genres, categories,
-                  store_app_url, last_refreshed
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(app_id) DO UPDATE SET
-                  name = COALESCE(excluded.name, apps.name),
-                  short_description = COALESCE(excluded.short_description, apps.short_description),
-                  release_date = COALESCE(excluded.release_date, apps.release_date),
-                  developers = COALESCE(excluded.developers, apps.developers),
-                  publishers = COALESCE(excluded.publishers, apps.publishers),
-                  genres = COALESCE(excluded.genres, apps.genres),
-                  categories = COALESCE(excluded.categories, apps.categories),
-                  store_app_url = COALESCE(excluded.store_app_url, apps.store_app_url),
-                  last_refreshed = excluded.last_refreshed
-            """, (
-                int(app_id),
-                r.get("name"),
-                r.get("short_description"),
-                r.get("release_date"),
-                to_json_text(r.get("developers")),
-                to_json_text(r.get("publishers")),
-                to_json_text(r.get("genres")),
-                to_json_text(r.get("categories")),
-                r.get("store_app_url"),
-                r.get("last_refreshed"),
-            ))
-        con.commit()
+    db_path = Path(args.db).resolve()
+    con = connect(db_path, fast=args.fast)
+    try:
+        stats = load(con, iter_records(cat_path), args.batch_size)
+    except Exception as e:
+        print(f"❌ Failed to upsert catalog: {e}")
+        sys.exit(1)
+    finally:
+        con.close()
 
     print(f"✅ Upserted catalog into {db_path}")
+    print(f"   Read records:   {stats['read']}")
+    print(f"   Upserted apps:  {stats['staged']}")
+    print(f"   Elapsed:        {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
 
 if __name__ == "__main__":
     main()
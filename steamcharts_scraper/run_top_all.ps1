@@ -3,8 +3,8 @@
   Run the SteamCharts "top all" spider and save output without overwriting.
 
   Output pattern:
-    data\steamcharts_top_all_MMDDYYYY.json
-    data\steamcharts_top_all_MMDDYYYY_2.json (2nd run same day), etc.
+    data\steamcharts_top_all_MMDDYYYY.jsonl
+    data\steamcharts_top_all_MMDDYYYY_2.jsonl (2nd run same day), etc.
 #>
 
 $ErrorActionPreference = "Stop"
@@ -16,6 +16,16 @@ $MinPlayers = 150
 # Max number of pages to scrape (0 = unlimited; arg omitted)
 $MaxPages   = 0
 
+# Pages fetched in parallel (0 = serial, follow "Next" one page at a time)
+$Parallel   = 4
+
+# Seconds between requests to steamcharts.com (settings.py default: 1)
+$Delay      = 0.5
+
+# Raw snapshots older than this many days are folded into the daily/weekly
+# rollups and deleted after each run (0 = keep all raw history)
+$KeepRawDays = 90
+
 # --- PROJECT CONFIG ----
 $SpiderName  = "steamcharts_top_all"
 $ProjectRoot = $PSScriptRoot
@@ -36,13 +46,13 @@ if (-not (Test-Path $DataDir)) { New-Item -ItemType Directory -Path $DataDir | O
 # Build base name with MMDDYYYY
 $today    = Get-Date -Format "MMddyyyy"
 $baseName = "steamcharts_top_all_$today"
-$outFile  = Join-Path $DataDir "$baseName.json"
+$outFile  = Join-Path $DataDir "$baseName.jsonl"
 
 # If today's file already exists, append _2, _3, ...
 if (Test-Path $outFile) {
   $n = 2
   do {
-    $outFile = Join-Path $DataDir ("{0}_{1}.json" -f $baseName, $n)
+    $outFile = Join-Path $DataDir ("{0}_{1}.jsonl" -f $baseName, $n)
     $n++
   } while (Test-Path $outFile)
 }
@@ -50,11 +60,18 @@ if (Test-Path $outFile) {
 # --- RUN ----
 Push-Location $ProjectRoot
 try {
+  # Schema migrations first (no-op when current); the SQLite pipeline needs the latest schema
+  $Migrate = Join-Path $PSScriptRoot "db\migrate.py"
+  & $VenvPython $Migrate
+
   Write-Host "▶ Running spider '$SpiderName' with settings:" -ForegroundColor Cyan
   Write-Host ("   MinPlayers = {0}" -f ($(if ($MinPlayers -gt 0) { $MinPlayers } else { "None (no threshold)" })))
   Write-Host ("   MaxPages   = {0}" -f ($(if ($MaxPages -gt 0)   { $MaxPages   } else { "Unlimited" })))
+  Write-Host ("   Parallel   = {0}, Delay = {1}s" -f ($(if ($Parallel -gt 0) { $Parallel } else { "serial" })), $Delay)
   Write-Host "   Output     = $outFile`n"
 
+  # Rows are written into SQLite as they are scraped (pipelines.SnapshotSQLitePipeline);
+  # the feed file is kept as an archive / for replay with db\load_snapshot.py.
   $scrapyArgs = @(
     "-m", "scrapy",
     "crawl", $SpiderName,
@@ -65,22 +82,18 @@ try {
 
   if ($MinPlayers -gt 0) { $scrapyArgs += @("-a", "min_players=$MinPlayers") }
   if ($MaxPages   -gt 0) { $scrapyArgs += @("-a", "max_pages=$MaxPages") }
+  if ($Parallel   -gt 0) { $scrapyArgs += @("-a", "parallel=$Parallel") }
+  $scrapyArgs += @("-a", "delay=$Delay")
 
   & $VenvPython @scrapyArgs
 
-  Write-Host "`n✅ Saved:" -ForegroundColor Green
+  Write-Host "`n✅ Saved (and loaded into SQLite):" -ForegroundColor Green
   Write-Host "   $outFile"
 
-  # Immediately load into SQLite
-  $DbLoader = Join-Path $PSScriptRoot "db\load_snapshot.py"
-  if (Test-Path $DbLoader) {
-    Write-Host "`n→ Loading snapshot into SQLite..."
-    & $VenvPython $DbLoader $outFile
-  } else {
-    Write-Host "(!) Skipping DB load; missing $DbLoader"
+  # Retention: compact old raw snapshots (rollups are kept; no-op within a day)
+  if ($KeepRawDays -gt 0) {
+    & $VenvPython (Join-Path $PSScriptRoot "db\rollups.py") compact --keep-days $KeepRawDays
   }
-
-
 }
 finally {
   Pop-Location
@@ -0,0 +1,15 @@
+# Access to the SQLite helpers in steamcharts_scraper/db (plain scripts, not a
+# package) for pipelines and spiders.
+import sys
+from pathlib import Path
+
+DB_DIR = Path(__file__).resolve().parents[1] / "db"
+if str(DB_DIR) not in sys.path:
+    sys.path.insert(0, str(DB_DIR))
+
+import bulk, catalog_state, load_snapshot, migrate, upsert_catalog  # noqa: E402
+
+
+def db_path(settings):
+    """SQLITE_DB_PATH, defaulting to steamcharts_scraper/db/steamcharts.db."""
+    return Path(settings.get("SQLITE_DB_PATH") or migrate.DB_PATH)
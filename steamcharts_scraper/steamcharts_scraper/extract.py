@@ -0,0 +1,161 @@
+# Single-pass row extraction for the SteamCharts top table,
+# shared by steamcharts_top_all.py and top_spider.py.
+#
+# Only the top table is parsed (about a quarter of the page; the rest is
+# scripts and ads), rows are found with one precompiled XPath, and each row's
+# cells are read directly from the lxml elements instead of running one
+# selector query per cell.
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import lxml.html
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+
+APP_RE = re.compile(r"/app/(\d+)")
+XML_SPACE_RE = re.compile(r"[ \t\r\n]+")
+
+TOP_ROWS_CSS = "table.common-table tbody tr"
+TABLE_START_RE = re.compile(r"<table\b[^>]*\bcommon-table\b", re.I)
+TABLE_END_RE = re.compile(r"</table\s*>", re.I)
+
+
+@lru_cache(maxsize=None)
+def _rows_xpath(css):
+    return etree.XPath(HTMLTranslator().css_to_xpath(css))
+
+
+def _table_root(response):
+    """Parsed <table class="common-table"> alone, or the whole page when the
+    table can't be cut out unambiguously (missing, or more than one)."""
+    text = response.text
+    starts = TABLE_START_RE.finditer(text)
+    first = next(starts, None)
+    end = TABLE_END_RE.search(text, first.end()) if first is not None else None
+    if first is None or end is None or next(starts, None) is not None:
+        return response.selector.root
+    return lxml.html.fragment_fromstring(text[first.start():end.end()])
+
+
+def top_rows(response, css=TOP_ROWS_CSS):
+    """<tr> elements of the top table (same rows as response.css(css))."""
+    return _rows_xpath(css)(_table_root(response))
+
+
+def fetched_at(response):
+    """ISO UTC time the page was downloaded: request.meta["cache_timestamp"]
+    when the HTTP cache stored or served it (a replayed page keeps the time of
+    its original fetch, so a re-run is not a new snapshot); otherwise now."""
+    stored_at = response.meta.get("cache_timestamp")
+    if stored_at is not None:
+        return datetime.utcfromtimestamp(stored_at).isoformat()
+    return datetime.utcnow().isoformat()
+
+
+def _elements(el):
+    # element children only (lxml also yields comments / processing instructions)
+    return [c for c in el if isinstance(c.tag, str)]
+
+
+def first_text(el):
+    """First direct text node of el, like the `::text` pseudo-element's .get()."""
+    if el.text is not None:
+        return el.text
+    for child in el:
+        if child.tail is not None:
+            return child.tail
+    return None
+
+
+def first_link_text(el):
+    """First text node under any <a> below el (`el a::text` / `.//a/text()`)."""
+    for a in el.iter("a"):
+        text = first_text(a)
+        if text is not None:
+            return text
+    return None
+
+
+def first_link(el):
+    for a in el.iter("a"):
+        return a
+    return None
+
+
+def normalize_space(value):
+    return XML_SPACE_RE.sub(" ", value).strip(" ")
+
+
+def clean_text(value):
+    return value.strip() if value else None
+
+
+def clean_int(value):
+    if value is None:
+        return None
+    try:
+        # fast path: "1,234,567"
+        return int(value.replace(",", ""))
+    except ValueError:
+        pass
+    try:
+        return int(value.replace(",", "").replace("+", "").replace("−", "-").replace(" ", ""))
+    except ValueError:
+        return None
+
+
+def app_id_from_href(href):
+    if not href:
+        return None
+    m = APP_RE.search(href)
+    return m.group(1) if m else None
+
+
+def top_all_fields(tr):
+    """(rank, name, detail_href, app_id, avg_players, peak_players) for steamcharts_top_all,
+    matching its former `td:nth-child(N)` CSS queries."""
+    cells = _elements(tr)
+
+    def cell(n):
+        return cells[n] if len(cells) > n and cells[n].tag == "td" else None
+
+    rank_td, name_td, avg_td, peak_td = cell(0), cell(1), cell(2), cell(4)
+
+    rank_txt = clean_text(first_text(rank_td)) if rank_td is not None else None
+    name_txt = clean_text(first_link_text(name_td)) if name_td is not None else None
+    a = first_link(name_td) if name_td is not None else None
+    href = a.get("href") if a is not None else None
+    avg_txt = clean_text(first_text(avg_td)) if avg_td is not None else None
+    peak_txt = clean_text(first_text(peak_td)) if peak_td is not None else None
+
+    return (
+        clean_int(rank_txt.strip(".") if rank_txt else None),
+        name_txt,
+        href,
+        app_id_from_href(href),
+        clean_int(avg_txt),
+        clean_int(peak_txt),
+    )
+
+
+def top_fields(tr):
+    """(app_id, name, current, peak, hours) strings for steamcharts_top,
+    matching its former per-cell XPath (normalize-space, commas removed)."""
+    cells = [c for c in _elements(tr) if c.tag == "td"]
+    name_td = cells[1]
+    app_id = None
+    for a in name_td:
+        if a.tag == "a":
+            app_id = app_id_from_href(a.get("href"))
+            if app_id:
+                break
+    name = first_link_text(name_td)
+    return (
+        app_id,
+        normalize_space(name) if name is not None else "",
+        normalize_space(cells[2].text_content()).replace(",", ""),
+        normalize_space(cells[4].text_content()).replace(",", ""),
+        normalize_space(cells[5].text_content()).replace(",", ""),
+    )
@@ -3,11 +3,24 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
 from scrapy import signals
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+logger = logging.getLogger(__name__)
+
 
 class SteamchartsScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -98,3 +111,179 @@ class SteamchartsScraperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+# --- HTTP cache ---------------------------------------------------------------
+# Scrapy's HttpCacheMiddleware with an SQLite storage backend (see settings.py):
+#   - one file, HTTPCACHE_DIR/httpcache.sqlite, keyed by (spider, request fingerprint)
+#   - TTL per spider: HTTPCACHE_EXPIRATION_SECS_BY_SPIDER, falling back to
+#     HTTPCACHE_EXPIRATION_SECS (0 = never expires)
+#   - bodies zlib-compressed when HTTPCACHE_GZIP is on
+#   - capped at HTTPCACHE_MAX_MB, least recently used entries evicted first
+#   - HTTPCACHE_REPLAY=True: crawl from the cache only (expired entries are
+#     served, missing ones are dropped, nothing is written or downloaded)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+  spider      TEXT NOT NULL,
+  fingerprint TEXT NOT NULL,
+  url         TEXT NOT NULL,
+  status      INTEGER NOT NULL,
+  headers     TEXT NOT NULL,      -- JSON {name: [values]}
+  body        BLOB NOT NULL,
+  compressed  INTEGER NOT NULL,   -- 1 = zlib
+  size        INTEGER NOT NULL,   -- bytes stored, for the size cap
+  stored_at   REAL NOT NULL,
+  accessed_at REAL NOT NULL,
+  PRIMARY KEY (spider, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at);
+"""
+
+
+class SQLiteCacheStorage:
+    """HTTPCACHE_STORAGE backend: see the notes above."""
+
+    COMMIT_EVERY = 200      # writes per transaction
+    COMMIT_SECS = 2.0
+    EVICT_TO = 0.9          # evict down to 90% of the cap
+
+    def __init__(self, settings):
+        self.path = Path(data_path(settings["HTTPCACHE_DIR"], createdir=True)) / "httpcache.sqlite"
+        self.default_ttl = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.ttls = settings.getdict("HTTPCACHE_EXPIRATION_SECS_BY_SPIDER")
+        self.compress = settings.getbool("HTTPCACHE_GZIP")
+        self.max_bytes = int(settings.getfloat("HTTPCACHE_MAX_MB") * 1024 * 1024)
+        self.replay = settings.getbool("HTTPCACHE_REPLAY")
+        self.con = None
+
+    def open_spider(self, spider):
+        self.spider = spider.name
+        self.ttl = int(self.ttls.get(spider.name, self.default_ttl))
+        self.stats = spider.crawler.stats
+        self._fingerprinter = spider.crawler.request_fingerprinter
+
+        self.con = sqlite3.connect(self.path, isolation_level=None)
+        self.con.execute("PRAGMA auto_vacuum=INCREMENTAL")   # only takes effect on a new file
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(CACHE_SCHEMA)
+        self.total = self.con.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.touched = {}       # fingerprint -> accessed_at, written with the next commit
+        self.pending = 0
+        self.last_commit = time.monotonic()
+        self.con.execute("BEGIN")
+
+        mode = "replay" if self.replay else f"ttl {self.ttl}s" if self.ttl else "no expiry"
+        logger.info(
+            f"[HTTPCACHE] {self.path} ({self.total / 1048576:.1f} MB, {mode})",
+            extra={"spider": spider},
+        )
+
+    def close_spider(self, spider):
+        if self.con is None:
+            return
+        self._flush_touched()
+        self.con.execute("COMMIT")
+        self.con.close()
+        self.con = None
+
+    def retrieve_response(self, spider, request):
+        key = self._fingerprinter.fingerprint(request).hex()
+        row = self.con.execute(
+            "SELECT url, status, headers, body, compressed, stored_at FROM responses"
+            " WHERE spider = ? AND fingerprint = ?",
+            (self.spider, key),
+        ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, compressed, stored_at = row
+        if not self.replay and 0 < self.ttl < time.time() - stored_at:
+            return None     # expired; the fresh download replaces it
+
+        self.touched[key] = time.time()
+        self._maybe_commit()
+
+        request.meta["cache_timestamp"] = stored_at
+        if compressed:
+            body = zlib.decompress(body)
+        headers = Headers(json.loads(headers))
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        if self.replay:
+            return
+        key = self._fingerprinter.fingerprint(request).hex()
+        headers = json.dumps({
+            k.decode("latin-1"): [v.decode("latin-1") for v in vs]
+            for k, vs in response.headers.items()
+        })
+        body = response.body
+        compressed = 0
+        if self.compress and body:
+            packed = zlib.compress(body, 6)
+            if len(packed) < len(body):
+                body, compressed = packed, 1
+        size = len(body) + len(headers) + len(response.url)
+        now = time.time()
+
+        old = self.con.execute(
+            "SELECT size FROM responses WHERE spider = ? AND fingerprint = ?", (self.spider, key)
+        ).fetchone()
+        self.con.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (spider, fingerprint, url, status, headers, body, compressed, size, stored_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.spider, key, response.url, response.status, headers, body, compressed, size, now, now),
+        )
+        self.touched.pop(key, None)
+        request.meta["cache_timestamp"] = now      # the spider stamps items with it, as on a hit
+        self.total += size - (old[0] if old else 0)
+        if self.max_bytes and self.total > self.max_bytes:
+            self._evict()
+        self._maybe_commit()
+
+    def _maybe_commit(self):
+        self.pending += 1
+        if self.pending >= self.COMMIT_EVERY or time.monotonic() - self.last_commit >= self.COMMIT_SECS:
+            self._flush_touched()
+            self.con.execute("COMMIT")
+            self.con.execute("BEGIN")
+            self.pending = 0
+            self.last_commit = time.monotonic()
+
+    def _flush_touched(self):
+        # access times of cache hits are batched: one UPDATE pass per commit
+        if self.touched:
+            self.con.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE spider = ? AND fingerprint = ?",
+                [(ts, self.spider, key) for key, ts in self.touched.items()],
+            )
+            self.touched = {}
+
+    def _evict(self):
+        """Drop least recently used entries (any spider) until under EVICT_TO of the cap."""
+        self._flush_touched()
+        target = self.total - int(self.max_bytes * self.EVICT_TO)
+        victims, freed = [], 0
+        for spider, key, size in self.con.execute(
+            "SELECT spider, fingerprint, size FROM responses ORDER BY accessed_at"
+        ):
+            victims.append((spider, key))
+            freed += size
+            if freed >= target:
+                break
+        self.con.executemany("DELETE FROM responses WHERE spider = ? AND fingerprint = ?", victims)
+        self.con.execute("PRAGMA incremental_vacuum")
+        self.total -= freed
+        self.stats.inc_value("httpcache/evicted", len(victims))
+
+
+class SQLiteHttpCacheMiddleware(HttpCacheMiddleware):
+    """HttpCacheMiddleware that also honours HTTPCACHE_REPLAY (cache-only crawl)."""
+
+    def __init__(self, settings, stats):
+        super().__init__(settings, stats)
+        if settings.getbool("HTTPCACHE_REPLAY"):
+            self.ignore_missing = True
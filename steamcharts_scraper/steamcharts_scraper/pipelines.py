@@ -3,11 +3,164 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import queue
+import threading
+import time
+from pathlib import Path
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+
+from steamcharts_scraper.dbtools import DB_DIR, bulk, db_path, load_snapshot, migrate, upsert_catalog
+
+_STOP = object()
 
 
 class SteamchartsScraperPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class SQLiteBatchPipeline:
+    """Write items straight into SQLite from a background writer thread.
+
+    Items are queued by process_item and flushed every SQLITE_FLUSH_ITEMS
+    items or SQLITE_FLUSH_SECS seconds, whichever comes first. Each flush is
+    one transaction through the same staging + merge path as the db/ loaders
+    (bulk.stage_and_merge), so a crashed crawl never leaves half a batch.
+    close_spider drains the queue, commits the last batch and joins the thread.
+
+    Subclasses set spider_names plus the loader module (to_row / STAGE_DDL / MERGE_SQLS).
+    """
+
+    spider_names = ()
+    loader = None
+    stage_table = None
+
+    def __init__(self, db_path, flush_items=500, flush_secs=5.0, fast=False):
+        self.db_path = Path(db_path)
+        self.flush_items = flush_items
+        self.flush_secs = flush_secs
+        self.fast = fast
+        self.active = False
+        self.error = None
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = crawler.settings
+        if not s.getbool("SQLITE_PIPELINE_ENABLED", True):
+            raise NotConfigured("SQLITE_PIPELINE_ENABLED is off")
+        pipe = cls(
+            db_path=db_path(s),
+            flush_items=s.getint("SQLITE_FLUSH_ITEMS", 500),
+            flush_secs=s.getfloat("SQLITE_FLUSH_SECS", 5.0),
+            fast=s.getbool("SQLITE_FAST", False),
+        )
+        pipe.crawler = crawler
+        return pipe
+
+    # spider=None: newer Scrapy no longer passes it (crawler.spider), older ones do
+    def open_spider(self, spider=None):
+        spider = spider or self.crawler.spider
+        if spider.name not in self.spider_names:
+            return
+        con = bulk.connect(self.db_path)
+        try:
+            version = migrate.current_version(con)
+        finally:
+            con.close()
+        if version < migrate.LATEST_VERSION:
+            raise RuntimeError(
+                f"{self.db_path} is at schema version {version}, need {migrate.LATEST_VERSION}. "
+                f"Run: python {DB_DIR / 'migrate.py'} {self.db_path}"
+            )
+
+        self.active = True
+        self.spider = spider
+        self.queue = queue.Queue(maxsize=self.flush_items * 4)
+        self.thread = threading.Thread(target=self._writer, name=f"sqlite-{spider.name}", daemon=True)
+        self.thread.start()
+        spider.logger.info(
+            f"[SQLITE] writing {spider.name} items to {self.db_path} "
+            f"(flush every {self.flush_items} items / {self.flush_secs}s)"
+        )
+
+    def process_item(self, item, spider=None):
+        if self.active:
+            # blocks when the writer falls behind (backpressure instead of unbounded memory)
+            self.queue.put(ItemAdapter(item).asdict())
+        return item
+
+    def close_spider(self, spider=None):
+        if not self.active:
+            return
+        spider = self.spider
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.active = False
+        for key in ("written", "failed", "flushes"):
+            self.crawler.stats.set_value(f"sqlite/{key}", getattr(self, key))
+        if self.error is not None:
+            spider.logger.error(f"[SQLITE] {self.failed} items not written: {self.error!r}")
+        else:
+            spider.logger.info(f"[SQLITE] committed {self.written} items in {self.flushes} flushes")
+
+    # --- writer thread ---
+    def _writer(self):
+        con = bulk.connect(self.db_path, fast=self.fast)
+        try:
+            batch, deadline, stopping = [], None, False
+            while not stopping:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    obj = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    obj = None
+                if obj is _STOP:
+                    stopping = True
+                elif obj is not None:
+                    batch.append(obj)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_secs
+                if batch and (stopping or len(batch) >= self.flush_items or time.monotonic() >= deadline):
+                    self._flush(con, batch)
+                    batch, deadline = [], None
+        finally:
+            con.close()
+
+    def _flush(self, con, batch):
+        if self.error is not None:
+            self.failed += len(batch)
+            return
+        try:
+            stats = bulk.stage_and_merge(
+                con, batch, self.stage_table, self.loader.STAGE_DDL,
+                self.loader.to_row, self.loader.MERGE_SQLS,
+                stage_indexes=getattr(self.loader, "STAGE_INDEXES", ()),
+            )
+        except Exception as e:
+            # keep draining so the crawl never blocks on a dead writer
+            self.error = e
+            self.failed += len(batch)
+            self.spider.logger.exception("[SQLITE] flush failed; later items will be dropped")
+            return
+        self.written += stats["staged"]
+        self.flushes += 1
+
+
+class SnapshotSQLitePipeline(SQLiteBatchPipeline):
+    """steamcharts_top_all rows -> apps / snapshots / latest_snapshot."""
+    spider_names = ("steamcharts_top_all",)
+    loader = load_snapshot
+    stage_table = "stage_snapshots"
+
+
+class CatalogSQLitePipeline(SQLiteBatchPipeline):
+    """steam_app_catalog details -> apps."""
+    spider_names = ("steam_app_catalog",)
+    loader = upsert_catalog
+    stage_table = "stage_apps"
@@ -46,9 +46,12 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
+DOWNLOADER_MIDDLEWARES = {
 #    "steamcharts_scraper.middlewares.SteamchartsScraperDownloaderMiddleware": 543,
-#}
+    # HTTP cache with SQLite storage, per-spider TTL and replay mode (see below)
+    "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware": None,
+    "steamcharts_scraper.middlewares.SQLiteHttpCacheMiddleware": 900,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -58,9 +61,19 @@ DOWNLOAD_DELAY = 1
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "steamcharts_scraper.pipelines.SteamchartsScraperPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "steamcharts_scraper.pipelines.SnapshotSQLitePipeline": 300,
+    "steamcharts_scraper.pipelines.CatalogSQLitePipeline": 310,
+}
+
+# SQLite pipelines: items go straight into the DB from a writer thread.
+# Each flush is one transaction; the last one commits when the spider closes.
+# Disable with -s SQLITE_PIPELINE_ENABLED=False (then load the feed with db/*.py).
+SQLITE_PIPELINE_ENABLED = True
+#SQLITE_DB_PATH = "db/steamcharts.db"   # default: steamcharts_scraper/db/steamcharts.db
+SQLITE_FLUSH_ITEMS = 500
+SQLITE_FLUSH_SECS = 5.0
+#SQLITE_FAST = True                     # PRAGMA synchronous=OFF on the writer connection
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -75,13 +88,27 @@ DOWNLOAD_DELAY = 1
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
-# Enable and configure HTTP caching (disabled by default)
+# HTTP cache: re-running a crawl after a failure or a code change reuses what
+# was already downloaded. Stored in .scrapy/httpcache/httpcache.sqlite.
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# Player-count items are stamped with the page's fetch time (stored_at for a
+# cache hit), so a re-run inside the TTL reproduces the same snapshot rather
+# than passing cached counts off as a new one.
+#   live data only:      -s HTTPCACHE_ENABLED=False
+#   offline, from cache: -s HTTPCACHE_REPLAY=True  (nothing downloaded, misses dropped)
+HTTPCACHE_ENABLED = True
+HTTPCACHE_EXPIRATION_SECS = 3600
+HTTPCACHE_EXPIRATION_SECS_BY_SPIDER = {
+    "steamcharts_top_all": 1800,        # player counts: only reuse within a run's retry window
+    "steamcharts_top": 1800,
+    "steam_app_catalog": 86400,
+}
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_IGNORE_HTTP_CODES = [429, 500, 502, 503, 504]   # never replay throttling/server errors
+HTTPCACHE_STORAGE = "steamcharts_scraper.middlewares.SQLiteCacheStorage"
+HTTPCACHE_GZIP = True
+HTTPCACHE_MAX_MB = 512
+HTTPCACHE_REPLAY = False
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
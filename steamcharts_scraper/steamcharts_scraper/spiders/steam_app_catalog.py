@@ -1,8 +1,11 @@
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import scrapy
+from scrapy import signals
+
+from steamcharts_scraper.dbtools import bulk, catalog_state, db_path
 
 APPDETAILS = "https://store.steampowered.com/api/appdetails?appids={appid}&cc=us&l=en"
 
@@ -12,11 +15,73 @@ class SteamAppCatalogSpider(scrapy.Spider):
     allowed_domains = ["store.steampowered.com"]
 
     # Usage:
-    # scrapy crawl steam_app_catalog -O data/catalog.json -a app_ids_file=data/latest_app_ids.txt -a stale_days=30
-    def __init__(self, app_ids_file=None, stale_days="30", *args, **kwargs):
+    # scrapy crawl steam_app_catalog -O data/catalog.jsonl -a app_ids_file=data/latest_app_ids.txt -a stale_days=30
+    #
+    # With the DB available (catalog_state, migration 0007) the refresh is incremental:
+    #   - ids checked within stale_days are skipped (stale_days=0 re-checks everything)
+    #   - stored ETag / Last-Modified are sent as If-None-Match / If-Modified-Since
+    #   - a 304, or a payload whose content hash matches the stored one, only
+    #     marks the app as checked; no item is emitted and apps is not touched
+    # -a conditional=0 turns all of that off (plain full refresh).
+    #
+    # Runs are resumable (catalog_progress, migration 0008): every finished id is
+    # recorded under run_id (default: ids file stem + content hash), and a restart
+    # with the same list skips them. -a resume=0 ignores earlier progress.
+    # Split one list over several processes with -a shards=4 -a shard=0..3
+    # (app_id % shards == shard, so the shards never overlap).
+    def __init__(self, app_ids_file=None, stale_days="30", conditional="1", resume="1",
+                 run_id=None, shard="0", shards="1", *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.app_ids_file = app_ids_file
         self.stale_days = int(stale_days)
+        self.conditional = conditional not in ("0", "false", "False")
+        self.resume = resume not in ("0", "false", "False")
+        self.run_id = run_id
+        self.shard = int(shard)
+        self.shards = int(shards)
+        if not 0 <= self.shard < self.shards:
+            raise ValueError(f"shard must be in 0..{self.shards - 1}, got {self.shard}")
+        self.states = {}
+        self.done = set()
+        self.checks = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if spider.conditional or spider.resume:
+            spider.open_state(db_path(crawler.settings))
+            crawler.signals.connect(spider.close_state, signal=signals.spider_closed)
+        return spider
+
+    def open_state(self, path):
+        if not Path(path).exists():
+            self.logger.warning(f"[CATALOG] {path} not found; refreshing every id unconditionally.")
+            return
+        if self.resume and self.run_id is None and self.app_ids_file and Path(self.app_ids_file).exists():
+            self.run_id = catalog_state.run_id_for(self.app_ids_file)
+        self.state_con = bulk.connect(path)
+        self.checks = catalog_state.CheckLog(self.state_con, run_id=self.run_id if self.resume else None)
+        if self.conditional:
+            self.states = catalog_state.load_states(self.state_con)
+            self.logger.info(f"[CATALOG] loaded change-detection state for {len(self.states)} apps")
+        if self.resume and self.run_id:
+            self.done = catalog_state.load_done(self.state_con, self.run_id)
+            self.logger.info(
+                f"[CATALOG] run {self.run_id}: {len(self.done)} ids already done "
+                f"(this is shard {self.shard} of {self.shards})"
+            )
+
+    def close_state(self, spider):
+        if self.checks is None:
+            return
+        self.checks.flush()
+        self.state_con.close()
+        self.logger.info(f"[CATALOG] marked {self.checks.written} unchanged apps as checked")
+
+    async def start(self):
+        # Scrapy >= 2.13 entry point; start_requests() stays for older versions
+        for request in self.start_requests():
+            yield request
 
     def start_requests(self):
         if not self.app_ids_file:
@@ -26,29 +91,71 @@ class SteamAppCatalogSpider(scrapy.Spider):
         if not path.exists():
             raise RuntimeError(f"app_ids_file not found: {path}")
 
+        fresh_after = None
+        if self.stale_days > 0:
+            fresh_after = (datetime.now(timezone.utc) - timedelta(days=self.stale_days)).isoformat()
+
+        skipped_fresh = skipped_done = 0
         with path.open("r", encoding="utf-8") as f:
             for line in f:
                 appid = line.strip()
                 if not appid or not appid.isdigit():
                     continue
+                if int(appid) % self.shards != self.shard:
+                    continue
+                if int(appid) in self.done:
+                    skipped_done += 1
+                    continue
+
+                headers = {"Accept": "application/json"}  # keep it polite, use JSON accept header
+                state = self.states.get(int(appid))
+                if state is not None:
+                    if fresh_after and state.checked_at and state.checked_at >= fresh_after:
+                        skipped_fresh += 1
+                        continue
+                    if state.etag:
+                        headers["If-None-Match"] = state.etag
+                    if state.last_modified:
+                        headers["If-Modified-Since"] = state.last_modified
+
                 url = APPDETAILS.format(appid=appid)
-                # keep it polite, use JSON accept header
                 yield scrapy.Request(
                     url,
-                    headers={"Accept": "application/json"},
+                    headers=headers,
                     cb_kwargs={"appid": appid},
+                    meta={"handle_httpstatus_list": [304]},
                     dont_filter=True,
                 )
 
+        self.crawler.stats.set_value("catalog/skipped_fresh", skipped_fresh)
+        self.crawler.stats.set_value("catalog/skipped_done", skipped_done)
+        self.logger.info(
+            f"[CATALOG] skipped {skipped_fresh} ids checked within {self.stale_days} days, "
+            f"{skipped_done} already done in this run"
+        )
+
     def parse(self, response, appid):
+        now = datetime.now(timezone.utc).isoformat()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        etag = etag.decode("latin-1") if etag else None
+        last_modified = last_modified.decode("latin-1") if last_modified else None
+
+        if response.status == 304:
+            self.crawler.stats.inc_value("catalog/not_modified")
+            self.mark_checked(appid, now, etag, last_modified)
+            return
+
         try:
             payload = json.loads(response.text)
             node = payload.get(str(appid), {})
         except Exception:
-            node = {}
+            return   # garbled response: leave it for the next (resumed) run
 
         if not node.get("success") or "data" not in node:
-            # Missing/age-gated/delisted: skip silently
+            # Missing/age-gated/delisted: skip silently (but don't retry it on resume)
+            if self.checks is not None:
+                self.checks.done(appid, now)
             return
 
         d = node["data"]
@@ -68,6 +175,24 @@ class SteamAppCatalogSpider(scrapy.Spider):
             "categories": _desc_list("categories"),
             "price_overview": d.get("price_overview") or None,  # dict or None
             "store_app_url": f"https://store.steampowered.com/app/{appid}/",
-            "last_refreshed": datetime.now(timezone.utc).isoformat(),
+            "last_refreshed": now,
         }
+
+        # Change detection: same content as last time -> no upsert
+        item["content_hash"] = catalog_state.content_hash(item)
+        state = self.states.get(int(appid))
+        if state is not None and state.content_hash == item["content_hash"]:
+            self.crawler.stats.inc_value("catalog/unchanged")
+            self.mark_checked(appid, now, etag, last_modified)
+            return
+
+        item["etag"] = etag
+        item["last_modified"] = last_modified
+        if self.resume and self.run_id:
+            item["run_id"] = self.run_id   # marked done when the item is upserted
+        self.crawler.stats.inc_value("catalog/changed")
         yield item
+
+    def mark_checked(self, appid, checked_at, etag, last_modified):
+        if self.checks is not None:
+            self.checks.add(appid, checked_at, etag, last_modified)
@@ -1,65 +1,57 @@
 import re
 import scrapy
-from datetime import datetime
+from urllib.parse import urljoin
+from twisted.internet.defer import Deferred
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.defer import maybe_deferred_to_future
+
+from steamcharts_scraper.extract import clean_int, clean_text, fetched_at, top_all_fields, top_rows
+
+
+PAGE_RE = re.compile(r"/top/p\.(\d+)")
 
 
 class SteamChartsTopAllSpider(scrapy.Spider):
     name = "steamcharts_top_all"
     allowed_domains = ["steamcharts.com"]
 
-    # Usage: scrapy crawl steamcharts_top_all -O data/top.json -a min_players=60000
-    def __init__(self, min_players=None, max_pages=None, *args, **kwargs):
+    # Usage: scrapy crawl steamcharts_top_all -O data/top.jsonl -a min_players=60000
+    # Fan-out: -a parallel=4 [-a delay=0.25]  (N pages in flight instead of following "Next")
+    def __init__(self, min_players=None, max_pages=None, parallel=None, delay=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.min_players = int(min_players) if min_players is not None else None
         self.max_pages = int(max_pages) if max_pages is not None else None
+        self.parallel = int(parallel) if parallel else 0
+        self.delay = float(delay) if delay is not None else None
         self.page_count = 0
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        # Politeness follows the fan-out (settings are still mutable here)
+        if spider.parallel:
+            per_domain = crawler.settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN")
+            crawler.settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", max(per_domain, spider.parallel), priority="spider")
+        if spider.delay is not None:
+            crawler.settings.set("DOWNLOAD_DELAY", spider.delay, priority="spider")
+        return spider
+
     start_urls = ["https://steamcharts.com/top/p.1"]
 
     def parse(self, response):
+        if self.parallel:
+            return self.stream_fanout(response)
+        return self.parse_serial(response)
+
+    def parse_serial(self, response):
         self.page_count += 1
-        rows = response.css("table.common-table tbody tr")
+        rows = top_rows(response)
         if not rows:
             self.logger.info(f"[DONE] No rows found at {response.url} — stopping.")
             return
 
-        crossed_threshold = False
-        min_seen = None
-
-        for row in rows:
-            rank_txt   = self.clean_text(row.css("td:nth-child(1)::text").get())
-            name_txt   = self.clean_text(row.css("td:nth-child(2) a::text").get())
-            detail_rel = row.css("td:nth-child(2) a::attr(href)").get()
-            avg_txt    = self.clean_text(row.css("td:nth-child(3)::text").get())
-            peak_txt   = self.clean_text(row.css("td:nth-child(5)::text").get())
-
-            avg_players  = self.clean_int(avg_txt)
-            peak_players = self.clean_int(peak_txt)
-
-            # NEW: app_id from the href (/app/<id>)
-            app_id = None
-            if detail_rel:
-                m = re.search(r"/app/(\d+)", detail_rel)
-                if m:
-                    app_id = m.group(1)
-
-            if avg_players is not None:
-                min_seen = avg_players if min_seen is None else min(min_seen, avg_players)
-
-            # Threshold: stop *before* following next if this page dips below
-            if self.min_players is not None and avg_players is not None and avg_players < self.min_players:
-                crossed_threshold = True
-                break
-
-            yield {
-                "rank": self.clean_int(rank_txt.strip(".") if rank_txt else None),
-                "name": name_txt,
-                "detail_url": response.urljoin(detail_rel) if detail_rel else None,
-                "app_id": app_id,  # <-- critical for DB
-                "avg_players": avg_players,
-                "peak_players": peak_players,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
+        items, crossed_threshold, min_seen = self.extract_rows(response, rows)
+        yield from items
 
         self.logger.info(f"[PAGE {self.page_count}] url={response.url} min_avg_on_page={min_seen}")
 
@@ -87,14 +79,166 @@ class SteamChartsTopAllSpider(scrapy.Spider):
         else:
             self.logger.info(f"[DONE] No next link found at {response.url} — crawl finished.")
 
+    def extract_rows(self, response, rows):
+        """Items for one page, up to the min_players threshold.
+        Returns (items, crossed_threshold, min_avg_seen)."""
+        items = []
+        crossed_threshold = False
+        min_seen = None
+        timestamp = fetched_at(response)
+
+        for row in rows:
+            rank, name_txt, detail_rel, app_id, avg_players, peak_players = top_all_fields(row)
+
+            if avg_players is not None:
+                min_seen = avg_players if min_seen is None else min(min_seen, avg_players)
+
+            # Threshold: stop *before* following next if this page dips below
+            if self.min_players is not None and avg_players is not None and avg_players < self.min_players:
+                crossed_threshold = True
+                break
+
+            items.append({
+                "rank": rank,
+                "name": name_txt,
+                "detail_url": response.urljoin(detail_rel) if detail_rel else None,
+                "app_id": app_id,  # <-- critical for DB
+                "avg_players": avg_players,
+                "peak_players": peak_players,
+                "timestamp": timestamp,
+            })
+
+        return items, crossed_threshold, min_seen
+
+    # --- Fan-out mode (-a parallel=N) ---
+    # Keeps N page requests in flight. The first page that crosses min_players
+    # (or comes back empty / 404) sets the cutoff: nothing past it is scheduled,
+    # and pages past it that still come back are ignored unparsed.
+    # Rows go out as soon as every page before theirs is in, all through page
+    # 1's output (stream_fanout): Scrapy processes the outputs of different
+    # callbacks concurrently, so rows emitted by each page's own callback could
+    # interleave in the feed; one output keeps it in rank order, exactly like
+    # the serial crawl. The other callbacks only schedule requests.
+    async def stream_fanout(self, response):
+        """Page 1's output for the whole fan-out: the first requests, then each
+        page's rows in rank order until nothing is left in flight."""
+        self.start_fanout(response)
+        for request in self.parse_page(response, page=1):
+            yield request
+        while True:
+            while self.next_emit in self.pages_done and (self.cutoff is None or self.next_emit <= self.cutoff):
+                for item in self.pages_done.pop(self.next_emit):
+                    self.rows_emitted += 1
+                    yield item
+                self.next_emit += 1
+            if not self.in_flight:
+                break
+            self.wakeup = Deferred()
+            await maybe_deferred_to_future(self.wakeup)
+        self.logger.info(f"[DONE] Fan-out finished: {self.next_emit - 1} pages, {self.rows_emitted} rows.")
+
+    def parse_page(self, response, page):
+        if page > 1:
+            self.in_flight -= 1
+
+        if self.cutoff is not None and page > self.cutoff:
+            self.logger.info(f"[SKIP] Page {page} is past the cutoff (page {self.cutoff}) — ignored.")
+            return self.advance()
+
+        try:
+            rows = top_rows(response)
+            if not rows:
+                self.logger.info(f"[DONE] No rows found at {response.url} — end of list.")
+                self.set_cutoff(page - 1)
+                self.pages_done[page] = []
+            else:
+                items, crossed_threshold, min_seen = self.extract_rows(response, rows)
+                self.pages_done[page] = items
+                self.logger.info(f"[PAGE {page}] url={response.url} min_avg_on_page={min_seen}")
+                if crossed_threshold:
+                    self.logger.info(
+                        f"[STOP] Avg players fell below {self.min_players} on {response.url} — cutting off after page {page}."
+                    )
+                    self.set_cutoff(page)
+        except Exception:
+            # a page that never lands would hold back every row after it
+            self.logger.exception(f"[GAP] Page {page} could not be parsed; its rows are missing.")
+            self.pages_done[page] = []
+
+        return self.advance()
+
+    def page_failed(self, failure):
+        page = failure.request.cb_kwargs["page"]
+        self.in_flight -= 1
+        status = failure.value.response.status if failure.check(HttpError) else None
+        if status == 404:
+            self.logger.info(f"[DONE] Page {page} is 404 — end of list.")
+            self.set_cutoff(page - 1)
+        else:
+            self.logger.error(f"[GAP] Page {page} failed ({failure.value!r}); its rows are missing.")
+        self.pages_done[page] = []
+        return self.advance()
+
+    def start_fanout(self, response):
+        self.pages_done = {}
+        self.next_page = 2
+        self.next_emit = 1
+        self.rows_emitted = 0
+        self.in_flight = 0
+        self.cutoff = None
+        self.wakeup = None
+        self.base_url = response.url
+        self.last_page = self.find_last_page(response)
+        if self.max_pages is not None:
+            self.last_page = min(self.last_page or self.max_pages, self.max_pages)
+        self.logger.info(
+            f"[FANOUT] parallel={self.parallel} last_page={self.last_page or 'unknown (probing)'}"
+        )
+
+    def find_last_page(self, response):
+        """Highest page number the pagination links to explicitly ("Last" or numbered links).
+        None when page 1 only has "Next" (then pages are probed until one is empty)."""
+        hrefs = (
+            response.css('a[rel="last"]::attr(href)').getall()
+            + response.xpath('//a[normalize-space(.)="Last" or normalize-space(.)="»"]/@href').getall()
+            + response.xpath('//div[contains(@class,"pagination")]//a[translate(normalize-space(.), "0123456789", "")=""]/@href').getall()
+        )
+        pages = [int(m.group(1)) for m in map(PAGE_RE.search, hrefs) if m]
+        return max(pages) if pages else None
+
+    def set_cutoff(self, page):
+        self.cutoff = page if self.cutoff is None else min(self.cutoff, page)
+        for done in [p for p in self.pages_done if p > self.cutoff]:
+            del self.pages_done[done]
+
+    def advance(self):
+        """Requests for free slots; wakes stream_fanout to emit what is ready."""
+        requests = self.schedule_more()
+        if self.wakeup is not None:
+            wakeup, self.wakeup = self.wakeup, None
+            wakeup.callback(None)
+        return requests
+
+    def schedule_more(self):
+        out = []
+        limit = self.cutoff if self.cutoff is not None else self.last_page
+        while self.in_flight < self.parallel and (limit is None or self.next_page <= limit):
+            page = self.next_page
+            self.next_page += 1
+            self.in_flight += 1
+            url = urljoin(self.base_url, f"/top/p.{page}")
+            out.append(scrapy.Request(
+                url,
+                callback=self.parse_page,
+                errback=self.page_failed,
+                cb_kwargs={"page": page},
+                priority=-page,   # lower pages first when slots free up
+            ))
+        return out
+
     # Helpers
     def clean_text(self, value):
-        return value.strip() if value else None
+        return clean_text(value)
 
     def clean_int(self, value):
-        if value is None:
-            return None
-        try:
-            return int(value.replace(",", "").replace("+", "").replace("−", "-").replace(" ", ""))
-        except ValueError:
-            return None
+        return clean_int(value)
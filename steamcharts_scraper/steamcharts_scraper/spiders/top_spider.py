@@ -1,5 +1,5 @@
 import scrapy
-from datetime import datetime
+from steamcharts_scraper.extract import fetched_at, top_fields, top_rows
 from steamcharts_scraper.items import SteamchartsScraperItem
 
 class AllTopGamesSpider(scrapy.Spider):
@@ -12,14 +12,15 @@ class AllTopGamesSpider(scrapy.Spider):
             yield scrapy.Request(url=f"{base_url}{page}", callback=self.parse)
 
     def parse(self, response):
-        for row in response.css("table#top-games.common-table tbody tr"):
-            cells = row.xpath("./td")
+        timestamp = fetched_at(response)
+        for row in top_rows(response, "table#top-games.common-table tbody tr"):
+            app_id, name, current, peak, hours = top_fields(row)
             item = SteamchartsScraperItem(
-                app_id    = cells[1].xpath("a/@href").re_first(r"/app/(\d+)"),
-                name      = cells[1].xpath("normalize-space(.//a/text())").get(),
-                current   = cells[2].xpath("normalize-space(.)").get().replace(",", ""),
-                peak      = cells[4].xpath("normalize-space(.)").get().replace(",", ""),
-                hours     = cells[5].xpath("normalize-space(.)").get().replace(",", ""),
-                timestamp = datetime.utcnow().isoformat()
+                app_id    = app_id,
+                name      = name,
+                current   = current,
+                peak      = peak,
+                hours     = hours,
+                timestamp = timestamp
             )
-            yield item
\ No newline at end of file
+            yield item